@@ -0,0 +1 @@
+# Shared helpers used by the Streamlit pages (APP/ is on sys.path when the app runs).
@@ -0,0 +1,70 @@
+# common/arrays.py
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from common.cache import CACHE_DIR
+
+# Versioned numeric artifacts: one directory per key holding plain .npy files
+# plus meta.json, e.g. .cache/arrays/predictor-<key>/pairwise.npy. Files are
+# opened with mmap_mode="r", so a restarted server (or several worker
+# processes) page them in from the OS cache instead of rebuilding them.
+ARRAY_DIR = os.path.join(CACHE_DIR, "arrays")
+
+
+def array_key(*parts):
+    """Stable short key from data versions / settings (anything with a stable repr)."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+def array_path(name, key):
+    return os.path.join(ARRAY_DIR, f"{name}-{key}")
+
+
+def load_arrays(name, key):
+    """(arrays, meta) memory-mapped read-only, or (None, None) if not built (or unreadable)."""
+    path = array_path(name, key)
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {a: np.load(os.path.join(path, f"{a}.npy"), mmap_mode="r", allow_pickle=False)
+                  for a in meta["arrays"]}
+    except (OSError, ValueError, KeyError):
+        return None, None
+    return arrays, meta
+
+
+def save_arrays(name, key, arrays, meta=None):
+    """
+    Write every array to a temp directory and rename it into place, so readers
+    never see a half-written artifact. Returns the memory-mapped (arrays, meta).
+    """
+    path = array_path(name, key)
+    os.makedirs(ARRAY_DIR, exist_ok=True)
+    tmp = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+    os.makedirs(tmp)
+    try:
+        for a, values in arrays.items():
+            np.save(os.path.join(tmp, f"{a}.npy"), np.ascontiguousarray(values), allow_pickle=False)
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({**(meta or {}), "arrays": list(arrays)}, f)
+        os.rename(tmp, path)
+    except OSError:
+        # another process got there first (or the cache is read-only): use theirs if present
+        shutil.rmtree(tmp, ignore_errors=True)
+    loaded = load_arrays(name, key)
+    if loaded[0] is None:
+        return {a: np.asarray(v) for a, v in arrays.items()}, {**(meta or {}), "arrays": list(arrays)}
+    return loaded
+
+
+def cached_arrays(name, key, build):
+    """Memory-mapped artifact for `key`; `build()` -> (arrays, meta) runs only on a miss."""
+    arrays, meta = load_arrays(name, key)
+    if arrays is None:
+        arrays, meta = save_arrays(name, key, *build())
+    return arrays, meta
@@ -0,0 +1,267 @@
+# common/backtest.py
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from common.features import is_rank_col, select_team_features
+
+# history columns from 'Wins' on are the team's season-to-date stats *before* the game
+PREGAME_FIRST_COL = "Wins"
+DATE_FORMAT = "%d-%b-%y"        # '4-Nov-24'
+BET_PAYOUT = 100 / 110          # units won per unit risked at standard -110 pricing
+MIN_TRAIN_GAMES = 40            # same floor as the Schedule Predictor's model
+N_ESTIMATORS = 100
+PREDICTORS = ("model", "baseline")
+MARKETS = ("ATS", "Totals")
+
+
+# -----------------------
+# Game table (one row per game, home perspective)
+# -----------------------
+def pregame_columns(hist):
+    start = list(hist.columns).index(PREGAME_FIRST_COL)
+    return [c for c in hist.columns[start:] if not str(c).startswith("Unnamed")]
+
+
+def parse_games(hist, season=None):
+    """
+    Pair the two team-perspective rows of each game in the daily game log.
+    Returns (games, X): games has one row per game from the home team's side
+    (Line is the home spread, negative = home favored); X holds home-minus-away
+    ('diff_') and home-plus-away ('sum_') pre-game stats, aligned with games.
+    Neutral-site games keep the alphabetically first team as 'home'.
+    """
+    num = lambda c: pd.to_numeric(hist[c], errors="coerce")  # noqa: E731
+    rows = pd.DataFrame({
+        "Date": pd.to_datetime(hist["Date"], format=DATE_FORMAT, errors="coerce"),
+        "Team": hist["Team"].astype(str).str.strip(),
+        "Opponent": hist["Opponent"].astype(str).str.strip(),
+        "Road": num("Road Game").fillna(0).to_numpy() == 1,
+        "Neutral": num("Neutral Site Game").fillna(0).to_numpy() == 1,
+        "Points": num("Points"),
+        "Opp Points": num("Opp Points"),
+        "Line": num("Line"),
+        "OU_Line": num("Over/Under Line"),
+    })
+    pre = hist[pregame_columns(hist)].apply(pd.to_numeric, errors="coerce").astype(float)
+    ranks = pre[[c for c in pre.columns if is_rank_col(c)]]
+    # early-season ranks are 0 / 'N/A' until a team has played
+    rows["Avg_Rank"] = ranks.where(ranks > 0).mean(axis=1)
+    rows["PPG"] = pre["Points.1"] if "Points.1" in pre.columns else np.nan
+    rows["OPP_PPG"] = pre["OPP_PPG"] if "OPP_PPG" in pre.columns else np.nan
+
+    ok = rows["Date"].notna().to_numpy()
+    key = pd.MultiIndex.from_frame(rows[["Date", "Team", "Opponent"]])
+    ok = ok & ~key.duplicated()
+    rows, pre, key = rows[ok].reset_index(drop=True), pre[ok].reset_index(drop=True), key[ok]
+
+    partner = key.get_indexer(pd.MultiIndex.from_frame(rows[["Date", "Opponent", "Team"]]))
+    has_partner = partner >= 0
+    partner_road = np.zeros(len(rows), dtype=bool)
+    partner_road[has_partner] = rows["Road"].to_numpy()[partner[has_partner]]
+    is_home = has_partner & ~rows["Road"].to_numpy() & (partner_road | (rows["Team"] < rows["Opponent"]).to_numpy())
+
+    home, away = np.flatnonzero(is_home), partner[is_home]
+    h, a = rows.iloc[home].reset_index(drop=True), rows.iloc[away].reset_index(drop=True)
+    games = pd.DataFrame({
+        "Date": h["Date"],
+        "Home": h["Team"],
+        "Away": h["Opponent"],
+        "Neutral": h["Neutral"],
+        "Home_Points": h["Points"],
+        "Away_Points": h["Opp Points"],
+        "Line": h["Line"],
+        "OU_Line": h["OU_Line"],
+        "Home_Rank": h["Avg_Rank"],
+        "Away_Rank": a["Avg_Rank"],
+        "Home_PPG": h["PPG"], "Away_PPG": a["PPG"],
+        "Home_OPP_PPG": h["OPP_PPG"], "Away_OPP_PPG": a["OPP_PPG"],
+    })
+    games["Margin"] = games["Home_Points"] - games["Away_Points"]
+    games["Total"] = games["Home_Points"] + games["Away_Points"]
+    if season is not None:
+        games.insert(0, "Season", int(season))
+
+    hp, ap = pre.iloc[home].to_numpy(), pre.iloc[away].to_numpy()
+    X = pd.concat([pd.DataFrame(hp - ap, columns=[f"diff_{c}" for c in pre.columns]),
+                   pd.DataFrame(hp + ap, columns=[f"sum_{c}" for c in pre.columns])], axis=1)
+    order = games.sort_values(["Date", "Home"]).index
+    return games.loc[order].reset_index(drop=True), X.loc[order].reset_index(drop=True)
+
+
+def load_backtest_games(seasons=None, data_versions=None):
+    """Game tables for several seasons from the season store, stacked in date order."""
+    from common.seasons import available_seasons, load_table
+
+    seasons = available_seasons("history") if seasons is None else seasons
+    parts = []
+    for season in sorted(seasons):
+        try:
+            hist = load_table("history", season, data_versions=data_versions)
+        except FileNotFoundError:
+            continue
+        parts.append(parse_games(hist, season))
+    if not parts:
+        raise FileNotFoundError("No game history available to backtest.")
+    games = pd.concat([g for g, _ in parts], ignore_index=True)
+    X = pd.concat([x for _, x in parts], ignore_index=True)  # columns differ across seasons -> NaN
+    order = games.sort_values(["Date", "Home"], kind="stable").index
+    return games.loc[order].reset_index(drop=True), X.loc[order].reset_index(drop=True)
+
+
+# -----------------------
+# Walk-forward folds (one per date; each only sees earlier dates)
+# -----------------------
+def baseline_predictions(train, test):
+    """
+    Ranking baseline: home margin = a + b * (away avg rank - home avg rank), fit
+    on earlier games; total = pre-game PPG / opponent PPG blend, else the prior
+    average total.
+    """
+    out = pd.DataFrame(index=test.index)
+    fit = train[["Home_Rank", "Away_Rank", "Margin"]].dropna()
+    rank_gap = test["Away_Rank"] - test["Home_Rank"]
+    if len(fit) >= MIN_TRAIN_GAMES:
+        b, a = np.polyfit(fit["Away_Rank"] - fit["Home_Rank"], fit["Margin"], 1)
+        out["baseline_margin"] = a + b * rank_gap
+    else:
+        out["baseline_margin"] = np.nan
+
+    blend = (test["Home_PPG"] + test["Away_OPP_PPG"] + test["Away_PPG"] + test["Home_OPP_PPG"]) / 2
+    played = (test[["Home_PPG", "Away_PPG", "Home_OPP_PPG", "Away_OPP_PPG"]] > 0).all(axis=1)
+    prior_total = train["Total"].mean() if len(train) else np.nan
+    out["baseline_total"] = blend.where(played, prior_total)
+    return out
+
+
+def model_predictions(train, test, X_train, X_test, n_estimators=N_ESTIMATORS, random_state=0):
+    """Random-forest margin and total regressors fit on earlier games only."""
+    out = pd.DataFrame(index=test.index, data={"model_margin": np.nan, "model_total": np.nan})
+    if len(train) < MIN_TRAIN_GAMES:
+        return out
+    cols = select_team_features(X_train)
+    Xtr = X_train[cols]
+    med = Xtr.median()
+    Xtr, Xte = Xtr.fillna(med).fillna(0).to_numpy(), X_test[cols].fillna(med).fillna(0).to_numpy()
+    for target, name in (("Margin", "model_margin"), ("Total", "model_total")):
+        y = train[target].to_numpy()
+        ok = ~np.isnan(y)
+        if ok.sum() < MIN_TRAIN_GAMES:
+            continue
+        rf = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state, n_jobs=1)
+        rf.fit(Xtr[ok], y[ok])
+        out[name] = rf.predict(Xte)
+    return out
+
+
+_fold_games = None
+_fold_X = None
+
+
+def _init_folds(games, X):
+    global _fold_games, _fold_X
+    _fold_games, _fold_X = games, X
+
+
+def _run_fold(date, n_estimators):
+    games, X = _fold_games, _fold_X
+    train_mask = (games["Date"] < date).to_numpy()
+    test_mask = (games["Date"] == date).to_numpy()
+    train, test = games[train_mask], games[test_mask]
+    preds = baseline_predictions(train, test)
+    preds = preds.join(model_predictions(train, test, X[train_mask], X[test_mask], n_estimators))
+    preds["train_games"] = len(train)
+    return preds
+
+
+# -----------------------
+# Grading
+# -----------------------
+def grade(pred, line, actual, spread=True):
+    """
+    +1 win / -1 loss / 0 push for each bet, NaN where no bet is placed.
+    Spread: bet the home side when pred margin + line > 0 (the away side when < 0).
+    Totals: bet the over when pred total > O/U line (the under when <).
+    """
+    pred, line, actual = (np.asarray(v, dtype=float) for v in (pred, line, actual))
+    edge = pred + line if spread else pred - line
+    result = actual + line if spread else actual - line
+    side, outcome = np.sign(edge), np.sign(result)
+    graded = np.where(outcome == 0, 0.0, np.where(side == outcome, 1.0, -1.0))
+    no_bet = np.isnan(edge) | (side == 0) | np.isnan(result)
+    return np.where(no_bet, np.nan, graded)
+
+
+def grade_predictions(games, preds):
+    """Per-game graded bets for every predictor and market."""
+    out = games[["Date", "Home", "Away", "Line", "OU_Line", "Margin", "Total"]].join(preds)
+    for p in PREDICTORS:
+        out[f"{p}_ATS"] = grade(out[f"{p}_margin"], out["Line"], out["Margin"], spread=True)
+        out[f"{p}_Totals"] = grade(out[f"{p}_total"], out["OU_Line"], out["Total"], spread=False)
+    return out
+
+
+def summarize(graded):
+    """Bets / wins / losses / pushes, hit rate (ATS cover rate or totals accuracy), units and ROI."""
+    rows = []
+    for p in PREDICTORS:
+        for m in MARKETS:
+            r = graded[f"{p}_{m}"].dropna()
+            wins, losses, pushes = int((r > 0).sum()), int((r < 0).sum()), int((r == 0).sum())
+            units = wins * BET_PAYOUT - losses
+            rows.append({
+                "Predictor": p, "Market": m, "Bets": len(r), "Wins": wins, "Losses": losses, "Pushes": pushes,
+                "Hit_PERC": wins / (wins + losses) if wins + losses else np.nan,
+                "Units": units,
+                "ROI": units / len(r) if len(r) else np.nan,
+            })
+    return pd.DataFrame(rows)
+
+
+def cumulative_units(graded):
+    """Running profit in units by date for each predictor/market."""
+    units = pd.DataFrame({f"{p} {m}": graded[f"{p}_{m}"].map(lambda r: BET_PAYOUT if r > 0 else r)
+                          for p in PREDICTORS for m in MARKETS})
+    return units.groupby(graded["Date"]).sum(min_count=1).fillna(0).cumsum()
+
+
+def run_backtest(games, X, workers=None, n_estimators=N_ESTIMATORS):
+    """
+    Walk-forward replay: every date is scored by models fit only on earlier
+    dates. Folds are independent, so they run in a process pool (spawned
+    workers; in-process when one worker is enough). Returns (graded, summary).
+    """
+    dates = sorted(games["Date"].dropna().unique())
+    workers = workers or min(len(dates), os.cpu_count() or 1)
+    if workers <= 1:
+        _init_folds(games, X)
+        folds = [_run_fold(d, n_estimators) for d in dates]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_folds, initargs=(games, X)) as pool:
+            folds = list(pool.map(_run_fold, dates, [n_estimators] * len(dates)))
+    preds = pd.concat(folds).sort_index() if folds else pd.DataFrame(index=games.index)
+    graded = grade_predictions(games, preds)
+    return graded, summarize(graded)
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.backtest [--seasons 2024 2025] [--workers 4]
+    import time
+
+    parser = argparse.ArgumentParser(description="Walk-forward ATS / totals backtest over the game log.")
+    parser.add_argument("--seasons", type=int, nargs="*", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--trees", type=int, default=N_ESTIMATORS)
+    args = parser.parse_args()
+
+    started = time.time()
+    all_games, all_X = load_backtest_games(args.seasons)
+    graded_games, summary = run_backtest(all_games, all_X, args.workers, args.trees)
+    print(f"{len(all_games)} games over {all_games['Date'].nunique()} dates in {time.time() - started:.1f}s")
+    print(summary.round(3).to_string(index=False))
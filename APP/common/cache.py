@@ -0,0 +1,90 @@
+# common/cache.py
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+log = logging.getLogger(__name__)
+
+# on-disk home for derived artifacts (indexes, arrays, reports); safe to delete
+CACHE_DIR = os.environ.get("MARCH_METRICS_CACHE", ".cache")
+
+# copies of data files pinned to one content version (see pinned_source); newest few kept per file
+PINNED_DIR = os.path.join(CACHE_DIR, "sources")
+PINNED_KEEP = 3
+
+# path -> (mtime_ns, size, digest); content is only re-hashed when mtime/size move
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+
+def file_version(path, chunk_size=1 << 20):
+    """Short content hash of a data file, used to key derived artifacts (None if missing)."""
+    try:
+        st_ = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (st_.st_mtime_ns, st_.st_size)
+    with _hash_lock:
+        memo = _hash_memo.get(path)
+    if memo is not None and memo[:2] == key:
+        return memo[2]
+
+    digest = _digest(path, chunk_size)
+    with _hash_lock:
+        _hash_memo[path] = (key[0], key[1], digest)
+    return digest
+
+
+def _digest(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def cache_path(name, version, ext):
+    """Path for a versioned artifact, e.g. .cache/similarity-<version>.npz"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, f"{name}-{version}.{ext}")
+
+
+def pinned_source(path, version):
+    """
+    A file whose content is exactly `version` of `path`, so a cache keyed on
+    that version never holds newer data: a copy taken (and hash-checked) the
+    first time the version is read, reused afterwards. `path` itself is
+    returned when no version is given, or when the file has already moved on
+    and no copy of the version exists (logged).
+    """
+    if version is None or not os.path.exists(path):
+        return path
+    stem, ext = os.path.splitext(os.path.basename(path))
+    pinned = os.path.join(PINNED_DIR, f"{stem}-{version}{ext}")
+    if os.path.exists(pinned):
+        return pinned
+    tmp = f"{pinned}.tmp-{uuid.uuid4().hex[:8]}"
+    try:
+        os.makedirs(PINNED_DIR, exist_ok=True)
+        shutil.copyfile(path, tmp)
+        if _digest(tmp) != version:
+            log.warning("%s changed after version %s was issued; reading its current content", path, version)
+            return path
+        os.replace(tmp, pinned)
+    except OSError:
+        return path  # read-only cache: read the file itself
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    # keep the newest few versions of this file (the served one and the one being rebuilt)
+    copies = sorted(glob.glob(os.path.join(PINNED_DIR, f"{glob.escape(stem)}-*{ext}")), key=os.path.getmtime)
+    for old in copies[:-PINNED_KEEP]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    return pinned
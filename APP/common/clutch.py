@@ -0,0 +1,162 @@
+# common/clutch.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from common.cache import cache_path, file_version, pinned_source
+
+CLUTCH_TABLE_PATH = "Data/2025_March_Madness_Databook/Clutch-Table 1.csv"
+
+# source column -> clean column for the game-level store
+GAME_COLUMNS = {
+    "Team": "Team",
+    "Opponent": "Opponent",
+    "Date": "Date",
+    "Home": "Location",
+    "Top25": "Top25",
+    "Top 25": "Opp Top25",
+    "OT": "OT",
+    "FGM": "FGM",
+    "FGA": "FGA",
+    "3M": "3M",
+    "3A": "3A",
+    "FTM": "FTM",
+    "FTA": "FTA",
+    "SM": "SM",
+    "Clutch SM": "Clutch SM",
+    "REB": "REB",
+    "OPPReb": "OPP REB",
+    "Off REB": "OFF REB",
+    "Opp Off Reb": "OPP OFF REB",
+    "Turn": "TURN",
+    "OppTurn": "OPP TURN",
+    "steal": "STL",
+    "Win": "Win",
+    "ComeFromBehindWins": "ComeFromBehindWins",
+    "BlownLeadClutchLoss": "BlownLeadClutchLoss",
+    "Opp Historical Value": "Opp Historical Value",
+    "% of points in clutch": "% of points in clutch",
+    "Clutch Value": "Clutch Value",
+}
+
+TIER_ORDER = ["Top 25", "High", "Mid", "Low"]
+# the opponent's Top 25 flag ('Top25' is the team's own); first one present is used
+OPP_TOP25_COLS = ("Opp Top25", "Top 25 Opponent", "Top 25")
+# bump when the parsed columns change, so stores written by an older parse are not reused
+STORE_SCHEMA = 2
+
+
+# -----------------------
+# Parse
+# -----------------------
+def parse_clutch_table(path=CLUTCH_TABLE_PATH):
+    """
+    Clean game-level clutch rows from the Databook export.
+    The sheet interleaves a 'Team:' header row and one per-team summary row
+    (team name in the first, unnamed column) with the actual game rows, which
+    have a blank first column and an Opponent. Only the game rows are kept.
+    """
+    raw = pd.read_csv(path, encoding="latin1")
+    first = raw.columns[0]
+    games = raw[raw[first].isna() & raw["Opponent"].notna() & raw["Team"].notna()]
+    games = games[[c for c in GAME_COLUMNS if c in games.columns]].rename(columns=GAME_COLUMNS)
+
+    games["Team"] = games["Team"].astype(str).str.strip()
+    games["Opponent"] = games["Opponent"].astype(str).str.strip()
+    games["Location"] = games["Location"].astype(str).str.strip().str.upper()
+    games["Date"] = pd.to_datetime(games["Date"].astype(str).str.strip(), format="mixed", errors="coerce")
+
+    num_cols = [c for c in games.columns if c not in ("Team", "Opponent", "Date", "Location")]
+    games[num_cols] = games[num_cols].apply(pd.to_numeric, errors="coerce")
+    flag_cols = [c for c in ("Top25", "Opp Top25", "OT", "Win", "ComeFromBehindWins", "BlownLeadClutchLoss")
+                 if c in games.columns]
+    games[flag_cols] = games[flag_cols].fillna(0).astype(np.int8)
+
+    games["Opponent Tier"] = opponent_tier(games)
+    for c in ("Team", "Opponent", "Location"):
+        games[c] = games[c].astype("category")
+    return games.reset_index(drop=True)
+
+
+def opponent_tier(games):
+    """
+    Top 25 opponents first (the opponent's flag, not the team's own 'Top25'),
+    then tertiles of the opponent's historical value.
+    """
+    value = pd.to_numeric(games["Opp Historical Value"], errors="coerce")
+    tier = pd.Series(pd.NA, index=games.index, dtype="object")
+    if value.notna().sum() >= 3:
+        tier = pd.qcut(value, 3, labels=["Low", "Mid", "High"]).astype("object")
+    flag_col = next((c for c in OPP_TOP25_COLS if c in games.columns), None)
+    if flag_col is not None:
+        # the export writes the flag as text ('0' / '1')
+        tier = tier.where(pd.to_numeric(games[flag_col], errors="coerce").fillna(0).to_numpy() != 1, "Top 25")
+    return pd.Categorical(tier, categories=TIER_ORDER, ordered=True)
+
+
+def load_clutch_games(path=CLUTCH_TABLE_PATH, version=None):
+    """
+    Game-level store, persisted as Parquet per source version: `version` is the
+    data-version manager's token (the file's own hash when not given), and the
+    parse reads the copy pinned to it.
+    """
+    version = version or file_version(path)
+    store = cache_path("clutch_games", f"{version}-s{STORE_SCHEMA}", "parquet")
+    if os.path.exists(store):
+        try:
+            return pd.read_parquet(store)
+        except Exception:
+            pass  # unreadable -> reparse
+    games = parse_clutch_table(pinned_source(path, version))
+    games.to_parquet(store, index=False)
+    return games
+
+
+# -----------------------
+# Aggregate
+# -----------------------
+def clutch_splits(games, by=None):
+    """
+    Clutch totals / rates per team, optionally split by another column
+    ('Opponent Tier', 'Location', 'OT'). One groupby over the whole league.
+    """
+    keys = ["Team"] + ([by] if by else [])
+    g = games.groupby(keys, observed=True)
+    out = g.agg(
+        Games=("Opponent", "size"),
+        Wins=("Win", "sum"),
+        FGM=("FGM", "sum"),
+        FGA=("FGA", "sum"),
+        FG3M=("3M", "sum"),
+        FG3A=("3A", "sum"),
+        FTM=("FTM", "sum"),
+        FTA=("FTA", "sum"),
+        Clutch_SM=("Clutch SM", "mean"),
+        Comeback_Wins=("ComeFromBehindWins", "sum"),
+        Blown_Leads=("BlownLeadClutchLoss", "sum"),
+        Clutch_Value=("Clutch Value", "mean"),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["Win_PERC"] = out["Wins"] / out["Games"]
+        out["FG_PERC"] = np.where(out["FGA"] > 0, out["FGM"] / out["FGA"], np.nan)
+        out["FG3_PERC"] = np.where(out["FG3A"] > 0, out["FG3M"] / out["FG3A"], np.nan)
+        out["FT_PERC"] = np.where(out["FTA"] > 0, out["FTM"] / out["FTA"], np.nan)
+    return out.reset_index()
+
+
+def build_clutch_tables(games):
+    """Overall team summary plus the standard splits, computed once per data version."""
+    return {
+        "summary": clutch_splits(games),
+        "Opponent Tier": clutch_splits(games, "Opponent Tier"),
+        "Location": clutch_splits(games, "Location"),
+        "OT": clutch_splits(games, "OT"),
+    }
+
+
+def clutch_leaderboard(summary, stat, n=25, min_games=2, ascending=False):
+    """League-wide top-n teams for one summary stat, among teams with enough clutch games."""
+    board = summary[summary["Games"] >= min_games]
+    board = board.sort_values([stat, "Games"], ascending=[ascending, False]).head(n)
+    return board.reset_index(drop=True)
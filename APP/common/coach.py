@@ -0,0 +1,150 @@
+# common/coach.py
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from common.cache import file_version, pinned_source
+from common.databook import DATABOOK_SEASON, parse_sheet, read_manifest, sheet_table
+from common.seasons import available_seasons, load_table, table_version
+
+COACH_TABLE_PATH = "Data/2025_March_Madness_Databook/Coach-Table 1.csv"
+COACH_SHEET = "Coach"
+COACH_TABLE = sheet_table(COACH_SHEET)   # season-store table (common/databook.py)
+SCORE_COL = "Coach Score"                # leaderboard column and model feature name
+
+
+# -----------------------
+# Parse
+# -----------------------
+def _with_team_col(frame):
+    """The program name sits in the sheet's leading unnamed column; call it 'Team' and drop rows without one."""
+    frame = frame.rename(columns={frame.columns[0]: "Team"})
+    return frame[frame["Team"].notna()].reset_index(drop=True)
+
+
+def parse_coach_table(path=COACH_TABLE_PATH):
+    """
+    (coach rows, coefficients) from the Databook export. The fitted
+    coefficients are the numeric row above the header (one weight per input
+    column); the sheet's 'Score' column is that row dotted with each coach's inputs.
+    """
+    frame, info = parse_sheet(path)
+    weights = info["coefficients"][0] if info["coefficients"] else {}
+    return _with_team_col(frame), pd.Series(weights, dtype=float)
+
+
+def coach_coefficients(path=COACH_TABLE_PATH, version=None):
+    """Fitted coefficients from the live export (the copy pinned to `version`), else from the ingested Databook manifest."""
+    if os.path.exists(path):
+        return parse_coach_table(pinned_source(path, version))[1]
+    entry = read_manifest()["sheets"].get(COACH_SHEET, {})
+    coefficients = entry.get("coefficients") or [{}]
+    return pd.Series(coefficients[0], dtype=float)
+
+
+def load_coach_table(season=DATABOOK_SEASON, path=COACH_TABLE_PATH, version=None):
+    """
+    One season's coach rows: the live export for the Databook season (the copy
+    pinned to `version` when given), else the season-store partition.
+    """
+    if int(season) == DATABOOK_SEASON and os.path.exists(path):
+        return parse_coach_table(pinned_source(path, version))[0]
+    return _with_team_col(load_table(COACH_TABLE, season))  # FileNotFoundError when not ingested
+
+
+def coach_version(season, data_versions=None, path=COACH_TABLE_PATH):
+    """Cache key for one season's coach table (None when there is none)."""
+    if int(season) == DATABOOK_SEASON and os.path.exists(path):
+        return data_versions.version("coach") if data_versions is not None else file_version(path)
+    return table_version(COACH_TABLE, season)
+
+
+# -----------------------
+# Score (whole table at once)
+# -----------------------
+def coach_scores(frame, coefficients):
+    """
+    Coach score for every row in one matrix product: inputs (missing -> 0, as
+    the sheet treats blanks) times the coefficients. Returns (score,
+    contributions); rows with none of the inputs filled score NaN.
+    """
+    cols = [c for c in coefficients.index if c in frame.columns]
+    X = frame[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    contributions = np.nan_to_num(X) * coefficients[cols].to_numpy(dtype=float)
+    score = np.where(np.isnan(X).all(axis=1), np.nan, contributions.sum(axis=1))
+    return (pd.Series(score, index=frame.index, name=SCORE_COL),
+            pd.DataFrame(contributions, index=frame.index, columns=cols))
+
+
+def coach_leaderboard(frame, coefficients):
+    """Every program ranked by coach score, with the input adding the most and the one costing the most."""
+    score, contributions = coach_scores(frame, coefficients)
+    if "Coach Name" in frame.columns:
+        score = score.where(frame["Coach Name"].notna())  # vacant programs are unscored, as in the sheet
+    scored = score.notna()
+    board = pd.DataFrame({
+        "Team": frame["Team"].astype(str),
+        "Coach": frame["Coach Name"] if "Coach Name" in frame.columns else None,
+        "Conference": frame["Conference"].astype(object) if "Conference" in frame.columns else None,
+        SCORE_COL: score,
+        "Rank": score.rank(ascending=False, method="min").astype("Int16"),
+        "Percentile": (score.rank(pct=True) * 100).round(1),
+        "Top factor": contributions.idxmax(axis=1).where(scored),
+        "Biggest drag": contributions.idxmin(axis=1).where(scored),
+    })
+    return board.sort_values(["Rank", "Team"], na_position="last").reset_index(drop=True)
+
+
+def coach_score_history(coefficients, seasons=None):
+    """Leaderboards for every stored season (one vectorized pass each), stacked with a Season column."""
+    boards = []
+    for season in seasons or available_seasons(COACH_TABLE):
+        try:
+            frame = load_coach_table(season)
+        except FileNotFoundError:
+            continue
+        boards.append(coach_leaderboard(frame, coefficients).assign(Season=int(season)))
+    return pd.concat(boards, ignore_index=True) if boards else pd.DataFrame(columns=["Team", SCORE_COL, "Season"])
+
+
+# -----------------------
+# Shared leaderboard + model feature
+# -----------------------
+@st.cache_resource(max_entries=4)
+def load_coach_scores(season, version):
+    """Leaderboard for one season's coach table version (shared read-only), or None without one."""
+    if version is None:
+        return None
+    try:
+        live = int(season) == DATABOOK_SEASON
+        return coach_leaderboard(load_coach_table(season, version=version),
+                                 coach_coefficients(version=version if live else None))
+    except (FileNotFoundError, KeyError):
+        return None
+
+
+def with_coach_score(df_all, board, registry):
+    """
+    df_all plus a 'Coach Score' column joined by team ID (NaN for programs
+    without a coach row; the feature builder fills those with the median).
+    """
+    if board is None:
+        return df_all
+    ids = registry.ids(board["Team"], source="coach.Team")
+    by_id = np.full(len(registry), np.nan)
+    ok = ids >= 0
+    by_id[ids[ok]] = board[SCORE_COL].to_numpy(dtype=float)[ok]
+    team_ids = registry.ids(df_all["Teams"])
+    return df_all.assign(**{SCORE_COL: np.where(team_ids >= 0, by_id[np.maximum(team_ids, 0)], np.nan)})
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.coach  -> top coaches now + scores per stored season
+    coefficients = coach_coefficients()
+    board = load_coach_scores(DATABOOK_SEASON, coach_version(DATABOOK_SEASON))
+    print(f"{len(coefficients)} coefficients")
+    print(board.head(25).to_string(index=False))
+    history = coach_score_history(coefficients)
+    print(history.groupby("Season")[SCORE_COL].describe().round(1).to_string())
@@ -0,0 +1,120 @@
+# common/data_version.py
+import logging
+import threading
+import time
+
+import streamlit as st
+
+from common.cache import file_version
+from common.live import results_log_path
+from common.seasons import CURRENT_SEASON, SEASON_TABLES, load_table
+
+log = logging.getLogger(__name__)
+
+# logical name -> file; loaders take the matching version token as a cache key
+DATA_FILES = {
+    **SEASON_TABLES,
+    "clutch": "Data/2025_March_Madness_Databook/Clutch-Table 1.csv",
+    "players": "Data/2025_March_Madness_Databook/Player Value-Table 1.csv",
+    "coach": "Data/2025_March_Madness_Databook/Coach-Table 1.csv",
+    "team_transfer": "Data/2025_March_Madness_Databook/Team Transfer-Table 1.csv",
+    "historical_value": "Data/2025_March_Madness_Databook/Historical Value-Table 1.csv",
+    # append-only log of completed games (common/live.py); read incrementally
+    "results": results_log_path(CURRENT_SEASON),
+}
+
+POLL_SECONDS = 30
+
+
+class DataVersionManager:
+    """
+    Tracks a content version per data file and serves the last *ready* version.
+
+    When the poller sees a file change (mtime/size moved and the content hash
+    differs) it runs only the builders that depend on that file, passing them
+    the new versions so they warm their caches in the background. The served
+    versions flip once those builders finish; until then pages keep reading
+    the old cache entries. A failed rebuild leaves the old version in place.
+    """
+
+    def __init__(self, files=None, poll_seconds=POLL_SECONDS):
+        self.files = dict(DATA_FILES if files is None else files)
+        self.poll_seconds = poll_seconds
+        self._ready = {name: file_version(path) for name, path in self.files.items()}
+        self._builders = {}  # name -> (deps, builder)
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._thread = None
+
+    # -----------------------
+    # Versions served to pages
+    # -----------------------
+    def version(self, *names):
+        """Ready version token(s) for the given files (a str for one name, a tuple for several)."""
+        with self._lock:
+            vals = tuple(self._ready.get(n) for n in names)
+        return vals[0] if len(vals) == 1 else vals
+
+    def register(self, name, deps, builder):
+        """
+        builder(versions) warms one derived cache; versions maps every file in
+        `deps` to the version being built. Re-registering a name replaces it.
+        """
+        with self._lock:
+            self._builders[name] = (tuple(deps), builder)
+
+    # -----------------------
+    # Change detection / rebuild
+    # -----------------------
+    def check(self):
+        """Compare files against the served versions; rebuild dependents of any that changed."""
+        latest = {name: file_version(path) for name, path in self.files.items()}
+        with self._lock:
+            changed = {n for n, v in latest.items() if v != self._ready.get(n)}
+            if not changed or self._rebuilding:
+                return changed
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, args=(latest, changed), daemon=True).start()
+        return changed
+
+    def _rebuild(self, latest, changed):
+        try:
+            with self._lock:
+                builders = [(n, deps, b) for n, (deps, b) in self._builders.items() if changed & set(deps)]
+            for name, deps, builder in builders:
+                started = time.time()
+                builder({d: latest.get(d) for d in deps})
+                log.info("rebuilt %s in %.2fs", name, time.time() - started)
+            with self._lock:
+                for n in changed:
+                    self._ready[n] = latest[n]
+        except Exception:
+            log.exception("data rebuild failed; still serving previous version")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.check()
+            except Exception:
+                log.exception("data version check failed")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll, name="data-version-poller", daemon=True)
+            self._thread.start()
+        return self
+
+
+@st.cache_resource
+def get_data_versions():
+    """Process-wide manager shared by every session and page."""
+    manager = DataVersionManager()
+    # the current season's core tables are shared by all pages; rebuild them on change
+    for table in SEASON_TABLES:
+        manager.register(f"table.{table}", [table],
+                         lambda v, t=table: load_table(t, CURRENT_SEASON, version=v[t]))
+    return manager.start()
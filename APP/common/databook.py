@@ -0,0 +1,293 @@
+# common/databook.py
+import argparse
+import csv
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.cache import file_version
+from common.seasons import STORE_DIR, load_table, partition_path
+
+DATABOOK_DIR = "Data/2025_March_Madness_Databook"
+DATABOOK_SEASON = 2025
+MANIFEST_PATH = os.path.join(STORE_DIR, "databook_manifest.json")
+
+HEADER_SCAN_ROWS = 12   # the real header is within the first rows of every sheet
+# spreadsheet blanks / errors / dash placeholders
+MISSING = {"", "N/A", "#N/A", "NaN", "nan", "-", "–", "—", "#DIV/0!", "#VALUE!", "#REF!", "#NUM!", "#NAME?"}
+# 'Team:', 'Sum:', 'Average:', 'Rows:', 'Count (Unique):' ... between data blocks
+SUMMARY_CELL = re.compile(r"^[A-Za-z][A-Za-z ()]{0,24}:$")
+
+INT_RE = re.compile(r"^[+-]?(\d{1,3}(,\d{3})+|\d+)$")
+FLOAT_RE = re.compile(r"^[+-]?((\d{1,3}(,\d{3})+|\d+)(\.\d*)?|\.\d+)([eE][+-]?\d+)?$")
+BOOL_VALUES = {"TRUE", "FALSE"}
+DATE_RE = re.compile(r"^([A-Z][a-z]{2,8}\.? \d{1,2}, \d{4}|\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2})$")
+
+
+# -----------------------
+# Names
+# -----------------------
+def sheet_name(path):
+    """'Player Value-Table 1.csv' -> 'Player Value'"""
+    base = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"-(Table \d+|THE_TABLE)$", "", base)
+
+
+def sheet_table(sheet):
+    """Season-store table name for a sheet: 'Player Value' -> 'databook_player_value'."""
+    return "databook_" + re.sub(r"[^a-z0-9]+", "_", sheet.lower()).strip("_")
+
+
+def dedupe_headers(names):
+    """Blank headers -> 'Unnamed: <i>', repeats -> 'name.1', 'name.2' (pandas' read_csv convention)."""
+    out, seen = [], {}
+    for i, name in enumerate(names):
+        name = name.strip() or f"Unnamed: {i}"
+        base, n = name, seen.get(name, 0)
+        while name in seen:
+            n += 1
+            name = f"{base}.{n}"
+        seen[base] = n
+        seen[name] = 0
+        out.append(name)
+    return out
+
+
+# -----------------------
+# Parse (one streaming pass)
+# -----------------------
+def _clean(cell):
+    cell = cell.strip()
+    return None if cell in MISSING else cell
+
+
+def _is_text(cell):
+    return cell is not None and not FLOAT_RE.match(cell) and not SUMMARY_CELL.match(cell)
+
+
+class _ColumnType:
+    """Narrowest type every non-missing cell of a column fits, updated cell by cell."""
+
+    __slots__ = ("bool", "int", "float", "date", "filled")
+
+    def __init__(self):
+        self.bool = self.int = self.float = self.date = True
+        self.filled = 0
+
+    def update(self, cell):
+        self.filled += 1
+        if self.bool and cell.upper() not in BOOL_VALUES:
+            self.bool = False
+        if self.int and not INT_RE.match(cell):
+            self.int = False
+        if self.float and not self.int and not FLOAT_RE.match(cell):
+            self.float = False
+        if self.date and not DATE_RE.match(cell):
+            self.date = False
+
+    @property
+    def kind(self):
+        if self.filled == 0:
+            return "empty"
+        for kind in ("bool", "int", "float", "date"):
+            if getattr(self, kind):
+                return kind
+        return "str"
+
+
+def parse_sheet(path):
+    """
+    Clean one Databook export. Returns (frame, info):
+      - header = the row with the most text cells among the first HEADER_SCAN_ROWS
+        (rows above it are coefficient / blank rows; numeric ones go to info)
+      - dropped: blank rows (and formula filler rows with a single value),
+        repeated headers, rows with a summary marker cell ('Team:', 'Sum:', ...)
+        and, once such a marker has been seen, group rows whose leading unnamed
+        column holds a label while the first named column is empty (subtotals)
+      - headers stripped and de-duplicated, fully empty columns dropped
+      - every column typed from the flags gathered during the same pass
+    """
+    # the exports are UTF-8: stream them as such, and only if a byte turns out not
+    # to be (older latin1 exports) start the pass over in latin1, which decodes anything
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            names, preamble, columns, types, dropped, header_at = _scan_rows(f)
+    except UnicodeDecodeError:
+        with open(path, encoding="latin1", newline="") as f:
+            names, preamble, columns, types, dropped, header_at = _scan_rows(f)
+
+    data, kinds, empty = {}, {}, []
+    for name, col, typ in zip(names, columns, types):
+        if typ.kind == "empty":
+            empty.append(name)
+            continue
+        data[name] = _typed(col, typ.kind)
+        kinds[name] = typ.kind
+    frame = pd.DataFrame(data)
+
+    coefficients = []
+    for row in preamble:
+        values = {n: float(c.replace(",", "")) for n, c in zip(names, row)
+                  if c is not None and FLOAT_RE.match(c) and n in data}
+        if values:
+            coefficients.append(values)
+    info = {"header_row": header_at, "preamble_rows": header_at, "dropped_rows": dropped,
+            "empty_columns": empty, "kinds": kinds, "coefficients": coefficients}
+    return frame, info
+
+
+def _scan_rows(f):
+    """
+    The single streaming pass of parse_sheet over an open text file: header
+    detection, row filtering and column typing. Returns (names, preamble,
+    columns, types, dropped, header_at).
+    """
+    reader = csv.reader(f)
+    head = []
+    for row in reader:
+        head.append([_clean(c) for c in row])
+        if len(head) == HEADER_SCAN_ROWS:
+            break
+    text_counts = [sum(_is_text(c) for c in row) for row in head]
+    header_at = int(np.argmax(text_counts)) if head else 0
+    raw_header = [c or "" for c in head[header_at]] if head else []
+    names = dedupe_headers(raw_header)
+    width = len(names)
+    preamble = head[:header_at]
+
+    # leading unnamed column + first named column drive the group-row check
+    lead = 0 if width and not raw_header[0] else None
+    first_named = next((i for i, h in enumerate(raw_header) if h), None)
+
+    grouped = False  # set by the first summary-marker row
+    columns = [[] for _ in range(width)]
+    types = [_ColumnType() for _ in range(width)]
+    dropped = {"blank": 0, "summary": 0, "group": 0, "repeated_header": 0}
+
+    def rows():
+        yield from head[header_at + 1:]
+        for row in reader:
+            yield [_clean(c) for c in row]
+
+    for row in rows():
+        row = (row + [None] * width)[:width]
+        if sum(c is not None for c in row) < 2:
+            dropped["blank"] += 1
+        elif any(c is not None and SUMMARY_CELL.match(c) for c in row):
+            dropped["summary"] += 1
+            grouped = True
+        elif [c or "" for c in row] == raw_header:
+            dropped["repeated_header"] += 1
+        elif (grouped and lead is not None and first_named is not None
+              and row[lead] is not None and row[first_named] is None):
+            dropped["group"] += 1
+        else:
+            for col, typ, cell in zip(columns, types, row):
+                col.append(cell)
+                if cell is not None:
+                    typ.update(cell)
+    return names, preamble, columns, types, dropped, header_at
+
+
+def _typed(col, kind):
+    """List of cleaned strings (None = missing) -> typed array for `kind`."""
+    s = pd.Series(col, dtype=object)
+    has_missing = s.isna().any()
+    if kind == "bool":
+        b = s.str.upper().map({"TRUE": True, "FALSE": False})
+        return b.astype("boolean") if has_missing else b.astype(bool)
+    if kind in ("int", "float"):
+        num = pd.to_numeric(s.str.replace(",", "", regex=False), errors="coerce")
+        if kind == "float":
+            return num.astype(np.float64)
+        lo, hi = (num.min(), num.max()) if num.notna().any() else (0, 0)
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            if np.iinfo(dtype).min <= lo and hi <= np.iinfo(dtype).max:
+                break
+        return num.astype(pd.api.types.pandas_dtype(dtype).name.capitalize()) if has_missing else num.astype(dtype)
+    if kind == "date":
+        return pd.to_datetime(s, format="mixed", errors="coerce")
+    # repeated labels (teams, conferences, locations) -> category; free text stays str
+    return s.astype("category") if s.nunique() <= 0.5 * s.notna().sum() else s
+
+
+# -----------------------
+# Store + manifest
+# -----------------------
+def read_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"season": DATABOOK_SEASON, "sheets": {}}
+
+
+def ingest_databook(source_dir=DATABOOK_DIR, season=DATABOOK_SEASON, force=False, manifest_path=MANIFEST_PATH):
+    """
+    Parse every sheet in `source_dir` into its season-store partition
+    (table=databook_<sheet>/season=<yyyy>/part.parquet) and record it in the
+    manifest. Sheets whose source file version is unchanged are skipped.
+    Returns the manifest.
+    """
+    manifest = read_manifest(manifest_path)
+    manifest["season"] = season
+    for name in sorted(os.listdir(source_dir)):
+        if not name.lower().endswith(".csv"):
+            continue
+        path = os.path.join(source_dir, name)
+        sheet = sheet_name(path)
+        table = sheet_table(sheet)
+        out = partition_path(table, season)
+        version = file_version(path)
+        entry = manifest["sheets"].get(sheet)
+        if not force and entry and entry.get("source_version") == version and os.path.exists(out):
+            continue
+        started = time.perf_counter()
+        frame, info = parse_sheet(path)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        tmp = f"{out}.tmp"
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, out)
+        manifest["sheets"][sheet] = {
+            "source": path,
+            "source_version": version,
+            "table": table,
+            "path": out,
+            "rows": len(frame),
+            "columns": {c: str(t) for c, t in frame.dtypes.items()},
+            **info,
+            "parse_seconds": round(time.perf_counter() - started, 3),
+        }
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp = f"{manifest_path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, manifest_path)
+    return manifest
+
+
+def load_sheet(sheet, columns=None, season=DATABOOK_SEASON):
+    """One ingested Databook sheet (by sheet name, e.g. 'Team Transfer') from the season store."""
+    return load_table(sheet_table(sheet), season, columns=columns)
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.databook [--force]  -> Data/store/table=databook_*/ + manifest
+    parser = argparse.ArgumentParser(description="Ingest the Databook sheets into typed Parquet tables.")
+    parser.add_argument("--dir", default=DATABOOK_DIR)
+    parser.add_argument("--season", type=int, default=DATABOOK_SEASON)
+    parser.add_argument("--force", action="store_true", help="re-ingest sheets even if unchanged")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    result = ingest_databook(args.dir, args.season, force=args.force)
+    report = pd.DataFrame([
+        {"Sheet": s, "Table": e["table"], "Rows": e["rows"], "Cols": len(e["columns"]),
+         "Header row": e["header_row"], **{f"dropped_{k}": v for k, v in e["dropped_rows"].items()},
+         "Parse s": e["parse_seconds"]}
+        for s, e in sorted(result["sheets"].items())])
+    print(report.to_string(index=False))
+    print(f"manifest: {MANIFEST_PATH} ({time.perf_counter() - started:.1f}s)")
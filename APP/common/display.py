@@ -0,0 +1,36 @@
+# common/display.py
+import pyarrow as pa
+import streamlit as st
+
+# one entry per (view, filter state); a schedule view is a few KB of Arrow
+MAX_VIEWS = 256
+MAX_DOWNLOADS = 16
+
+
+def to_arrow(frame, columns=None):
+    """
+    Arrow table for st.dataframe. Streamlit serializes a pyarrow.Table as-is,
+    skipping its per-call pandas inspection and conversion. The index is dropped
+    (every view here is shown with a plain row order).
+    """
+    if columns is not None:
+        frame = frame[list(columns)]
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+@st.cache_resource(max_entries=MAX_VIEWS)
+def display_view(name, key, _build, columns=None):
+    """
+    (frame, table) for one display view, built once per (name, key) and shared
+    read-only. `key` must cover the data version and the filter state;
+    `_build()` returns the sorted, formatted DataFrame. The frame feeds charts
+    and downloads, and the Arrow table (only `columns`) goes to st.dataframe.
+    """
+    frame = _build()
+    return frame, to_arrow(frame, columns)
+
+
+@st.cache_resource(max_entries=MAX_DOWNLOADS)
+def download_csv(name, key, _frame):
+    """UTF-8 CSV bytes of a display frame, encoded once per (name, key)."""
+    return _frame.to_csv(index=False).encode("utf-8")
@@ -0,0 +1,137 @@
+# common/features.py
+import numpy as np
+import pandas as pd
+
+from common.arrays import array_key, cached_arrays
+
+# -----------------------
+# Feature selection defaults
+# -----------------------
+# columns that are never model inputs (index artifacts / blank spreadsheet columns)
+JUNK_COLS = ("index", "Empty Column")
+MAX_NAN_FRAC = 0.10      # drop a stat if more than 10% of teams are missing it
+CORR_THRESHOLD = 0.95    # drop a stat if it is this correlated with one already kept
+SELECTION_VERSION = 2    # bump when the selection rules change; keys the stored predictor arrays
+
+
+def is_rank_col(col):
+    """True for rank-derived columns (Points_RANK, 'OReb Rank', 'Average Ranking', ...)."""
+    name = str(col).strip().lower()
+    return name.endswith("rank") or name.endswith("ranking") or "_rank" in name or " rank" in name
+
+
+def select_team_features(df_all, max_nan_frac=MAX_NAN_FRAC, corr_threshold=CORR_THRESHOLD):
+    """
+    Pick the team-level numeric columns used to describe a team in the predictor.
+    Steps:
+      - numeric columns only, minus junk / 'Unnamed' spreadsheet columns
+      - drop *_RANK style columns (they restate the raw stat)
+      - drop NaN-heavy and constant columns
+      - greedily drop columns highly correlated with an earlier kept column
+    Returns the list of kept column names (in All_stats order).
+    """
+    numeric = df_all.select_dtypes(include=[np.number])
+    cols = [c for c in numeric.columns
+            if c not in JUNK_COLS and not str(c).startswith("Unnamed") and not is_rank_col(c)]
+    numeric = numeric[cols]
+
+    nan_frac = numeric.isna().mean()
+    numeric = numeric.loc[:, nan_frac <= max_nan_frac]
+    numeric = numeric.loc[:, numeric.nunique(dropna=True) > 1]
+
+    if numeric.shape[1] < 2:
+        return numeric.columns.tolist()
+
+    corr = np.nan_to_num(numeric.corr().abs().to_numpy())
+    # greedy, in All_stats order: a column is compared only with the columns kept so far, so in a
+    # chain A~B~C (A and C uncorrelated) dropping B does not also drop C
+    kept = []
+    for j in range(corr.shape[1]):
+        if not (corr[kept, j] > corr_threshold).any():
+            kept.append(j)
+    return numeric.columns[kept].tolist()
+
+
+def build_team_matrix(df_all, team_cols, registry=None):
+    """
+    Float frame of the selected columns (NaNs filled with league median), one
+    row per team. Indexed by canonical team ID when a TeamRegistry is given
+    (common/teams.py), else by the raw 'Teams' names.
+    """
+    if registry is not None:
+        ids = registry.ids(df_all["Teams"], source="all_stats.Teams")
+        keep = (ids >= 0) & ~pd.Series(ids).duplicated().to_numpy()
+        feats = df_all.loc[keep, team_cols].set_axis(pd.Index(ids[keep], name="team_id"))
+    else:
+        feats = df_all.drop_duplicates(subset="Teams").set_index("Teams")[team_cols]
+    feats = feats.apply(pd.to_numeric, errors="coerce")
+    return feats.fillna(feats.median()).astype(float)
+
+
+def cached_team_matrix(df_all, team_cols, version, registry):
+    """
+    build_team_matrix() by team ID, persisted per (All_stats version, columns,
+    registry) as a memory-mapped .npy (common/arrays.py). The returned frame
+    is a read-only view over the mapped file.
+    """
+    def build():
+        matrix = build_team_matrix(df_all, team_cols, registry)
+        return ({"values": matrix.to_numpy(), "team_ids": matrix.index.to_numpy(dtype=np.int32)},
+                {"columns": list(team_cols)})
+
+    arrays, meta = cached_arrays("team_features", array_key(version, list(team_cols), registry.version), build)
+    return pd.DataFrame(arrays["values"], index=pd.Index(arrays["team_ids"], name="team_id"),
+                        columns=meta["columns"], copy=False)
+
+
+def pairwise_probabilities(model, team_matrix, n_teams, block=32):
+    """
+    P(home wins) for every (home ID, away ID) pair of an ID-indexed team
+    matrix as an (n_teams, n_teams) array, NaN where either team has no
+    features. Same rows as build_matchup_features(), so each entry equals the
+    per-game predict_proba; built `block` home teams at a time to bound memory.
+    """
+    ids = team_matrix.index.to_numpy()
+    values = team_matrix.to_numpy()
+    probs = np.full((n_teams, n_teams), np.nan)
+    for start in range(0, len(ids), block):
+        home = values[start:start + block]
+        X = (home[:, None, :] - values[None, :, :]).reshape(-1, values.shape[1])
+        probs[np.ix_(ids[start:start + block], ids)] = model.predict_proba(X)[:, 1].reshape(len(home), len(ids))
+    return probs
+
+
+def matchup_feature_names(team_cols):
+    return [f"diff_{c}" for c in team_cols]
+
+
+def build_matchup_features(team_matrix, home, away, registry=None, source=None):
+    """
+    Home-minus-away difference features for a batch of games.
+    Returns (X, valid) where X is a float ndarray (n_games, n_features) and valid
+    flags games where both teams were found in team_matrix (other rows are NaN).
+    With a registry, home/away names are resolved to team IDs first (aliases
+    match; unmatched names are recorded under `source`).
+    """
+    if registry is not None:
+        home, away = registry.ids(home, source), registry.ids(away, source)
+    home_idx = team_matrix.index.get_indexer(pd.Index(home))
+    away_idx = team_matrix.index.get_indexer(pd.Index(away))
+    valid = (home_idx >= 0) & (away_idx >= 0)
+
+    values = team_matrix.to_numpy()
+    X = np.full((len(home_idx), values.shape[1]), np.nan)
+    X[valid] = values[home_idx[valid]] - values[away_idx[valid]]
+    return X, valid
+
+
+def make_feature_spec(df_all, pca_components=None, max_nan_frac=MAX_NAN_FRAC, corr_threshold=CORR_THRESHOLD):
+    """Bundle the selected columns and reduction settings so they can be cached with the model."""
+    team_cols = select_team_features(df_all, max_nan_frac=max_nan_frac, corr_threshold=corr_threshold)
+    return {
+        "team_cols": team_cols,
+        "feature_names": matchup_feature_names(team_cols),
+        "pca_components": pca_components,
+        "max_nan_frac": max_nan_frac,
+        "corr_threshold": corr_threshold,
+    }
@@ -0,0 +1,367 @@
+# common/figures.py
+import argparse
+import hashlib
+import html
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from common.cache import CACHE_DIR
+from common.ranks import compute_ranks, rank_scope_key, with_stored_ranks
+from common.stat_groups import sections
+from common.teams import TeamRegistry
+
+log = logging.getLogger(__name__)
+
+# one figure per key per team: the four Team Breakdown sections + the Clutch shooting chart
+CLUTCH_SHOOTING = "clutch.shooting"
+FIGURE_KEYS = [f"breakdown.{title}" for title in sections] + [CLUTCH_SHOOTING]
+
+TEAMS_PER_TASK = 16  # teams handed to a worker at a time
+LRU_TEAMS = 64       # team figure sets kept in memory per process
+
+
+# -----------------------
+# Formatting (shared with the Team Breakdown tables)
+# -----------------------
+def format_value(key_or_label, val):
+    """Format numeric or percent values for display."""
+    if pd.isna(val):
+        return "N/A"
+    try:
+        v = float(val)
+    except Exception:
+        return str(val)
+    # treat as percent if key or label indicates percent
+    if ("PERC" in str(key_or_label).upper()) or ("%" in str(key_or_label)):
+        return f"{v:.1%}" if v <= 1 else f"{v:.1f}%"
+    # format integers without .0 if safe
+    if float(v).is_integer():
+        return str(int(v))
+    return f"{v:.1f}"
+
+
+def format_rank(val):
+    """Format rank display for right column."""
+    if val is None:
+        return "No rank mapping defined"
+    if pd.isna(val) or val == "N/A":
+        return "Not enough games played for ranking"
+    try:
+        return int(float(val))
+    except Exception:
+        return val
+
+
+def robust_normalize(df_section: pd.DataFrame) -> pd.DataFrame:
+    """Normalize each column to [0,1] with robust handling."""
+    out = pd.DataFrame(index=df_section.index, columns=df_section.columns, dtype=float)
+    for c in df_section.columns:
+        col = pd.to_numeric(df_section[c], errors='coerce')
+        if col.dropna().empty:
+            out[c] = 0.5
+            continue
+        mn = col.min(skipna=True)
+        mx = col.max(skipna=True)
+        if pd.isna(mn) or pd.isna(mx) or mx == mn:
+            out[c] = 0.5
+        else:
+            out[c] = (col - mn) / (mx - mn)
+    return out
+
+
+# -----------------------
+# Figure builders
+# -----------------------
+def default_ranks(df):
+    """The Team Breakdown's default rank source (resolved_ranks with no scope), without the Streamlit cache."""
+    return with_stored_ranks(df, compute_ranks(df))
+
+
+def section_context(df, section_cols):
+    """League-wide pieces of a section chart, computed once and reused for every team."""
+    stat_keys = list(section_cols.keys())
+    section_df = df[stat_keys].apply(pd.to_numeric, errors="coerce").astype(float)
+    normalized = robust_normalize(section_df)
+    conf = df["Conference"].astype(object) if "Conference" in df.columns else pd.Series(None, index=df.index)
+    return {
+        "section_df": section_df,
+        "normalized": normalized,
+        "conf": conf,
+        "conf_norm": normalized.groupby(conf).mean(),
+        "conf_avg": section_df.groupby(conf).mean(),
+        "league_norm": normalized.mean(skipna=True).tolist(),
+        "league_avg": section_df.mean(),
+        "col_min": section_df.min(skipna=True),
+        "col_max": section_df.max(skipna=True),
+    }
+
+
+def breakdown_section_figure(df, team, section_cols, section_title, ctx=None, registry=None, ranks=None):
+    """
+    Team vs conference vs league line chart (normalized) for one Team Breakdown
+    section. Hover ranks come from `ranks` (one row per df row, as
+    resolved_ranks returns; default_ranks when not given).
+    """
+    if ctx is None:
+        ctx = section_context(df, section_cols)
+    registry = registry if registry is not None else TeamRegistry(df["Teams"])
+    ranks = ranks if ranks is not None else default_ranks(df)
+    pos = registry.row(df, team)
+    team_data = df.iloc[pos]
+    team_ranks = ranks.iloc[pos]
+    team_conf = team_data.get("Conference", None)
+    team_conf = None if pd.isna(team_conf) else str(team_conf)
+
+    team_norm = ctx["normalized"].iloc[pos].tolist()
+    conf_norm = ctx["conf_norm"].loc[team_conf].tolist() if team_conf in ctx["conf_norm"].index else None
+
+    # Hover texts
+    hover_texts = []
+    for key, label in section_cols.items():
+        val = team_data.get(key, float("nan"))
+        rank_val = format_rank(team_ranks.get(key))
+        conf_avg = ctx["conf_avg"].at[team_conf, key] if team_conf in ctx["conf_avg"].index else float("nan")
+        hover_texts.append(
+            f"<b>{label}</b><br>"
+            f"{team}: {format_value(key, val)} (Rank: {rank_val})<br>"
+            f"Min: {format_value(key, ctx['col_min'][key])} — Max: {format_value(key, ctx['col_max'][key])}<br>"
+            f"{team_conf + ' Avg' if team_conf else 'Conf Avg'}: {format_value(key, conf_avg)}<br>"
+            f"League Avg: {format_value(key, ctx['league_avg'][key])}"
+        )
+
+    labels = list(section_cols.values())
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=labels, y=team_norm, mode="lines+markers",
+                             name=team, hoverinfo="text", hovertext=hover_texts))
+    if conf_norm is not None:
+        fig.add_trace(go.Scatter(x=labels, y=conf_norm, mode="lines+markers",
+                                 name=f"{team_conf} Avg", line=dict(dash="dash")))
+    fig.add_trace(go.Scatter(x=labels, y=ctx["league_norm"], mode="lines+markers",
+                             name="League Avg", line=dict(dash="dot")))
+
+    fig.update_layout(title=f"{section_title} Comparison (Normalized)",
+                      yaxis=dict(showticklabels=False, showgrid=False, zeroline=False, range=[0, 1]),
+                      xaxis=dict(tickangle=45),
+                      plot_bgcolor="white",
+                      margin=dict(t=60, b=120))
+    return fig
+
+
+def clutch_shooting_figure(team_data, team):
+    """Season vs clutch shooting bars (season % stored as 0-1, clutch % already in percent)."""
+    shooting_stats = ["FG%", "3PT%", "FT%"]
+    season_values = [team_data[c] * 100 for c in ("FG_PERC", "FG3_PERC", "FT_PERC")]
+    clutch_values = [team_data[c] for c in ("CLUTCH_FGPERC", "CLUTCH_3FGPERC", "CLUTCH_FTPERC")]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=shooting_stats, y=season_values, name="Season", marker_color="lightblue"))
+    fig.add_trace(go.Bar(x=shooting_stats, y=clutch_values, name="Clutch", marker_color="orange"))
+    fig.update_layout(
+        barmode="group",
+        title=f"{team} Shooting: Season vs Clutch",
+        yaxis=dict(title="Percentage"),
+        template="plotly_white"
+    )
+    return fig
+
+
+def team_figures(df, team, contexts=None, registry=None, ranks=None):
+    """Every pre-renderable figure for one team as {figure key: plotly JSON}."""
+    if contexts is None:
+        contexts = {title: section_context(df, cols) for title, cols in sections.items()}
+    registry = registry if registry is not None else TeamRegistry(df["Teams"])
+    ranks = ranks if ranks is not None else default_ranks(df)
+    out = {}
+    for title, cols in sections.items():
+        if all(k in df.columns for k in cols):
+            fig = breakdown_section_figure(df, team, cols, title, contexts[title], registry, ranks)
+            out[f"breakdown.{title}"] = fig.to_json()
+    team_data = registry.team_row(df, team)
+    try:
+        out[CLUTCH_SHOOTING] = clutch_shooting_figure(team_data, team).to_json()
+    except (KeyError, TypeError):
+        pass  # season without clutch columns
+    return out
+
+
+# -----------------------
+# Disk / LRU cache: .cache/figures-<version>-<rank source>/<team>.json
+# -----------------------
+DEFAULT_RANKS = rank_scope_key()   # the rank source figures are pre-rendered with
+
+
+def figures_dir(version, rank_key=DEFAULT_RANKS):
+    return os.path.join(CACHE_DIR, f"figures-{version}-{rank_key}")
+
+
+def team_slug(team):
+    """File-safe team name; the hash suffix keeps 'St. Mary's' and 'St Marys' apart."""
+    base = re.sub(r"[^A-Za-z0-9]+", "_", str(team)).strip("_")
+    return f"{base}-{hashlib.sha1(str(team).encode()).hexdigest()[:6]}"
+
+
+def team_figures_path(version, team, rank_key=DEFAULT_RANKS):
+    return os.path.join(figures_dir(version, rank_key), f"{team_slug(team)}.json")
+
+
+def _write_json(path, payload):
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"   # one per writer thread
+    with open(tmp, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)  # atomic: readers never see a half-written file
+
+
+@lru_cache(maxsize=LRU_TEAMS)
+def _read_team_figures(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def get_team_figure(df, version, team, key, registry=None, ranks=None, rank_key=DEFAULT_RANKS):
+    """
+    One pre-rendered figure (plotly JSON string) for a team. Served from the
+    in-process LRU, then disk; only a missing (or unreadable) file renders that
+    team's figures inline, and they are stored once so the next request is a
+    hit. Returns None if the figure does not apply (e.g. no clutch columns);
+    that answer is stored too. `ranks` / `rank_key` are the page's resolved
+    ranks and their rank_scope_key, used for the hover text.
+    """
+    path = team_figures_path(version, team, rank_key) if version is not None else None
+    if path is not None and os.path.exists(path):
+        try:
+            return _read_team_figures(path).get(key)
+        except (OSError, ValueError):
+            pass  # partial / corrupt file -> re-render
+    figs = team_figures(df, team, registry=registry, ranks=ranks)
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_json(path, figs)
+    return figs.get(key)
+
+
+def figure_from_json(fig_json):
+    return pio.from_json(fig_json, skip_invalid=True)
+
+
+# -----------------------
+# Batch renderer (process pool)
+# -----------------------
+_worker_df = None
+_worker_contexts = None
+_worker_registry = None
+_worker_ranks = None
+
+
+def _init_worker(df, ranks):
+    global _worker_df, _worker_contexts, _worker_registry, _worker_ranks
+    _worker_df = df
+    _worker_contexts = {title: section_context(df, cols) for title, cols in sections.items()}
+    _worker_registry = TeamRegistry(df["Teams"])
+    _worker_ranks = ranks
+
+
+def _render_chunk(version, teams):
+    for team in teams:
+        figs = team_figures(_worker_df, team, _worker_contexts, _worker_registry, _worker_ranks)
+        _write_json(team_figures_path(version, team), figs)
+    return len(teams)
+
+
+def prerender_team_figures(df, version, workers=None):
+    """
+    Render and store every team's figures for one data version in a process
+    pool (spawned workers: safe to call from the Streamlit server's threads).
+    Teams already on disk are skipped. Returns the number of teams rendered.
+    Hover ranks are the default rank source (default_ranks, computed once here).
+    """
+    os.makedirs(figures_dir(version), exist_ok=True)
+    teams = [t for t in df["Teams"].dropna().unique().tolist()
+             if not os.path.exists(team_figures_path(version, t))]
+    if not teams:
+        return 0
+    chunks = [teams[i:i + TEAMS_PER_TASK] for i in range(0, len(teams), TEAMS_PER_TASK)]
+    ranks = default_ranks(df)
+    workers = workers or min(len(chunks), os.cpu_count() or 1)
+    if workers <= 1:
+        _init_worker(df, ranks)
+        return sum(_render_chunk(version, c) for c in chunks)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(df, ranks)) as pool:
+        return sum(pool.map(_render_chunk, [version] * len(chunks), chunks))
+
+
+_started = set()
+_started_lock = threading.Lock()
+
+
+def prerender_in_background(df, version, workers=None):
+    """Kick off prerender_team_figures once per version on a daemon thread."""
+    with _started_lock:
+        if version is None or version in _started:
+            return
+        _started.add(version)
+
+    def run():
+        try:
+            n = prerender_team_figures(df, version, workers)
+            log.info("pre-rendered figures for %d teams (version %s)", n, version)
+        except Exception:
+            log.exception("figure pre-render failed for version %s", version)
+            with _started_lock:
+                _started.discard(version)
+
+    threading.Thread(target=run, name=f"figures-{version}", daemon=True).start()
+
+
+# -----------------------
+# Static per-team reports
+# -----------------------
+def write_team_reports(df, version, out_dir):
+    """One static HTML page per team (all its figures) plus an index.html. Returns the index path."""
+    prerender_team_figures(df, version)
+    os.makedirs(out_dir, exist_ok=True)
+    links = []
+    for team in sorted(df["Teams"].dropna().unique().tolist()):
+        figs = _read_team_figures(team_figures_path(version, team))
+        body = [f"<h1>{html.escape(str(team))}</h1>"]
+        for i, key in enumerate(k for k in FIGURE_KEYS if k in figs):
+            body.append(pio.to_html(figure_from_json(figs[key]), full_html=False,
+                                    include_plotlyjs="cdn" if i == 0 else False))
+        name = f"{team_slug(team)}.html"
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            f.write("<!DOCTYPE html><html><head><meta charset='utf-8'>"
+                    f"<title>{html.escape(str(team))} - March Metrics</title></head><body>"
+                    + "\n".join(body) + "</body></html>")
+        links.append(f"<li><a href='{name}'>{html.escape(str(team))}</a></li>")
+    index = os.path.join(out_dir, "index.html")
+    with open(index, "w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html><html><head><meta charset='utf-8'><title>March Metrics team reports</title>"
+                "</head><body><h1>Team reports</h1><ul>" + "\n".join(links) + "</ul></body></html>")
+    return index
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.figures [--season 2025] [--workers 4] [--html reports/]
+    from common.seasons import CURRENT_SEASON, load_table, table_version
+
+    parser = argparse.ArgumentParser(description="Pre-render every team's figures for one season.")
+    parser.add_argument("--season", type=int, default=CURRENT_SEASON)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--html", default=None, help="also write static per-team HTML reports here")
+    args = parser.parse_args()
+
+    version = table_version("all_stats", args.season)
+    frame = load_table("all_stats", args.season, version=version)
+    print(f"rendered {prerender_team_figures(frame, version, args.workers)} teams -> {figures_dir(version)}")
+    if args.html:
+        print(f"reports: {write_team_reports(frame, version, args.html)}")
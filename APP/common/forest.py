@@ -0,0 +1,176 @@
+# common/forest.py
+import argparse
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+# A fitted RandomForest flattened into one set of node arrays (every tree
+# back to back) plus a NumPy traversal that moves all rows down all trees at
+# once. Leaves point to themselves, so the loop runs a fixed max-depth number
+# of steps with no per-row branching. Results are bit-for-bit equal to the
+# pipeline's predict_proba: the same float32 inputs, the same leaf
+# normalisation and the same tree-by-tree sum.
+ROW_BLOCK = 1024   # rows per traversal pass; bounds the (rows, trees) index arrays and keeps them in cache
+
+
+class CompiledForest:
+    """
+    Array form of a fitted scaler (+ RandomForestClassifier) pipeline.
+    predict_proba(X) takes the same raw features as the pipeline.
+    """
+
+    def __init__(self, arrays, pre=None):
+        self.arrays = arrays   # plain arrays: storable with common/arrays.save_arrays when pre is None
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        # child of node i is children[2 * i + went_right]: one gather per step instead of two plus a select
+        self.children = np.stack([self.left, self.right], axis=1).ravel()
+        self.missing_left = arrays["missing_left"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.depth = int(arrays["depth"][0])
+        self.mean = arrays.get("mean")
+        self.scale = arrays.get("scale")
+        self.pre = pre   # any other fitted preprocessing step (e.g. PCA), applied as-is
+
+    # -----------------------
+    # Build
+    # -----------------------
+    @classmethod
+    def from_pipeline(cls, model):
+        """Compile a fitted RandomForestClassifier, or a Pipeline ending in one."""
+        steps = [s for _, s in model.steps] if hasattr(model, "steps") else [model]
+        forest = steps[-1]
+        if not isinstance(forest, RandomForestClassifier):
+            raise TypeError(f"expected a RandomForestClassifier, got {type(forest).__name__}")
+        arrays = cls.forest_arrays(forest)
+        pre = steps[:-1]
+        if pre and isinstance(pre[0], StandardScaler):
+            scaler = pre.pop(0)
+            n = scaler.n_features_in_
+            arrays["mean"] = scaler.mean_ if scaler.with_mean else np.zeros(n)
+            arrays["scale"] = scaler.scale_ if scaler.with_std else np.ones(n)
+        return cls(arrays, pre or None)
+
+    @staticmethod
+    def forest_arrays(forest):
+        """Node arrays of every tree, concatenated; child indices are offset into the flat arrays."""
+        parts = {k: [] for k in ("feature", "threshold", "left", "right", "missing_left", "value")}
+        roots, offset, depth = [], 0, 0
+        for est in forest.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            leaf = tree.children_left < 0
+            own = np.arange(offset, offset + n)
+            # leaves loop onto themselves (feature 0, threshold +inf), so extra steps are no-ops
+            parts["feature"].append(np.where(leaf, 0, tree.feature))
+            parts["threshold"].append(np.where(leaf, np.inf, tree.threshold))
+            parts["left"].append(np.where(leaf, own, tree.children_left + offset))
+            parts["right"].append(np.where(leaf, own, tree.children_right + offset))
+            parts["missing_left"].append(np.asarray(tree.missing_go_to_left, dtype=bool))
+            # DecisionTreeClassifier.predict_proba: leaf value / its row sum (0 -> 1)
+            value = tree.value[:, 0, :]
+            normalizer = value.sum(axis=1)
+            normalizer[normalizer == 0.0] = 1.0
+            parts["value"].append(value / normalizer[:, None])
+            roots.append(offset)
+            offset += n
+            depth = max(depth, tree.max_depth)
+        arrays = {k: np.concatenate(v) for k, v in parts.items()}
+        arrays["feature"] = arrays["feature"].astype(np.intp)
+        arrays["left"] = arrays["left"].astype(np.intp)
+        arrays["right"] = arrays["right"].astype(np.intp)
+        arrays["roots"] = np.asarray(roots, dtype=np.intp)
+        arrays["depth"] = np.asarray([depth])
+        return arrays
+
+    # -----------------------
+    # Inference
+    # -----------------------
+    def transform(self, X):
+        """Raw features -> the float32 matrix the trees compare against (as the pipeline does)."""
+        X = np.asarray(X, dtype=float)
+        if self.mean is not None:
+            X = (X - self.mean) / self.scale
+        if self.pre is not None:
+            for step in self.pre:
+                X = step.transform(X)
+        return np.asarray(X, dtype=np.float32)
+
+    def leaf_nodes(self, X32):
+        """(rows, trees) flat index of the leaf each row reaches in each tree."""
+        n, n_features = X32.shape
+        flat = X32.ravel()
+        row_start = (np.arange(n) * n_features)[:, None]
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+        has_nan = np.isnan(X32).any()
+        for _ in range(self.depth):
+            x = flat[row_start + self.feature[node]]
+            go_right = ~(x <= self.threshold[node])
+            if has_nan:
+                go_right &= ~(np.isnan(x) & self.missing_left[node])
+            node = self.children[2 * node + go_right]
+        return node
+
+    def predict_proba(self, X, block=ROW_BLOCK):
+        """(rows, classes) probabilities, the same values as the source pipeline's predict_proba."""
+        X32 = self.transform(X)
+        proba = np.empty((len(X32), self.value.shape[1]))
+        for start in range(0, len(X32), block):
+            leaves = self.value[self.leaf_nodes(X32[start:start + block]).T]   # (trees, rows, classes)
+            # trees summed one at a time, in order, then divided: the forest's own accumulation
+            total = np.zeros(leaves.shape[1:])
+            for tree_proba in leaves:
+                total += tree_proba
+            proba[start:start + block] = total / len(leaves)
+        return proba
+
+
+def compile_forest(model):
+    """CompiledForest for a fitted pipeline (None passes through)."""
+    return None if model is None else CompiledForest.from_pipeline(model)
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.forest  -> fit the Schedule Predictor's model, compile it,
+    # check it against predict_proba and time single-game and batch scoring
+    from common.predictor import train_model
+    from common.seasons import CURRENT_SEASON, load_table
+    from common.teams import get_team_registry
+
+    parser = argparse.ArgumentParser(description="Compile the RandomForest predictor and benchmark it.")
+    parser.add_argument("--season", type=int, default=CURRENT_SEASON)
+    parser.add_argument("--repeat", type=int, default=200, help="single-row calls to time")
+    args = parser.parse_args()
+
+    registry = get_team_registry()
+    model, _, team_matrix, _, _, warning = train_model(load_table("all_stats", args.season),
+                                                       load_table("history", args.season), ("forest-cli",), registry)
+    if model is None:
+        raise SystemExit(warning or "no model")
+    started = time.perf_counter()
+    compiled = compile_forest(model)
+    print(f"compiled {len(compiled.roots)} trees, {len(compiled.value):,} nodes, depth {compiled.depth} "
+          f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def timed(fn, X, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            out = fn(X)
+        return out, (time.perf_counter() - started) / repeat
+
+    values = team_matrix.to_numpy()
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>7} {'predict_proba':>14} {'compiled':>10} {'speedup':>8} {'compiled rows/s':>16}  identical")
+    for n in (1, 10, 100, 1000, 20000):
+        X = values[rng.integers(0, len(values), n)] - values[rng.integers(0, len(values), n)]
+        repeat = max(1, args.repeat // n)
+        (ref, sk), (got, fast) = timed(model.predict_proba, X, repeat), timed(compiled.predict_proba, X, repeat)
+        print(f"{n:>7,} {sk * 1e3:>11.2f} ms {fast * 1e3:>7.2f} ms {sk / fast:>7.1f}x {n / fast:>16,.0f}  "
+              f"{np.array_equal(ref, got)}")
+    X[rng.random(X.shape) < 0.05] = np.nan
+    print(f"with 5% missing values: identical={np.array_equal(model.predict_proba(X), compiled.predict_proba(X))}")
@@ -0,0 +1,54 @@
+# common/frames.py
+import numpy as np
+import pandas as pd
+
+from common.features import is_rank_col
+
+# label columns repeated across hundreds of rows
+CATEGORY_COLS = ("Teams", "Conference", "Coach Name")
+
+
+def enable_copy_on_write():
+    """
+    Cached frames are shared by every session (st.cache_resource), so a page
+    that assigns into one must get its own copy rather than edit everyone's.
+    pandas >= 3 always behaves this way; older versions need the option.
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        try:
+            pd.set_option("mode.copy_on_write", True)
+        except (KeyError, ValueError):
+            pass  # pandas < 2.0 has no copy-on-write mode
+
+
+def compact_team_frame(df):
+    """
+    Smaller dtypes for an All_stats-shaped frame (same columns, same values):
+      - Teams / Conference / Coach Name -> category
+      - whole-number rank columns -> Int16 (nullable; 'N/A' / blank -> <NA>)
+      - other integer columns -> smallest int that fits
+      - rates / averages -> float32 ('N/A', dashes and other text -> NaN)
+    """
+    out = {}
+    for c in df.columns:
+        col = df[c]
+        if c in CATEGORY_COLS:
+            out[c] = col.astype("category")
+            continue
+        num = pd.to_numeric(col, errors="coerce")
+        if num.isna().all() and col.notna().any():
+            out[c] = col  # genuinely textual column; leave as-is
+        elif num.dtype.kind in "iu":
+            out[c] = pd.to_numeric(num, downcast="integer")
+        elif is_rank_col(c) and num.notna().any() and (num.dropna() % 1 == 0).all() and num.abs().max() < 2**15:
+            out[c] = num.astype("Int16")
+        elif num.dtype.kind == "f":
+            out[c] = num.astype(np.float32)
+        else:
+            out[c] = num
+    return pd.DataFrame(out, index=df.index)
+
+
+def frame_bytes(df):
+    """Deep memory footprint of a frame in bytes."""
+    return int(df.memory_usage(deep=True).sum())
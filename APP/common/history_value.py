@@ -0,0 +1,175 @@
+# common/history_value.py
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from common.cache import file_version, pinned_source
+from common.databook import DATABOOK_SEASON, parse_sheet, read_manifest, sheet_table
+from common.seasons import load_table, table_version
+
+HISTORY_TABLE_PATH = "Data/2025_March_Madness_Databook/Historical Value-Table 1.csv"
+HISTORY_SHEET = "Historical Value"
+HISTORY_TABLE = sheet_table(HISTORY_SHEET)   # season-store table (common/databook.py)
+VALUE_COL = "Program Value"                  # table column and model feature name
+SHEET_VALUE_COL = "Value"                    # the sheet's own value, kept for comparison
+# the sheet's Value is SHEET_OFFSET + SHEET_SCALE * (inputs . weights) over every weighted
+# column except SHEET_UNWEIGHTED (weights in the header row the formula does not use);
+# this reproduces it to its 3-decimal rounding in every year of the 2025 Databook
+SHEET_SCALE = 0.4
+SHEET_OFFSET = 8.0
+SHEET_UNWEIGHTED = ("Consecutive seasons above .500 (MAX 5)", "Mid Major above 500 years")
+VALUE_VERSION = 2   # bump when the value formula changes; keys the stored predictor arrays
+
+
+# -----------------------
+# Parse
+# -----------------------
+def _tidy(frame):
+    """
+    Leading unnamed column -> 'Team'; 'Year' as a full year. Each row is a
+    program entering that season (the sheet writes the upcoming one as '26').
+    """
+    frame = frame.rename(columns={frame.columns[0]: "Team"})
+    frame = frame[frame["Team"].notna()].reset_index(drop=True)
+    year = pd.to_numeric(frame["Year"], errors="coerce")
+    return frame.assign(Year=year.where(year >= 1000, year + 2000).astype("Int16"))
+
+
+def _numeric_weights(weights, frame):
+    """
+    The preamble row also labels the text 'March Location' columns with their
+    year; only weights over numeric inputs are coefficients.
+    """
+    weights = pd.Series(weights, dtype=float)
+    keep = [c for c in weights.index
+            if c in frame.columns and pd.api.types.is_numeric_dtype(frame[c]) and not pd.api.types.is_bool_dtype(frame[c])]
+    return weights[keep]
+
+
+def parse_history_table(path=HISTORY_TABLE_PATH):
+    """(team-year rows, weights) from the Databook export; the weights are the numeric row above the header."""
+    frame, info = parse_sheet(path)
+    frame = _tidy(frame)
+    weights = info["coefficients"][0] if info["coefficients"] else {}
+    return frame, _numeric_weights(weights, frame)
+
+
+def _table_season(season):
+    """
+    Databook season whose table covers `season`: its own partition when one
+    is stored, else the current Databook (it holds several years of rows).
+    """
+    return int(season) if table_version(HISTORY_TABLE, season) is not None else DATABOOK_SEASON
+
+
+def load_history_table(season=DATABOOK_SEASON, path=HISTORY_TABLE_PATH, version=None):
+    """
+    (rows, weights) for the table covering `season`: the live export (the copy
+    pinned to `version` when given), else the season-store partition with the
+    weights from the ingest manifest.
+    """
+    season = _table_season(season)
+    if season == DATABOOK_SEASON and os.path.exists(path):
+        return parse_history_table(pinned_source(path, version))
+    frame = _tidy(load_table(HISTORY_TABLE, season))  # FileNotFoundError when not ingested
+    entry = read_manifest()["sheets"].get(HISTORY_SHEET, {})
+    coefficients = entry.get("coefficients") or [{}]
+    return frame, _numeric_weights(coefficients[0], frame)
+
+
+def history_version(season, data_versions=None, path=HISTORY_TABLE_PATH):
+    """Cache key for the Historical Value table covering `season` (None when there is none)."""
+    season = _table_season(season)
+    if season == DATABOOK_SEASON and os.path.exists(path):
+        return data_versions.version("historical_value") if data_versions is not None else file_version(path)
+    return table_version(HISTORY_TABLE, season)
+
+
+# -----------------------
+# Value (every team and year at once)
+# -----------------------
+def program_values(frame, weights):
+    """
+    Program value for every team-year row in one matrix product: inputs
+    (missing -> 0, as the sheet treats blanks) times the weights, on the
+    sheet's scale (SHEET_OFFSET + SHEET_SCALE * sum, without SHEET_UNWEIGHTED),
+    so it equals the sheet's Value. Returns (value, contributions); rows with
+    none of the inputs filled are NaN.
+    """
+    weights = weights.drop(list(SHEET_UNWEIGHTED), errors="ignore")
+    cols = list(weights.index)
+    X = frame[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    contributions = SHEET_SCALE * np.nan_to_num(X) * weights.to_numpy(dtype=float)
+    value = np.where(np.isnan(X).all(axis=1), np.nan, SHEET_OFFSET + contributions.sum(axis=1))
+    return (pd.Series(value, index=frame.index, name=VALUE_COL),
+            pd.DataFrame(contributions, index=frame.index, columns=cols))
+
+
+def program_value_table(frame, weights):
+    """Team, Year, value, rank / percentile within its year and the largest factor, for every row."""
+    value, contributions = program_values(frame, weights)
+    by_year = value.groupby(frame["Year"])
+    table = pd.DataFrame({
+        "Team": frame["Team"].astype(str),
+        "Year": frame["Year"],
+        VALUE_COL: value,
+        "Rank": by_year.rank(ascending=False, method="min").astype("Int16"),
+        "Percentile": (by_year.rank(pct=True) * 100).round(1),
+        "Top factor": contributions.idxmax(axis=1).where(value.notna()),
+        "Sheet " + SHEET_VALUE_COL: (pd.to_numeric(frame[SHEET_VALUE_COL], errors="coerce")
+                                     if SHEET_VALUE_COL in frame.columns else np.nan),
+    })
+    return table.sort_values(["Year", "Rank", "Team"], ascending=[False, True, True],
+                             na_position="last").reset_index(drop=True)
+
+
+# -----------------------
+# Shared table + lookups by team ID
+# -----------------------
+@st.cache_resource(max_entries=4)
+def load_program_values(season, version):
+    """Program values for every team-year in one season's table version (shared read-only), or None."""
+    if version is None:
+        return None
+    try:
+        return program_value_table(*load_history_table(season, version=version))
+    except (FileNotFoundError, KeyError):
+        return None
+
+
+def program_value_by_id(table, registry, year):
+    """
+    Program value per team ID entering `year` (NaN for programs without a
+    row). The array form bracket simulations and the predictor index into.
+    """
+    by_id = np.full(len(registry), np.nan)
+    if table is None:
+        return by_id
+    rows = table[table["Year"] == int(year)]
+    ids = registry.ids(rows["Team"], source="historical_value.Team")
+    ok = ids >= 0
+    by_id[ids[ok]] = rows[VALUE_COL].to_numpy(dtype=float)[ok]
+    return by_id
+
+
+def with_program_value(df_all, table, registry, year):
+    """
+    df_all plus a 'Program Value' column (entering `year`) joined by team ID
+    (NaN for programs without a row; the feature builder fills those with the median).
+    """
+    if table is None:
+        return df_all
+    by_id = program_value_by_id(table, registry, year)
+    team_ids = registry.ids(df_all["Teams"])
+    return df_all.assign(**{VALUE_COL: np.where(team_ids >= 0, by_id[np.maximum(team_ids, 0)], np.nan)})
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.history_value  -> top programs per year + agreement with the sheet
+    table = load_program_values(DATABOOK_SEASON, history_version(DATABOOK_SEASON))
+    for year, rows in table.groupby("Year", sort=False):
+        off = (rows[VALUE_COL] - rows["Sheet " + SHEET_VALUE_COL]).abs().max()
+        print(f"\n{year}: {rows[VALUE_COL].notna().sum()} programs, max |value - sheet Value| {off:.4f}")
+        print(rows.head(10).to_string(index=False))
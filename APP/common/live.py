@@ -0,0 +1,384 @@
+# common/live.py
+import argparse
+import csv
+import io
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.seasons import CURRENT_SEASON, STORE_DIR
+
+log = logging.getLogger(__name__)
+
+# one completed game per line, appended as results come in
+RESULTS_COLUMNS = ["Day", "Home", "Away", "Home_Points", "Away_Points"]
+
+K_LOGIT = 0.15        # rating step per game (log-odds units) before the margin multiplier
+MOV_REF = 10          # a 10-point margin gets multiplier 1.0; blowouts grow logarithmically
+ROLLING_GAMES = 5     # window for the rolling form columns
+N_SIMS = 2000
+SIM_BATCH = 500       # simulations drawn per batch (bounds the random matrix size)
+
+
+def results_log_path(season=CURRENT_SEASON):
+    """Append-only results log, kept next to the season partitions."""
+    return os.path.join(STORE_DIR, "table=results", f"season={int(season)}", "log.csv")
+
+
+def append_results(results, season=CURRENT_SEASON):
+    """
+    Append completed games (rows with RESULTS_COLUMNS) to the season's log.
+    Only whole lines are written, so a concurrent reader never sees half a game.
+    """
+    path = results_log_path(season)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = pd.DataFrame(results)[RESULTS_COLUMNS]
+    buf = io.StringIO()
+    rows.to_csv(buf, index=False, header=not os.path.exists(path) or os.path.getsize(path) == 0,
+                quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(buf.getvalue())
+    return len(rows)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _logit(p):
+    p = np.clip(np.asarray(p, dtype=float), 1e-4, 1 - 1e-4)
+    return np.log(p / (1 - p))
+
+
+class LiveSeason:
+    """
+    Incrementally updated season state on top of the pre-season predictions.
+
+    Each team carries a rating adjustment (log-odds) that starts at 0, so before
+    any result the live probability of a game equals the model's prediction.
+    Every completed game updates standings, rolling form and the two teams'
+    adjustments in O(1). Only the remaining games of affected teams are
+    re-scored. Readers get `snapshot()`, an immutable dict that is swapped in
+    whole, so refreshes never block a page.
+
+    With a TeamRegistry (common/teams.py), schedule and result names are
+    resolved to canonical names, so 'UConn' in the results log is the
+    schedule's 'Connecticut'. Results naming a team outside the schedule are
+    skipped and listed in the snapshot ('unmatched'), not counted as applied.
+    """
+
+    def __init__(self, schedule_pred, conferences=None, season=CURRENT_SEASON, seed=0, registry=None):
+        sched = schedule_pred.reset_index(drop=True)
+        self.season = season
+        self.path = results_log_path(season)
+        self.seed = seed
+        self.registry = registry
+
+        home_names = self._team_names(sched["Home"], "schedule.Home/Away")
+        away_names = self._team_names(sched["Away"], "schedule.Home/Away")
+        teams = pd.Index(sorted(pd.unique(np.concatenate([home_names, away_names]))))
+        conferences = conferences or {}
+        self.teams = teams
+        self.conf = np.array([conferences.get(t) for t in teams], dtype=object)
+
+        # schedule arrays
+        self.day = sched["Day"].to_numpy(dtype=int) if "Day" in sched.columns else np.full(len(sched), -1)
+        self.home = teams.get_indexer(home_names)
+        self.away = teams.get_indexer(away_names)
+        self.is_conf = (sched["Conference_Game"].astype(bool).to_numpy() if "Conference_Game" in sched.columns
+                        else np.zeros(len(sched), dtype=bool))
+        base = sched["Prob_Home_Win"].to_numpy(dtype=float) if "Prob_Home_Win" in sched.columns else np.full(len(sched), 0.5)
+        self.base_logit = _logit(base)
+        self.live_prob = base.copy()
+        self.played = np.zeros(len(sched), dtype=bool)
+        self.game_index = {(d, h, a): i for i, (d, h, a) in enumerate(zip(self.day, self.home, self.away))}
+
+        # per-team state
+        n = len(teams)
+        self.rating = np.zeros(n)
+        self.wins = np.zeros(n, dtype=int)
+        self.losses = np.zeros(n, dtype=int)
+        self.conf_wins = np.zeros(n, dtype=int)
+        self.conf_losses = np.zeros(n, dtype=int)
+        self.points_for = np.zeros(n, dtype=int)
+        self.points_against = np.zeros(n, dtype=int)
+        self.streak = np.zeros(n, dtype=int)            # +3 = won three straight, -2 = lost two
+        self.recent = np.zeros((n, ROLLING_GAMES))       # ring buffer of recent margins
+        self.recent_n = np.zeros(n, dtype=int)
+
+        self._offset = 0
+        self._applied = 0
+        self._unmatched = []   # results skipped because a team is not in the schedule
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._sim_thread = None
+        self._publish(projections=None, rescored=0)
+
+    # -----------------------
+    # Incremental updates
+    # -----------------------
+    def _team_names(self, values, source):
+        """Canonical names through the registry (raw name where it has none), else the stripped raw names."""
+        raw = pd.Series(values).astype(str).str.strip().to_numpy(dtype=object)
+        if self.registry is None:
+            return raw
+        canonical = self.registry.canonical(raw, source=source)
+        return np.where(pd.isna(canonical), raw, canonical).astype(object)
+
+    def _team_index(self, values, source):
+        """Index into self.teams per name (-1 where the team is not in the schedule)."""
+        return self.teams.get_indexer(self._team_names(values, source))
+
+    def _apply_game(self, day, h, a, home_pts, away_pts):
+        """Fold one completed game (team indices) into the state. Returns the team indices it touched."""
+        g = self.game_index.get((int(day), h, a))
+        is_conf = bool(self.is_conf[g]) if g is not None else (self.conf[h] is not None and self.conf[h] == self.conf[a])
+        margin = home_pts - away_pts
+        home_won = margin > 0
+
+        # rating: move both teams toward the result, scaled by the margin
+        prior = self.base_logit[g] if g is not None else 0.0
+        p = _sigmoid(prior + self.rating[h] - self.rating[a])
+        step = K_LOGIT * np.log1p(abs(margin)) / np.log1p(MOV_REF) * (float(home_won) - p)
+        self.rating[h] += step
+        self.rating[a] -= step
+
+        # standings / rolling form
+        for t, won, pf, pa in ((h, home_won, home_pts, away_pts), (a, not home_won, away_pts, home_pts)):
+            self.wins[t] += won
+            self.losses[t] += not won
+            if is_conf:
+                self.conf_wins[t] += won
+                self.conf_losses[t] += not won
+            self.points_for[t] += pf
+            self.points_against[t] += pa
+            self.streak[t] = (max(self.streak[t], 0) + 1) if won else (min(self.streak[t], 0) - 1)
+            self.recent[t, self.recent_n[t] % ROLLING_GAMES] = pf - pa
+            self.recent_n[t] += 1
+
+        if g is not None:
+            self.played[g] = True
+        return (h, a)
+
+    def _rescore(self, affected):
+        """Recompute live probabilities for remaining games involving the affected teams."""
+        if not affected:
+            return 0
+        touched = np.zeros(len(self.teams), dtype=bool)
+        touched[list(affected)] = True
+        ok = (self.home >= 0) & (self.away >= 0)
+        mask = ~self.played & ok
+        mask[ok] &= touched[self.home[ok]] | touched[self.away[ok]]
+        idx = np.flatnonzero(mask)
+        self.live_prob[idx] = _sigmoid(self.base_logit[idx] + self.rating[self.home[idx]] - self.rating[self.away[idx]])
+        return len(idx)
+
+    def _read_new_results(self):
+        """Rows appended to the log since the last read (whole lines only)."""
+        if not os.path.exists(self.path):
+            return None
+        size = os.path.getsize(self.path)
+        if size < self._offset:
+            return "truncated"
+        if size == self._offset:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        end = chunk.rfind(b"\n") + 1  # ignore a trailing partial line until it is finished
+        if end == 0:
+            return None
+        text = chunk[:end].decode("utf-8")
+        header = self._offset == 0
+        self._offset += end
+        rows = pd.read_csv(io.StringIO(text), header=0 if header else None,
+                           names=None if header else RESULTS_COLUMNS)
+        return rows
+
+    def refresh(self, simulate=True, background=True):
+        """
+        Apply results appended since the last call, re-score affected games and
+        publish a new snapshot; then re-run the season simulation (on a thread
+        when background=True). Returns the number of results applied.
+        """
+        with self._lock:
+            rows = self._read_new_results()
+            if isinstance(rows, str):  # log was rewritten: rebuild from scratch
+                log.info("results log truncated; replaying from the start")
+                self.__dict__.update(self._initial_state())
+                rows = self._read_new_results()
+            if rows is None or rows.empty:
+                return 0
+            started = time.perf_counter()
+            home = self._team_index(rows["Home"], "results.Home/Away")
+            away = self._team_index(rows["Away"], "results.Home/Away")
+            known = (home >= 0) & (away >= 0)
+            if not known.all():
+                skipped = rows.loc[~known, RESULTS_COLUMNS]
+                self._unmatched.append(skipped)
+                log.warning("%d results name teams outside the schedule and were skipped: %s", len(skipped),
+                            ", ".join(f"{r.Home} vs {r.Away}" for r in skipped.itertuples(index=False)))
+            affected = set()
+            for r, h, a in zip(rows[known].itertuples(index=False), home[known], away[known]):
+                affected.update(self._apply_game(r.Day, h, a, int(r.Home_Points), int(r.Away_Points)))
+            applied = int(known.sum())
+            self._applied += applied
+            rescored = self._rescore(affected)
+            self._publish(projections=self._snapshot["projections"], rescored=rescored)
+            log.info("applied %d results, re-scored %d games in %.3fs",
+                     applied, rescored, time.perf_counter() - started)
+        if simulate and applied:
+            if background:
+                self.simulate_async()
+            else:
+                self._run_simulation()
+        return applied
+
+    def _initial_state(self):
+        """Clean copy of the pre-result state (used when the log is rewritten)."""
+        state = dict(self.__dict__)
+        n = len(self.teams)
+        state.update(
+            live_prob=_sigmoid(self.base_logit), played=np.zeros(len(self.day), dtype=bool),
+            rating=np.zeros(n), wins=np.zeros(n, dtype=int), losses=np.zeros(n, dtype=int),
+            conf_wins=np.zeros(n, dtype=int), conf_losses=np.zeros(n, dtype=int),
+            points_for=np.zeros(n, dtype=int), points_against=np.zeros(n, dtype=int),
+            streak=np.zeros(n, dtype=int), recent=np.zeros((n, ROLLING_GAMES)),
+            recent_n=np.zeros(n, dtype=int), _offset=0, _applied=0, _unmatched=[],
+        )
+        return state
+
+    # -----------------------
+    # Season simulation
+    # -----------------------
+    def simulate(self, n_sims=N_SIMS):
+        """
+        Monte Carlo of the remaining schedule from the current standings.
+        Returns per-team projected wins (mean / p10 / p90) and the chance of
+        finishing first in conference play (ties split).
+        """
+        with self._lock:
+            remaining = np.flatnonzero(~self.played & (self.home >= 0) & (self.away >= 0))
+            prob = self.live_prob[remaining].astype(np.float32)
+            h, a, conf_game = self.home[remaining], self.away[remaining], self.is_conf[remaining]
+            wins, losses = self.wins.copy(), self.losses.copy()
+            conf_wins = self.conf_wins.copy()
+        n_teams = len(self.teams)
+        rng = np.random.default_rng(self.seed)
+        total_w = []
+        conf_w = []
+        for start in range(0, n_sims, SIM_BATCH):
+            b = min(SIM_BATCH, n_sims - start)
+            home_won = rng.random((b, len(remaining)), dtype=np.float32) < prob
+            winner = np.where(home_won, h, a)
+            offs = (np.arange(b) * n_teams)[:, None]
+            w = np.bincount((winner + offs).ravel(), minlength=b * n_teams).reshape(b, n_teams)
+            cw = np.bincount((winner[:, conf_game] + offs).ravel(), minlength=b * n_teams).reshape(b, n_teams)
+            total_w.append(w + wins)
+            conf_w.append(cw + conf_wins)
+        total_w = np.vstack(total_w)
+        conf_w = np.vstack(conf_w)
+
+        games_left = np.bincount(np.concatenate([h, a]), minlength=n_teams)
+        title = np.zeros(n_teams)
+        conf_labels = pd.Series(self.conf)
+        for _, members in conf_labels.groupby(conf_labels, dropna=True).groups.items():
+            members = np.asarray(members)
+            block = conf_w[:, members]
+            best = block == block.max(axis=1, keepdims=True)
+            title[members] = (best / best.sum(axis=1, keepdims=True)).mean(axis=0)
+
+        return pd.DataFrame({
+            "Team": self.teams,
+            "Conference": self.conf,
+            "W": wins,
+            "L": losses,
+            "Games_Left": games_left,
+            "Proj_W": total_w.mean(axis=0),
+            "Proj_L": wins + losses + games_left - total_w.mean(axis=0),
+            "Proj_W_P10": np.percentile(total_w, 10, axis=0),
+            "Proj_W_P90": np.percentile(total_w, 90, axis=0),
+            "Conf_Title_PERC": title,
+        }).sort_values("Proj_W", ascending=False).reset_index(drop=True)
+
+    def _run_simulation(self):
+        started = time.perf_counter()
+        projections = self.simulate()
+        with self._lock:
+            self._publish(projections=projections, rescored=self._snapshot["rescored"])
+        log.info("season simulation finished in %.2fs", time.perf_counter() - started)
+
+    def simulate_async(self):
+        """Re-run the simulation on a daemon thread unless one is already running."""
+        if self._sim_thread is not None and self._sim_thread.is_alive():
+            return
+        self._sim_thread = threading.Thread(target=self._run_simulation, name="season-sim", daemon=True)
+        self._sim_thread.start()
+
+    # -----------------------
+    # Read side
+    # -----------------------
+    def standings(self):
+        n_recent = np.minimum(self.recent_n, ROLLING_GAMES)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            last_sm = np.where(n_recent > 0, self.recent.sum(axis=1) / n_recent, np.nan)
+            gp = self.wins + self.losses
+            return pd.DataFrame({
+                "Team": self.teams,
+                "Conference": self.conf,
+                "W": self.wins, "L": self.losses,
+                "Conf_W": self.conf_wins, "Conf_L": self.conf_losses,
+                "PF/G": np.where(gp > 0, self.points_for / gp, np.nan),
+                "PA/G": np.where(gp > 0, self.points_against / gp, np.nan),
+                f"Last{ROLLING_GAMES}_SM": last_sm,
+                "Streak": self.streak,
+                "Rating_Adj": self.rating,
+            }).sort_values(["W", "L"], ascending=[False, True]).reset_index(drop=True)
+
+    def _publish(self, projections, rescored):
+        remaining = ~self.played
+        upcoming = pd.DataFrame({
+            "Day": self.day[remaining],
+            "Home": self.teams.take(np.maximum(self.home[remaining], 0)),
+            "Away": self.teams.take(np.maximum(self.away[remaining], 0)),
+            "Prob_Home_Win": _sigmoid(self.base_logit[remaining]),
+            "Live_Prob_Home_Win": self.live_prob[remaining],
+        })
+        self._snapshot = {
+            "standings": self.standings(),
+            "upcoming": upcoming,
+            "projections": projections,
+            "applied": self._applied,
+            "unmatched": (pd.concat(self._unmatched, ignore_index=True) if self._unmatched
+                          else pd.DataFrame(columns=RESULTS_COLUMNS)),
+            "rescored": rescored,
+            "updated": time.time(),
+        }
+
+    def snapshot(self):
+        return self._snapshot
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.live new_results.csv [--season 2025]
+    # or one game: python -m common.live --day 12 --home Duke --away UNC --home-points 80 --away-points 75
+    parser = argparse.ArgumentParser(description="Append completed games to the season results log.")
+    parser.add_argument("csv", nargs="?", help=f"CSV with columns {', '.join(RESULTS_COLUMNS)}")
+    parser.add_argument("--season", type=int, default=CURRENT_SEASON)
+    parser.add_argument("--day", type=int)
+    parser.add_argument("--home")
+    parser.add_argument("--away")
+    parser.add_argument("--home-points", type=int)
+    parser.add_argument("--away-points", type=int)
+    args = parser.parse_args()
+
+    if args.csv:
+        new = pd.read_csv(args.csv)
+    else:
+        new = [{"Day": args.day, "Home": args.home, "Away": args.away,
+                "Home_Points": args.home_points, "Away_Points": args.away_points}]
+    print(f"appended {append_results(new, args.season)} results -> {results_log_path(args.season)}")
@@ -0,0 +1,143 @@
+# common/players.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from common.cache import cache_path, file_version, pinned_source
+
+PLAYER_TABLE_PATH = "Data/2025_March_Madness_Databook/Player Value-Table 1.csv"
+
+# source column -> clean column (the sheet repeats the box score as 'STR.1'...'PTS.1'; those are dropped)
+GAME_COLUMNS = {
+    "Players": "Player",
+    "Team": "Team",
+    "Location": "Location",
+    "Opponent": "Opponent",
+    "Opponent Conference": "Opponent Conference",
+    "Power": "Power",
+    "Top 25": "Top 25",
+    "Unnamed: 8": "Role",
+    "STR": "Started",
+    "Min": "MIN",
+    "FGM": "FGM",
+    "FGA": "FGA",
+    "3M": "3M",
+    "3A": "3A",
+    "FTM": "FTM",
+    "FTA": "FTA",
+    "OReb": "OReb",
+    "DReb": "DReb",
+    "AST": "AST",
+    "STL": "STL",
+    "TO": "TO",
+    "PF": "PF",
+    "PTS": "PTS",
+    "OPP ACTIVE VALUE": "OPP ACTIVE VALUE",
+    "OPP HISTORICAL VALUE": "OPP HISTORICAL VALUE",
+    "Double Doube": "Double Double",
+    "Triple Double": "Triple Double",
+    "20+ minutes": "20+ minutes",
+    "20+ points": "20+ points",
+    "SM": "SM",
+    "Line": "Line",
+    "Clutch ": "Clutch",
+    "Overtime": "Overtime",
+    "Top 7": "Top 7",
+}
+
+CATEGORY_COLS = ["Player", "Team", "Location", "Opponent", "Opponent Conference", "Role"]
+COUNT_COLS = ["MIN", "FGM", "FGA", "3M", "3A", "FTM", "FTA", "OReb", "DReb", "AST", "STL", "TO", "PF", "PTS"]
+FLAG_COLS = ["Power", "Top 25", "Started", "Double Double", "Triple Double", "20+ minutes", "20+ points",
+             "Clutch", "Overtime"]
+
+
+# -----------------------
+# Parse / store
+# -----------------------
+def parse_player_table(path=PLAYER_TABLE_PATH):
+    """
+    Clean player-game rows from the Databook export. Game rows have a blank
+    first column and a player name; the 'Team:' header and per-team 'Sum:'
+    rows (team name in the first column) are dropped.
+    """
+    raw = pd.read_csv(path, encoding="latin1", low_memory=False)
+    first = raw.columns[0]
+    games = raw[raw[first].isna() & raw["Players"].notna() & raw["Team"].notna()]
+    games = games[[c for c in GAME_COLUMNS if c in games.columns]].rename(columns=GAME_COLUMNS)
+
+    for c in CATEGORY_COLS:
+        if c in games.columns:
+            games[c] = games[c].astype(str).str.strip().astype("category")
+    games[COUNT_COLS] = games[COUNT_COLS].apply(pd.to_numeric, errors="coerce").fillna(0).astype(np.int16)
+    flags = [c for c in FLAG_COLS if c in games.columns]
+    games[flags] = games[flags].apply(pd.to_numeric, errors="coerce").fillna(0).astype(np.int8)
+    for c in ("OPP ACTIVE VALUE", "OPP HISTORICAL VALUE", "SM", "Line"):
+        if c in games.columns:
+            games[c] = pd.to_numeric(games[c], errors="coerce").astype(np.float32)
+    if "Top 7" in games.columns:
+        games["Top 7"] = games["Top 7"].astype(str).str.strip().str.upper().eq("TRUE")
+    return games.reset_index(drop=True)
+
+
+def load_player_games(path=PLAYER_TABLE_PATH, version=None):
+    """
+    Columnar player-game store, persisted as Parquet per source version (the
+    manager's token, else the file's own hash); parsed from the copy pinned to it.
+    """
+    version = version or file_version(path)
+    store = cache_path("player_games", version, "parquet")
+    if os.path.exists(store):
+        try:
+            return pd.read_parquet(store)
+        except Exception:
+            pass  # unreadable -> reparse
+    games = parse_player_table(pinned_source(path, version))
+    games.to_parquet(store, index=False)
+    return games
+
+
+# -----------------------
+# Aggregations (one groupby over the whole league each)
+# -----------------------
+def season_lines(games):
+    """Per-player season totals, per-game averages and shooting splits."""
+    g = games.groupby(["Player", "Team"], observed=True)
+    lines = g[COUNT_COLS].sum()
+    lines.insert(0, "GP", g.size())
+    lines.insert(1, "GS", g["Started"].sum())
+    lines["Double Doubles"] = g["Double Double"].sum()
+    lines["20+ PT Games"] = g["20+ points"].sum()
+
+    per_game = lines[COUNT_COLS].div(lines["GP"], axis=0)
+    for c in ("MIN", "PTS", "OReb", "DReb", "AST", "STL", "TO"):
+        lines[f"{c}/G"] = per_game[c].astype(np.float32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lines["FG_PERC"] = np.where(lines["FGA"] > 0, lines["FGM"] / lines["FGA"], np.nan).astype(np.float32)
+        lines["FG3_PERC"] = np.where(lines["3A"] > 0, lines["3M"] / lines["3A"], np.nan).astype(np.float32)
+        lines["FT_PERC"] = np.where(lines["FTA"] > 0, lines["FTM"] / lines["FTA"], np.nan).astype(np.float32)
+    return lines.reset_index()
+
+
+def rotation_table(lines):
+    """Each player's share of team minutes / points / shots, for every team at once."""
+    team_tot = lines.groupby("Team", observed=True)[["MIN", "PTS", "FGA"]].transform("sum")
+    out = lines[["Team", "Player", "GP", "GS", "MIN/G", "PTS/G"]].copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["Minutes Share"] = (lines["MIN"] / team_tot["MIN"]).astype(np.float32)
+        out["Points Share"] = (lines["PTS"] / team_tot["PTS"]).astype(np.float32)
+        out["Shot Share"] = (lines["FGA"] / team_tot["FGA"]).astype(np.float32)
+    return out.sort_values(["Team", "Minutes Share"], ascending=[True, False]).reset_index(drop=True)
+
+
+def build_player_tables(games):
+    """Season lines + rotations, computed once per data version."""
+    lines = season_lines(games)
+    return {"lines": lines, "rotation": rotation_table(lines)}
+
+
+def player_leaderboard(lines, stat, n=25, min_games=5, ascending=False):
+    """League top-n players for one season-line stat among players with >= min_games."""
+    board = lines[lines["GP"] >= min_games]
+    board = board.nsmallest(n, stat) if ascending else board.nlargest(n, stat)
+    return board.reset_index(drop=True)
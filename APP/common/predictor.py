@@ -0,0 +1,127 @@
+# common/predictor.py
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from common.features import build_matchup_features, cached_team_matrix, make_feature_spec
+
+
+# -----------------------
+# Prepare training data from history
+# -----------------------
+def detect_home_away_and_scores(hist):
+    """
+    Returns a DataFrame with columns: home_team, away_team, home_score, away_score.
+    Heuristics:
+      - If 'Road Game' column exists and is 1/0: if Road Game==1 then Team traveled -> opponent was home.
+      - Else if 'Location' contains a city like 'Lawrence, KS' with the Team's school location missing,
+        we fallback to treating Team as home unless 'Road Game' says otherwise.
+      - Expects 'Points' and 'Opp Points' columns for scores.
+    """
+    h = hist  # read-only: the cached frame is shared, nothing below modifies it
+    # standardize name columns
+    team_col = None
+    opp_col = None
+    if "Team" in h.columns:
+        team_col = "Team"
+    elif "Teams" in h.columns:
+        team_col = "Teams"
+    if "Opponent" in h.columns:
+        opp_col = "Opponent"
+    # scores
+    score_col = None
+    opp_score_col = None
+    if "Points" in h.columns and "Opp Points" in h.columns:
+        score_col = "Points"; opp_score_col = "Opp Points"
+    elif "PTS" in h.columns and "OPP_PTS" in h.columns:
+        score_col = "PTS"; opp_score_col = "OPP_PTS"
+
+    if team_col is None or opp_col is None or score_col is None:
+        return None  # not enough info
+
+    # Road Game detection
+    road_col = None
+    for c in h.columns:
+        if c.strip().lower() in ("road game", "road", "is_road", "is_away"):
+            road_col = c
+            break
+
+    team_score = pd.to_numeric(h[score_col], errors="coerce").to_numpy(dtype=float)
+    opp_score = pd.to_numeric(h[opp_score_col], errors="coerce").to_numpy(dtype=float)
+
+    # default: assume Team is home unless road marker says otherwise
+    if road_col is not None:
+        is_team_road = pd.to_numeric(h[road_col], errors="coerce").fillna(0).eq(1).to_numpy()
+    else:
+        is_team_road = np.zeros(len(h), dtype=bool)
+
+    team = h[team_col].to_numpy(dtype=object)
+    opp = h[opp_col].to_numpy(dtype=object)
+    return pd.DataFrame({
+        "home_team": np.where(is_team_road, opp, team),
+        "away_team": np.where(is_team_road, team, opp),
+        "home_score": np.where(is_team_road, opp_score, team_score),
+        "away_score": np.where(is_team_road, team_score, opp_score),
+    })
+
+
+# -----------------------
+# Train
+# -----------------------
+# Set to an int to add a PCA step after scaling (None keeps the selected diff features as-is)
+PCA_COMPONENTS = None
+RF_TREES = 200
+
+
+def training_data(df_all, df_hist, all_stats_version, registry, pca_components=PCA_COMPONENTS):
+    """
+    Home-minus-away features and home-win labels for every usable history game.
+    Returns (spec, team_matrix, X, y, warning); X is None when there is nothing to train on.
+    """
+    hist_parsed = detect_home_away_and_scores(df_hist)
+    if hist_parsed is None:
+        return None, None, None, None, ""
+
+    spec = make_feature_spec(df_all, pca_components=pca_components)
+    team_matrix = cached_team_matrix(df_all, spec["team_cols"], all_stats_version, registry)
+
+    X, valid = build_matchup_features(team_matrix, hist_parsed["home_team"], hist_parsed["away_team"],
+                                      registry, source="history.Team/Opponent")
+    y = (hist_parsed["home_score"] > hist_parsed["away_score"]).astype(int).to_numpy()
+    # drop rows with unknown teams or missing scores
+    valid &= hist_parsed[["home_score", "away_score"]].notna().all(axis=1).to_numpy()
+    X, y = X[valid], y[valid]
+
+    if X.shape[0] < 40:
+        return spec, team_matrix, None, None, "Not enough complete historical rows after merge to train ML (need >=40). Using baseline."
+    return spec, team_matrix, X, y, None
+
+
+def make_pipeline(n_features, pca_components=PCA_COMPONENTS, n_estimators=RF_TREES, random_state=0):
+    """Scaler (+ optional PCA) + RandomForest, unfitted."""
+    steps = [("scaler", StandardScaler())]
+    if pca_components:
+        steps.append(("pca", PCA(n_components=min(pca_components, n_features), random_state=0)))
+    steps.append(("rf", RandomForestClassifier(n_estimators=n_estimators, random_state=random_state)))
+    return Pipeline(steps)
+
+
+def train_model(df_all, df_hist, all_stats_version, registry, pca_components=PCA_COMPONENTS):
+    """
+    Train the home-win model on home-minus-away difference features.
+    Only runs when the Schedule Predictor has no stored arrays for the data version
+    (and from bench/scale_bench.py).
+    Returns (pipeline, feature_spec, team_matrix, n_train, n_test, warning).
+    """
+    spec, team_matrix, X, y, warning = training_data(df_all, df_hist, all_stats_version, registry, pca_components)
+    if X is None:
+        return None, spec, team_matrix, 0, 0, warning
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.20, random_state=42)
+    pipeline = make_pipeline(X.shape[1], pca_components)
+    pipeline.fit(X_train, y_train)
+    return pipeline, spec, team_matrix, len(X_train), len(X_test), None
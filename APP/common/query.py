@@ -0,0 +1,283 @@
+# common/query.py
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from common.cache import CACHE_DIR
+from common.databook import read_manifest
+from common.seasons import available_seasons, load_table, table_version
+from common.teams import get_team_registry
+
+QUERY_DB = os.path.join(CACHE_DIR, "query.sqlite")
+
+# query table -> season-store table; every stored season is stacked with a Season column
+SOURCE_TABLES = {
+    "all_stats": "all_stats",
+    "games": "history",
+    "schedule": "schedule",
+}
+# columns holding team names / dates; indexed, and team columns get a '<col> ID' registry column
+TEAM_COLS = ("Teams", "Team", "Opponent", "Home", "Away", "Pred_Winner")
+DATE_COLS = ("Date", "Day")
+PREDICTIONS = "predictions"   # published by the Schedule Predictor (publish_table)
+
+EXAMPLES = {
+    "Road games vs Top 25 opponents with a line over 5": (
+        'SELECT Season, Date, Team, Opponent, Points, "Opp Points", Line\n'
+        'FROM games\n'
+        'WHERE "Road Game" = 1 AND "Top 25 Opponent" = 1 AND Line > 5\n'
+        'ORDER BY Date'),
+    "Conference standings by wins": (
+        'SELECT Conference, Teams, Wins, Losses, WIN_PERC\n'
+        'FROM all_stats WHERE Season = 2025\n'
+        'ORDER BY Conference, Wins DESC'),
+    "Closest predicted games": (
+        'SELECT Day, Home, Away, Prob_Home_Win\n'
+        'FROM predictions\n'
+        'ORDER BY ABS(Prob_Home_Win - 0.5) LIMIT 25'),
+}
+
+_write_lock = threading.Lock()
+_published = {}  # (db, table) -> version already written by this process
+
+
+# -----------------------
+# Sources and their versions
+# -----------------------
+def query_sources():
+    """query table -> season-store table, for the core tables and every ingested Databook sheet."""
+    sources = dict(SOURCE_TABLES)
+    for entry in read_manifest()["sheets"].values():
+        sources[entry["table"]] = entry["table"]
+    return sources
+
+
+def source_version(table, data_versions=None):
+    """One token over every stored season of a season-store table (None when nothing is stored)."""
+    parts = [f"{s}:{v}" for s in available_seasons(table)
+             if (v := table_version(table, s, data_versions)) is not None]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16] if parts else None
+
+
+# -----------------------
+# Cleaning (pandas -> SQLite-friendly columns)
+# -----------------------
+def _clean_column(col):
+    """
+    Categories -> text, nullable ints -> float with NaN, and text columns that
+    are numbers written with commas / 'N/A' -> numbers, so SQL compares them numerically.
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.astype(object).where(col.notna(), None)
+    if pd.api.types.is_bool_dtype(col):
+        return col.astype(float) if col.isna().any() else col.astype(np.int8)
+    if pd.api.types.is_numeric_dtype(col):
+        return col.astype(float) if pd.api.types.is_extension_array_dtype(col) else col
+    text = col.astype(object)
+    num = pd.to_numeric(text.astype(str).str.replace(",", "", regex=False).where(text.notna()), errors="coerce")
+    filled = text.notna() & ~text.astype(str).str.strip().isin(["", "N/A", "#N/A", "-"])
+    return num if filled.any() and num[filled].notna().all() else text.where(text.notna(), None)
+
+
+def clean_for_sql(frame, registry=None, season=None):
+    """
+    Query-ready copy of a table: all-empty 'Unnamed' columns dropped, Date
+    columns as ISO text (sortable / comparable in SQL), numeric text parsed,
+    a '<col> ID' registry column next to each team column, and `season`
+    (one value per row) as a leading Season column.
+    """
+    keep = [c for c in frame.columns if not (str(c).startswith("Unnamed") and frame[c].isna().all())]
+    out = {} if season is None else {"Season": np.asarray(season, dtype=np.int16)}
+    for c in keep:
+        col = frame[c]
+        if c == "Date" and not pd.api.types.is_numeric_dtype(col):
+            dates = pd.to_datetime(col, errors="coerce", format="mixed")
+            out[c] = dates.dt.strftime("%Y-%m-%d").where(dates.notna(), None) if dates.notna().any() else col
+            continue
+        out[c] = _clean_column(col)
+        if registry is not None and c in TEAM_COLS:
+            out[f"{c} ID"] = registry.ids(col).astype(np.int32)
+    return pd.DataFrame(out, index=frame.index).rename(columns=dict(zip(out, _sql_names(out))))
+
+
+def _sql_names(names):
+    """SQLite column names are case-insensitive: 'OReb' / 'Oreb' become 'OReb' / 'Oreb.1' (pandas' duplicate style)."""
+    used = set()
+    result = []
+    for name in map(str, names):
+        candidate, n = name, 0
+        while candidate.casefold() in used:
+            n += 1
+            candidate = f"{name}.{n}"
+        used.add(candidate.casefold())
+        result.append(candidate)
+    return result
+
+
+def _load_all_seasons(table):
+    """(every stored season stacked, season per row), or (None, None)."""
+    frames, seasons = [], []
+    for season in available_seasons(table):
+        try:
+            frame = load_table(table, season)
+        except FileNotFoundError:
+            continue
+        frames.append(frame)
+        seasons.append(np.full(len(frame), int(season)))
+    if not frames:
+        return None, None
+    return pd.concat(frames, ignore_index=True), np.concatenate(seasons)
+
+
+# -----------------------
+# Build / refresh the database
+# -----------------------
+def _connect(path, readonly=False):
+    if readonly:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    con = sqlite3.connect(path)
+    # a derived cache: WAL lets pages read while a sync writes, and a lost write is just rebuilt
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=OFF")
+    return con
+
+
+def _write_table(con, name, frame, version):
+    """Replace one table, index its team / date / season columns and record its version."""
+    frame.to_sql(name, con, if_exists="replace", index=False, chunksize=5000)
+    indexed = [c for c in frame.columns if c in TEAM_COLS or c in DATE_COLS or c == "Season" or c.endswith(" ID")]
+    for c in indexed:
+        con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{name}_{c}" ON "{name}" ("{c}")')
+    con.execute("INSERT OR REPLACE INTO _sources VALUES (?, ?, ?, ?)", (name, version, len(frame), time.time()))
+
+
+def sync_query_db(path=QUERY_DB, data_versions=None):
+    """
+    Bring the database up to date with the season store: only tables whose
+    source version changed are rewritten. Returns {table: 'built' | 'current' | 'missing'}.
+    """
+    status = {}
+    with _write_lock:
+        con = _connect(path)
+        try:
+            con.execute("CREATE TABLE IF NOT EXISTS _sources (name TEXT PRIMARY KEY, version TEXT, rows INTEGER, built REAL)")
+            built = dict(con.execute("SELECT name, version FROM _sources").fetchall())
+            registry = None
+            for name, table in query_sources().items():
+                version = source_version(table, data_versions)
+                if version is None:
+                    status[name] = "missing"
+                    continue
+                if built.get(name) == version:
+                    status[name] = "current"
+                    continue
+                frame, seasons = _load_all_seasons(table)
+                if frame is None:
+                    status[name] = "missing"
+                    continue
+                registry = registry or get_team_registry(data_versions)
+                _write_table(con, name, clean_for_sql(frame, registry, seasons), version)
+                con.commit()
+                status[name] = "built"
+        finally:
+            con.close()
+    return status
+
+
+def publish_table(name, frame, version, path=QUERY_DB, data_versions=None):
+    """
+    Write a derived frame (e.g. the schedule predictions) into the database
+    unless `version` is already there. Cheap to call on every page run.
+    """
+    key = str(version)
+    if _published.get((path, name)) == key:
+        return False
+    with _write_lock:
+        con = _connect(path)
+        try:
+            con.execute("CREATE TABLE IF NOT EXISTS _sources (name TEXT PRIMARY KEY, version TEXT, rows INTEGER, built REAL)")
+            row = con.execute("SELECT version FROM _sources WHERE name = ?", (name,)).fetchone()
+            if row is None or row[0] != key:
+                _write_table(con, name, clean_for_sql(frame, get_team_registry(data_versions)), key)
+                con.commit()
+        finally:
+            con.close()
+    _published[(path, name)] = key
+    return True
+
+
+def db_version(path=QUERY_DB):
+    """Token over every table version in the database; keys the query-result cache."""
+    try:
+        con = _connect(path, readonly=True)
+    except sqlite3.OperationalError:
+        return None
+    try:
+        rows = con.execute("SELECT name, version FROM _sources ORDER BY name").fetchall()
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        con.close()
+    return hashlib.sha1(repr(rows).encode()).hexdigest()[:16]
+
+
+# -----------------------
+# Query API
+# -----------------------
+def run_query(sql, params=(), path=QUERY_DB):
+    """
+    Run one read-only SQL statement and return a DataFrame. The connection is
+    opened read-only, so statements that write fail with sqlite3.OperationalError.
+    """
+    con = _connect(path, readonly=True)
+    try:
+        return pd.read_sql_query(sql, con, params=tuple(params))
+    finally:
+        con.close()
+
+
+@st.cache_resource(max_entries=64)
+def cached_query(sql, params=(), version=None, path=QUERY_DB):
+    """run_query() shared read-only per (statement, params, database version)."""
+    return run_query(sql, params, path)
+
+
+def describe(path=QUERY_DB):
+    """Table, rows and column list of every query table."""
+    con = _connect(path, readonly=True)
+    try:
+        tables = con.execute("SELECT name, rows FROM _sources ORDER BY name").fetchall()
+        out = []
+        for name, rows in tables:
+            cols = [r[1] for r in con.execute(f'PRAGMA table_info("{name}")').fetchall()]
+            out.append({"Table": name, "Rows": rows, "Columns": len(cols), "Column names": ", ".join(cols)})
+    finally:
+        con.close()
+    return pd.DataFrame(out)
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.query "SELECT ..."  -> sync the database, run and time the query
+    parser = argparse.ArgumentParser(description="Query the project tables with SQL (SQLite, in-process).")
+    parser.add_argument("sql", nargs="?", help="statement to run; omit to list the tables")
+    parser.add_argument("--db", default=QUERY_DB)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    status = sync_query_db(args.db)
+    changed = ", ".join(f"{n} {s}" for n, s in status.items() if s != "current")
+    print(f"synced in {time.perf_counter() - started:.2f}s: {changed or 'all tables current'}")
+    if args.sql:
+        started = time.perf_counter()
+        result = run_query(args.sql, path=args.db)
+        print(result.to_string(index=False, max_rows=50))
+        print(f"{len(result)} rows in {(time.perf_counter() - started) * 1000:.1f} ms")
+    else:
+        print(describe(args.db)[["Table", "Rows", "Columns"]].to_string(index=False))
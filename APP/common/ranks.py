@@ -0,0 +1,277 @@
+# common/ranks.py
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from common.arrays import array_key, cached_arrays
+from common.backtest import PREGAME_FIRST_COL
+from common.features import JUNK_COLS, is_rank_col
+from common.stat_groups import stat_groups, rank_overrides
+
+GAMES_COL = "Games (Dropping D2 matches)"   # eligibility: games played
+TIE_METHODS = ("min", "dense", "max", "average", "ordinal")
+# stats ranked best when low, beyond the OPP_* / turnover / foul rule in lower_is_better()
+LOWER_IS_BETTER = ("TO", "PF", "Opp Points", "Def_eff", "Loss", "Losses", "STAT_STREN")
+# game-log columns that are numeric but not box-score stats (betting lines)
+GAME_LOG_LINES = ("Line", "Over/Under Line")
+# sidebar choice -> scope passed to load_ranks (None = the ranks stored in All_stats)
+RANK_SCOPES = {
+    "All_stats ranks": None,
+    "Recomputed (league)": "league",
+    "Recomputed (conference)": "conference",
+}
+
+
+# -----------------------
+# Direction and single-column ranks
+# -----------------------
+def lower_is_better(col):
+    """Rank direction: turnovers, fouls and what opponents do rank best when low (except their TOs / fouls)."""
+    return col in LOWER_IS_BETTER or (col.startswith("OPP_") and col not in ("OPP_TO", "OPP_PF"))
+
+
+def rank_column(values, lower=False):
+    """League rank (1 = best, ties share the best rank, NaN stays NaN) in one sort."""
+    key = values if lower else -values
+    valid = ~np.isnan(key)
+    ordered = np.sort(key[valid])
+    ranks = np.full(len(values), np.nan)
+    ranks[valid] = np.searchsorted(ordered, key[valid], side="left") + 1
+    return ranks
+
+
+# -----------------------
+# Rank engine (every stat at once)
+# -----------------------
+def rank_matrix(X, lower, groups=None, method="min"):
+    """
+    Ranks of every column of X (rows x stats) in one pass: 1 = best, NaN rows
+    unranked. `lower` is a bool per column (True = smaller is better);
+    `groups` (one integer code per row) ranks within each group instead of
+    across all rows. Ties follow `method` (see TIE_METHODS): 'min' shares the
+    best rank (1, 2, 2, 4), 'dense' leaves no gaps (1, 2, 2, 3), 'max' shares the
+    worst, 'average' the mean, 'ordinal' breaks ties by row order.
+    """
+    if method not in TIE_METHODS:
+        raise ValueError(f"method must be one of {TIE_METHODS}")
+    X = np.asarray(X, dtype=float)
+    n, k = X.shape
+    if n == 0 or k == 0:
+        return np.full((n, k), np.nan)
+    key = np.where(np.asarray(lower, dtype=bool), X, -X)   # ascending key, NaN sorts last
+    g = np.zeros(n, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+
+    # sort every column by (group, key): stable key sort, then stable group sort
+    order = np.argsort(key, axis=0, kind="stable")
+    order = np.take_along_axis(order, np.argsort(g[order], axis=0, kind="stable"), axis=0)
+    key_s = np.take_along_axis(key, order, axis=0)
+    g_s = g[order]
+
+    idx = np.broadcast_to(np.arange(n)[:, None], (n, k))
+    new_group = np.ones((n, k), dtype=bool)
+    new_group[1:] = g_s[1:] != g_s[:-1]
+    new_tie = new_group.copy()
+    new_tie[1:] |= key_s[1:] != key_s[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, idx, 0), axis=0)
+    tie_start = np.maximum.accumulate(np.where(new_tie, idx, 0), axis=0)
+
+    if method == "ordinal":
+        ranked = idx - group_start + 1
+    elif method == "dense":
+        ties = np.cumsum(new_tie, axis=0)
+        ranked = ties - np.take_along_axis(ties, group_start, axis=0) + 1
+    else:
+        # last row of each tie block: next block's start - 1, found by a reverse running minimum
+        next_start = np.where(np.vstack([new_tie[1:], np.ones((1, k), dtype=bool)]), idx, n)
+        tie_end = np.minimum.accumulate(next_start[::-1], axis=0)[::-1]
+        low, high = tie_start - group_start + 1, tie_end - group_start + 1
+        ranked = {"min": low, "max": high, "average": (low + high) / 2}[method]
+
+    out = np.empty((n, k))
+    np.put_along_axis(out, order, ranked.astype(float), axis=0)
+    return np.where(np.isnan(X), np.nan, out)
+
+
+def rankable_stats(df):
+    """Numeric stat columns worth ranking: not rank columns, spreadsheet junk or the games count."""
+    return [c for c in df.columns
+            if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])
+            and c not in JUNK_COLS and c != GAMES_COL and not str(c).startswith("Unnamed") and not is_rank_col(c)]
+
+
+def compute_ranks(df, stats=None, lower=None, method="min", min_games=0, games_col=GAMES_COL, by=None):
+    """
+    Ranks for every stat of `df` (default: rankable_stats) in one vectorized
+    pass, as a float frame on df's index. `lower` overrides the direction per
+    stat ({stat: True when lower is better}); teams with fewer than
+    `min_games` in `games_col` are left unranked and out of the pool; `by`
+    names a column (e.g. 'Conference') to rank within.
+    """
+    stats = rankable_stats(df) if stats is None else [s for s in stats if s in df.columns]
+    lower = lower or {}
+    # own copy: masked in place below (to_numpy can hand back a read-only view under copy-on-write)
+    X = df[stats].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan, copy=True)
+    if min_games and games_col in df.columns:
+        games = pd.to_numeric(df[games_col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        X[~(games >= min_games)] = np.nan
+    groups = None
+    if by is not None and by in df.columns:
+        groups = pd.factorize(df[by].astype(object))[0]
+        X[groups < 0] = np.nan   # no group, no rank
+    direction = [lower.get(s, lower_is_better(str(s))) for s in stats]
+    return pd.DataFrame(rank_matrix(X, direction, groups, method), index=df.index, columns=stats)
+
+
+def game_log_stats(games):
+    """
+    Per-game box-score columns of a game log (Points, Opp Points, SM, ...): the
+    columns before the pre-game season-to-date block (PREGAME_FIRST_COL on, see
+    common/backtest.py), minus 0/1 game flags and betting lines.
+    """
+    cols = list(games.columns)
+    if PREGAME_FIRST_COL in cols:
+        cols = cols[:cols.index(PREGAME_FIRST_COL)]
+    return [c for c in rankable_stats(games[cols])
+            if c not in GAME_LOG_LINES and not games[c].dropna().isin([0, 1]).all()]
+
+
+def last_n_ranks(games, n, stats=None, team_col="Team", date_col="Date", **kwargs):
+    """
+    Ranks over each team's last `n` games of a game log: per-team means of the
+    box-score columns (game_log_stats) over those games, then compute_ranks().
+    Indexed by team.
+    """
+    numeric = game_log_stats(games) if stats is None else [s for s in stats if s in games.columns]
+    log = games[[team_col] + numeric]
+    if date_col in games.columns:
+        order = pd.to_datetime(games[date_col], errors="coerce", format="mixed")
+        log = log.assign(_order=order).sort_values("_order", kind="stable")
+    recent = log.groupby(team_col, sort=False, observed=True).tail(n)
+    means = recent.groupby(team_col, observed=True)[numeric].mean()
+    means[GAMES_COL] = recent.groupby(team_col, observed=True).size()
+    return compute_ranks(means, numeric, **kwargs)
+
+
+@st.cache_resource(max_entries=8)
+def load_ranks(version, _df, scope="league", min_games=0, method="min"):
+    """
+    Recomputed ranks for one All_stats version, shared read-only. scope
+    'league' ranks across all teams, 'conference' within each conference.
+    """
+    return compute_ranks(_df, method=method, min_games=min_games, by="Conference" if scope == "conference" else None)
+
+
+def resolved_ranks(df, version, scope=None, min_games=0):
+    """
+    One rank per (team row, stat) for the pages. scope None keeps the ranks
+    All_stats ships (rank_overrides) and fills stats without one from the
+    league-wide engine, so every numeric stat has a rank; otherwise the
+    engine's league or conference ranks.
+    """
+    if scope is not None:
+        return load_ranks(version, df, scope, min_games)
+    return with_stored_ranks(df, load_ranks(version, df, "league", 0))
+
+
+def with_stored_ranks(df, engine):
+    """Engine ranks with the rank columns All_stats ships (rank_overrides) swapped in where they exist."""
+    stored = {stat: pd.to_numeric(df[col], errors="coerce").astype(float)
+              for stat, col in rank_overrides.items() if col in df.columns and stat in engine.columns}
+    return engine.assign(**stored)
+
+
+def rank_scope_key(scope=None, min_games=0):
+    """Short tag for one rank source, for keys of artifacts that show ranks (e.g. figure hover text)."""
+    return "stored" if scope is None else f"{scope}-{int(min_games)}"
+
+
+def rank_scope_selector(df, label="Ranks"):
+    """
+    Sidebar rank source shared by the pages, kept in plain session_state keys
+    so it survives page switches. Returns (scope, min_games).
+    """
+    labels = list(RANK_SCOPES)
+    current = st.session_state.get("rank_scope", labels[0])
+    st.session_state["rank_scope"] = st.sidebar.selectbox(label, labels, index=labels.index(current),
+                                                          key="_rank_scope_select")
+    scope = RANK_SCOPES[st.session_state["rank_scope"]]
+    min_games = 0
+    if scope is not None and GAMES_COL in df.columns:
+        most = int(pd.to_numeric(df[GAMES_COL], errors="coerce").max())
+        min_games = st.sidebar.slider("Min games to be ranked", 0, max(most, 1),
+                                      min(st.session_state.get("rank_min_games", 0), max(most, 1)),
+                                      key="_rank_min_games")
+        st.session_state["rank_min_games"] = min_games
+    return scope, min_games
+
+
+def team_rank_matrix(df, version, registry, rank_map=None, overall_col="STAT_STREN"):
+    """
+    Every mapped rank column (plus overall_col) as a float matrix indexed by
+    team ID (NaN where the team or rank is missing). Persisted per All_stats
+    version as a memory-mapped .npy (common/arrays.py), so the string ->
+    number conversion happens once per data version, not per process.
+    Returns (R, columns).
+    """
+    rank_map = rank_overrides if rank_map is None else rank_map
+    cols = list(dict.fromkeys(c for c in rank_map.values() if c in df.columns))
+    if overall_col in df.columns and overall_col not in cols:
+        cols.append(overall_col)
+
+    def build():
+        R = np.full((len(registry), len(cols)), np.nan)
+        rows = registry.rows(df)
+        have = np.flatnonzero(rows >= 0)
+        R[have] = df.iloc[rows[have]][cols].apply(pd.to_numeric, errors="coerce").astype(float).to_numpy()
+        return {"ranks": R}, {"columns": cols}
+
+    arrays, meta = cached_arrays("ranks", array_key(version, registry.version, cols), build)
+    return arrays["ranks"], meta["columns"]
+
+
+def category_avg_ranks(df, teams, groups=None, rank_map=None, overall_col="STAT_STREN", registry=None,
+                       version=None):
+    """
+    Average rank per stat category for every requested team in one matrix product.
+    Rank matrix R (teams x stats) is multiplied by a 0/1 membership matrix
+    M (stats x categories); NaN ranks are excluded from both sum and count.
+    'Overall' uses overall_col when the team has it, else the mean of all mapped ranks.
+    Returns a DataFrame indexed by team: Overall + one column per category.
+    With a TeamRegistry, team rows are found by canonical ID instead of by name;
+    adding the All_stats version reads them from team_rank_matrix().
+    """
+    groups = stat_groups if groups is None else groups
+    rank_map = rank_overrides if rank_map is None else rank_map
+
+    stats = [s for g in groups.values() for s in g if rank_map.get(s) in df.columns]
+    stats = list(dict.fromkeys(stats))
+    rank_cols = [rank_map[s] for s in stats]
+
+    teams = list(teams)
+    if registry is not None and version is not None:
+        matrix, matrix_cols = team_rank_matrix(df, version, registry, rank_map, overall_col)
+        ids = registry.ids(teams)
+        block = np.where((ids >= 0)[:, None], matrix[np.maximum(ids, 0)], np.nan)
+        rows = pd.DataFrame(block, index=pd.Index(teams), columns=matrix_cols)
+    elif registry is not None:
+        ids = registry.ids(teams)
+        pos = np.where(ids >= 0, registry.rows(df)[np.maximum(ids, 0)], -1)
+        found = pos >= 0
+        rows = df.iloc[pos[found]].set_axis(pd.Index(np.asarray(teams, dtype=object)[found])).reindex(teams)
+    else:
+        rows = df.drop_duplicates(subset="Teams").set_index("Teams").reindex(teams)
+    R = rows[rank_cols].apply(pd.to_numeric, errors="coerce").astype(float).to_numpy()
+    present = ~np.isnan(R)
+    R0 = np.where(present, R, 0.0)
+
+    M = np.array([[s in g for g in groups.values()] for s in stats], dtype=float).reshape(len(stats), len(groups))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cat = (R0 @ M) / (present @ M)
+        overall = R0.sum(axis=1) / present.sum(axis=1)
+
+    out = pd.DataFrame(cat, index=rows.index, columns=list(groups))
+    if overall_col in rows.columns:
+        stren = pd.to_numeric(rows[overall_col], errors="coerce").to_numpy(dtype=float)
+        overall = np.where(np.isnan(stren), overall, stren)
+    out.insert(0, "Overall", overall)
+    return out
@@ -0,0 +1,154 @@
+# common/seasons.py
+import argparse
+import os
+
+import pandas as pd
+import streamlit as st
+
+from common.cache import file_version, pinned_source
+from common.frames import compact_team_frame, enable_copy_on_write
+
+enable_copy_on_write()
+
+CURRENT_SEASON = 2025
+STORE_DIR = os.environ.get("MARCH_METRICS_STORE", "Data/store")
+
+# table name -> current-season source CSV (also tracked by common/data_version.py)
+SEASON_TABLES = {
+    "all_stats": "Data/All_stats.csv",
+    "history": "Data/Daily_predictor_excel.csv",
+    "schedule": "Data/Randomized_Schedule.csv",
+}
+
+
+# -----------------------
+# Partition layout: Data/store/table=<name>/season=<yyyy>/part.parquet
+# -----------------------
+def partition_path(table, season):
+    return os.path.join(STORE_DIR, f"table={table}", f"season={int(season)}", "part.parquet")
+
+
+def available_seasons(table="all_stats"):
+    """Seasons with a stored partition for `table` (the current season is always listed), newest first."""
+    seasons = {CURRENT_SEASON}
+    table_dir = os.path.join(STORE_DIR, f"table={table}")
+    if os.path.isdir(table_dir):
+        for name in os.listdir(table_dir):
+            if name.startswith("season=") and os.path.exists(os.path.join(table_dir, name, "part.parquet")):
+                try:
+                    seasons.add(int(name.split("=", 1)[1]))
+                except ValueError:
+                    pass
+    return sorted(seasons, reverse=True)
+
+
+def table_source(table, season):
+    """Live CSV for the current season (it is refreshed nightly), else the partition file, else None."""
+    if int(season) == CURRENT_SEASON and table in SEASON_TABLES and os.path.exists(SEASON_TABLES[table]):
+        return SEASON_TABLES[table]
+    path = partition_path(table, season)
+    return path if os.path.exists(path) else None
+
+
+def table_version(table, season, data_versions=None):
+    """
+    Cache key for one (table, season). The current season's live CSV uses the
+    data-version manager's ready version so background rebuilds stay in charge.
+    """
+    source = table_source(table, season)
+    if source is None:
+        return None
+    if data_versions is not None and source == SEASON_TABLES.get(table):
+        return data_versions.version(table)
+    return file_version(source)
+
+
+# -----------------------
+# Lazy loading
+# -----------------------
+def read_source(table, source, columns=None):
+    """Uncached read of one table file (CSV or Parquet), as the pages see it."""
+    cols = list(columns) if columns is not None else None
+    if source.endswith(".parquet"):
+        df = pd.read_parquet(source, columns=cols)
+    else:
+        df = pd.read_csv(source, encoding="latin1", usecols=cols)
+    df = df.rename(columns=lambda c: c.strip() if isinstance(c, str) else c)
+    # team tables are read by every page; keep them in compact dtypes
+    return compact_team_frame(df) if table == "all_stats" else df
+
+
+# one frame per (table, season, columns, version) shared by every session:
+# callers treat it as read-only and build new frames instead of assigning into it
+@st.cache_resource(max_entries=8)
+def _read_table(table, season, columns, version):
+    source = table_source(table, season)
+    if source is None:
+        raise FileNotFoundError(f"No '{table}' data stored for season {season}.")
+    if source == SEASON_TABLES.get(table):
+        # the live CSV can be replaced at any time: read the copy pinned to `version`, so an
+        # evicted entry re-read under an old token still gets that version's rows
+        source = pinned_source(source, version)
+    return read_source(table, source, columns)
+
+
+def load_table(table, season=CURRENT_SEASON, columns=None, data_versions=None, version=None):
+    """
+    One season of one table, reading only `columns` when given. Only the
+    requested partition is touched, so memory tracks the seasons in use
+    rather than the seasons on disk. `version` overrides the cache key
+    (used when warming a new data version in the background).
+    """
+    columns = tuple(columns) if columns is not None else None
+    if version is None:
+        version = table_version(table, season, data_versions)
+    return _read_table(table, int(season), columns, version)
+
+
+# -----------------------
+# Shared season selector
+# -----------------------
+def season_selector(label="Season"):
+    """
+    Sidebar season picker shared by every page. The choice is kept in a plain
+    session_state key so it survives page switches (widget state does not).
+    """
+    seasons = available_seasons()
+    current = st.session_state.get("season", seasons[0])
+    if current not in seasons:
+        current = seasons[0]
+    st.session_state["season"] = st.sidebar.selectbox(label, seasons, index=seasons.index(current), key="_season_select")
+    return st.session_state["season"]
+
+
+# -----------------------
+# Ingestion
+# -----------------------
+def ingest_season(season, sources=None):
+    """Write each source CSV for `season` into its Parquet partition. Returns {table: path}."""
+    sources = SEASON_TABLES if sources is None else sources
+    written = {}
+    for table, csv_path in sources.items():
+        if not os.path.exists(csv_path):
+            continue
+        df = pd.read_csv(csv_path, encoding="latin1")
+        # mixed str/number object columns cannot be typed by Arrow; keep them as text
+        for c in [c for c in df.columns if df[c].dtype == object]:
+            df[c] = df[c].where(df[c].isna(), df[c].astype(str))
+        path = partition_path(table, season)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df.to_parquet(path, index=False)
+        written[table] = path
+    return written
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.seasons 2025 [--all_stats path.csv --history ... --schedule ...]
+    parser = argparse.ArgumentParser(description="Ingest one season of CSVs into the Parquet store.")
+    parser.add_argument("season", type=int)
+    for name, default in SEASON_TABLES.items():
+        parser.add_argument(f"--{name}", default=default)
+    args = parser.parse_args()
+    out = ingest_season(args.season, {name: getattr(args, name) for name in SEASON_TABLES})
+    for table, path in out.items():
+        print(f"{table}: {path}")
@@ -0,0 +1,132 @@
+# common/similarity.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from common.cache import cache_path, file_version
+from common.stat_groups import sections
+
+ALL_STATS_PATH = "Data/All_stats.csv"
+
+
+# -----------------------
+# Build
+# -----------------------
+def standardize_section(df, cols):
+    """z-score each column (NaN -> league mean), scaled so every section has equal total weight."""
+    block = df[cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    mean = np.nanmean(block, axis=0)
+    std = np.nanstd(block, axis=0)
+    std[~np.isfinite(std) | (std == 0)] = 1.0
+    z = (block - mean) / std
+    z[~np.isfinite(z)] = 0.0
+    return z / np.sqrt(len(cols))
+
+
+def pairwise_sq_dist(z):
+    """All-pairs squared euclidean distance for one section block (n_teams x n_teams)."""
+    sq = (z * z).sum(axis=1)
+    d = sq[:, None] + sq[None, :] - 2.0 * (z @ z.T)
+    np.maximum(d, 0.0, out=d)
+    return d.astype(np.float32)
+
+
+def build_similarity_index(df):
+    """
+    Precompute one squared-distance block per stat section.
+    A weighted query is then just a weighted sum of rows from the blocks, so
+    section weights can change per request without rebuilding anything.
+    """
+    df = df.drop_duplicates(subset="Teams").reset_index(drop=True)
+    section_names = []
+    blocks = []
+    for name, cols in sections.items():
+        present = [c for c in cols if c in df.columns]
+        if not present:
+            continue
+        section_names.append(name)
+        blocks.append(pairwise_sq_dist(standardize_section(df, present)))
+    return {
+        "teams": df["Teams"].astype(str).to_numpy(),
+        "conferences": df["Conference"].astype(str).to_numpy() if "Conference" in df.columns else None,
+        "sections": section_names,
+        "blocks": np.stack(blocks) if blocks else np.zeros((0, len(df), len(df)), dtype=np.float32),
+    }
+
+
+# -----------------------
+# Persist (one file per data version)
+# -----------------------
+def save_index(index, path):
+    np.savez(path, teams=index["teams"], sections=np.array(index["sections"]), blocks=index["blocks"],
+             conferences=index["conferences"] if index["conferences"] is not None else np.array([]))
+
+
+def load_index(path):
+    with np.load(path, allow_pickle=False) as z:
+        conferences = z["conferences"]
+        return {
+            "teams": z["teams"],
+            "conferences": conferences if conferences.size else None,
+            "sections": z["sections"].tolist(),
+            "blocks": z["blocks"],
+        }
+
+
+def load_or_build_index(df, version=None, data_path=ALL_STATS_PATH):
+    """
+    Load the persisted index for one All_stats version (the token `df` was
+    loaded under; the file's own hash when not given), building it once if missing.
+    """
+    version = version or (file_version(data_path) if os.path.exists(data_path) else None)
+    path = cache_path("similarity", version, "npz") if version else None
+    if path and os.path.exists(path):
+        try:
+            return load_index(path)
+        except Exception:
+            pass  # corrupt / old format -> rebuild
+    index = build_similarity_index(df)
+    if path:
+        save_index(index, path)
+    return index
+
+
+# -----------------------
+# Query
+# -----------------------
+def most_similar(index, team, k=5, weights=None):
+    """
+    Top-k teams closest to `team` across the stat sections.
+    weights: optional {section title: weight}; missing sections default to 1.0.
+    Returns a DataFrame with Team, Conference and Similarity (1 = identical profile).
+    """
+    teams = index["teams"]
+    pos = np.flatnonzero(teams == team)
+    if pos.size == 0:
+        return pd.DataFrame(columns=["Team", "Conference", "Distance", "Similarity"])
+    i = int(pos[0])
+
+    w = np.array([float((weights or {}).get(s, 1.0)) for s in index["sections"]], dtype=np.float32)
+    if w.sum() <= 0:
+        w = np.ones_like(w)
+    dist = np.sqrt(np.tensordot(w / w.sum(), index["blocks"][:, i, :], axes=1))
+    dist[i] = np.inf  # never return the team itself
+
+    k = max(0, min(int(k), len(teams) - 1))
+    top = np.argpartition(dist, k)[:k] if k < len(dist) else np.arange(len(dist))
+    top = top[np.argsort(dist[top])]
+
+    return pd.DataFrame({
+        "Team": teams[top],
+        "Conference": index["conferences"][top] if index["conferences"] is not None else None,
+        "Distance": dist[top].round(3),
+        "Similarity": (1.0 / (1.0 + dist[top])).round(3),
+    })
+
+
+if __name__ == "__main__":
+    # prebuild for the current data version: PYTHONPATH=APP python -m common.similarity
+    frame = pd.read_csv(ALL_STATS_PATH, encoding="latin1")
+    idx = load_or_build_index(frame)
+    print(f"similarity index ready: {len(idx['teams'])} teams x {len(idx['sections'])} sections")
@@ -0,0 +1,107 @@
+# common/stat_groups.py
+# Stat sections shown on the Team Breakdown page (column key -> display label)
+
+offense_cols = {
+    "Points": "Points Per Game",
+    "FG_PERC": "Field Goal Percentage",
+    "FGM/G": "Field Goals Made per Game",
+    "FG3_PERC": "3 Point Field Goal Percentage",
+    "FG3M/G": "3 Point Field Goals Made per Game",
+    "FT_PERC": "Free Throw Percentage",
+    "FTM/G": "Free Throws Made per Game"
+}
+
+defense_cols = {
+    "OPP_PPG": "Opponent Points Per Game",
+    "OPP_FG_PERC": "Opponent Field Goal Percentage",
+    "OPP_FGM/G": "Opponent FGM per Game",
+    "OPP_FG3_PERC": "Opponent 3PT Percentage",
+    "OPP_FG3M/G": "Opponent 3PTM per Game",
+    "OPP_% of Points from 3": "Opponent % of Points from 3",
+    "OPP_% of shots taken from 3": "Opponent % of Shots Taken from 3",
+    "OPP_OReb": "Opponent Offensive Rebounds"
+}
+
+extra_cols = {
+    "OReb": "Offensive Rebounds",
+    "OReb chances": "Offensive Rebound Rate",
+    "DReb": "Defensive Rebounds",
+    "Rebounds": "Total Rebounds",
+    "Rebound Rate": "Rebound Rate",
+    "AST": "Assists",
+    "AST/FGM": "Assists per Field Goal Made",
+    "TO": "Turnovers",
+    "STL": "Steals",
+    "PF": "Personal Fouls",
+    "Foul Differential": "Foul Differential"
+}
+
+scoring_cols = {
+    "Extra Scoring Chances": "Extra Scoring Chances",
+    "PTS_OFF_TURN": "Points Off Turnovers",
+    "FST_BREAK": "Fast Break Points",
+    "PTS_PAINT": "Points in Paint",
+    "% of Points from 3": "Percent of Points from 3",
+    "% of shots taken from 3": "Percent of Shots Taken from 3"
+}
+
+# section title -> columns, in page order
+sections = {
+    "Offensive Statistics": offense_cols,
+    "Defensive Statistics": defense_cols,
+    "Extra Statistical Values": extra_cols,
+    "Scoring Statistics": scoring_cols,
+}
+
+# comparison page grouping (same stats, shorter titles)
+stat_groups = {
+    "Offense": list(offense_cols),
+    "Defense": list(defense_cols),
+    "Extra Statistical Values": list(extra_cols),
+    "Scoring Statistics": list(scoring_cols),
+}
+
+# -----------------------
+# Explicit rank mapping (source-of-truth)
+# -----------------------
+rank_overrides = {
+    # offense
+    "Points": "Points_RANK",
+    "FG_PERC": "FG_PERC_Rank",
+    "FGM/G": "FGM/G_Rank",
+    "FG3_PERC": "FG3_PERC_Rank",
+    "FG3M/G": "FG3M/G_Rank",
+    "FT_PERC": "FT_PERC_Rank",
+    "FTM/G": "FTM/G_RANK",
+
+    # defense
+    "OPP_PPG": "OPP_PPG_RANK",
+    "OPP_FG_PERC": "OPP_FG_PERC_Rank",
+    "OPP_FGM/G": "OPP_FGM/G_Rank",
+    "OPP_FG3_PERC": "OPP_FG3_PERC_Rank",
+    "OPP_FG3M/G": "OPP_FG3M/G_Rank",
+    "OPP_% of Points from 3": "OPP_% of Points from 3 rank",
+    "OPP_% of shots taken from 3": "OPP_% of shots taken from 3 Rank",
+    "OPP_OReb": "OPP_OReb_RANK",
+
+    # extra stats
+    "OReb": "OReb Rank",
+    "OReb chances": "OReb chances Rank",
+    "DReb": "DReb Rank",
+    "Rebounds": "Rebounds Rank",
+    "Rebound Rate": "Rebound Rate Rank",
+    "AST": "AST Rank",
+    "AST/FGM": "AST/FGM Rank",
+    "TO": "TO Rank",
+    "STL": "STL Rank",
+    "PF": "PF_Rank",
+    "Foul Differential": "Foul Differential Rank",
+
+    # scoring stats
+    "Extra Scoring Chances": "Extra Scoring Chances Rank",
+    "PTS_OFF_TURN": "PTS_OFF_TURN_RANK",
+    "FST_BREAK": "FST_BREAK_RANK",
+    "PTS_PAINT": "PTS_PAINT_RANK",
+    "% of Points from 3": "% of Points from 3_RANK",
+    "% of shots taken from 3": "% of shots taken from 3_RANK",
+}
@@ -0,0 +1,253 @@
+# common/teams.py
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+import weakref
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from common.seasons import available_seasons, load_table, table_version
+
+log = logging.getLogger(__name__)
+
+# alternate spelling -> canonical (All_stats) name; spellings that only differ in
+# case, punctuation, 'State' vs 'St.' or stray mojibake are matched by name_key()
+ALIASES = {
+    "UConn": "Connecticut",
+    "Ole Miss": "Mississippi",
+    "Miami": "Miami FL",
+    "Miami (Ohio)": "Miami OH",
+    "NC State": "N.C. State",
+    "North Carolina St.": "N.C. State",
+    "UNC": "North Carolina",
+    "Pitt": "Pittsburgh",
+    "St. Mary's": "Saint Mary's",
+    "Saint Mary's (CA)": "Saint Mary's",
+    "St. Joseph's": "Saint Joseph's",
+    "St. Peter's": "Saint Peter's",
+    "St. Louis": "Saint Louis",
+    "St. Francis (PA)": "Saint Francis",
+    "Southern California": "USC",
+    "Central Florida": "UCF",
+    "Brigham Young": "BYU",
+    "Louisiana State": "LSU",
+    "Southern Methodist": "SMU",
+    "Texas Christian": "TCU",
+    "Virginia Commonwealth": "VCU",
+    "Long Island": "LIU",
+    "Long Island University": "LIU",
+    "Omaha": "Nebraska Omaha",
+    "UT Martin": "Tennessee Martin",
+    "UIC": "Illinois Chicago",
+    "SIUE": "SIU Edwardsville",
+    "Fort Wayne": "Purdue Fort Wayne",
+    "UMass": "Massachusetts",
+    "Texas A&M-Commerce": "East Texas A&M",
+    "Texas A&M-Corpus Christi": "Texas A&M Corpus Chris",
+    "Texas A&M Corpus Christi": "Texas A&M Corpus Chris",
+    "UTRGV": "UT Rio Grande Valley",
+    "Detroit": "Detroit Mercy",
+    "Loyola-Chicago": "Loyola Chicago",
+    "Cal State Bakersfield": "Cal St. Bakersfield",
+    "CSUN": "Cal St. Northridge",
+    "Southern Mississippi": "Southern Miss",
+    "FGCU": "Florida Gulf Coast",
+    "ETSU": "East Tennessee St.",
+    "Middle Tennessee St.": "Middle Tennessee",
+    "Queens (NC)": "Queens",
+}
+
+
+def name_key(name):
+    """Matching key: mojibake repaired, accents/quotes folded, 'State' == 'St.', punctuation ignored."""
+    s = str(name)
+    try:
+        s = s.encode("latin1").decode("utf-8")  # 'Saint Maryâ\x80\x99s' read as latin1 -> 'Saint Mary’s'
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        pass
+    s = s.replace("’", "'").replace("‘", "'")
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode().lower()
+    s = re.sub(r"\bstate\b", "st", s)
+    return re.sub(r"[^a-z0-9&]+", " ", s).strip()
+
+
+class TeamRegistry:
+    """
+    Canonical team IDs: 0..n-1 over the sorted All_stats team names. Every
+    lookup resolves through name_key() and ALIASES, so the same team spelled
+    two ways gets one ID. Names that resolve to nothing are counted per source
+    so they show up in unmatched_report() instead of silently dropping rows.
+    """
+
+    def __init__(self, names, aliases=ALIASES):
+        # first spelling seen per key is canonical (pass the newest season's names first)
+        canon = {}
+        for n in names:
+            if pd.notna(n) and str(n).strip():
+                canon.setdefault(name_key(n), str(n).strip())
+        self.names = pd.Index(sorted(canon.values()))
+        self._by_key = {k: self.names.get_loc(n) for k, n in canon.items()}
+        for alias, canonical in aliases.items():
+            if canonical in self.names:
+                self._by_key.setdefault(name_key(alias), self.names.get_loc(canonical))
+        # changes whenever an ID could map to a different team (keys artifacts built on IDs)
+        self.version = hashlib.sha1(repr((list(self.names), sorted(self._by_key.items()))).encode()).hexdigest()[:16]
+        self._unmatched = {}   # source -> {raw name: rows}
+        self._rows_memo = {}   # id(frame), col -> (weakref, rows)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    # -----------------------
+    # Name -> ID
+    # -----------------------
+    def id_of(self, name):
+        """Team ID for one name, or -1."""
+        if name is None or (not isinstance(name, str) and pd.isna(name)):
+            return -1
+        return self._by_key.get(name_key(name), -1)
+
+    def ids(self, values, source=None):
+        """
+        Vectorized ID lookup (-1 for unknown / missing). Only distinct names are
+        resolved. Unmatched names are recorded under `source` when given.
+        """
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+        uid = np.fromiter((self.id_of(u) for u in uniques), dtype=np.int32, count=len(uniques))
+        out = np.where(codes >= 0, uid[np.maximum(codes, 0)] if len(uid) else -1, -1).astype(np.int32)
+        if source is not None:
+            missing = np.flatnonzero(uid < 0)
+            if len(missing):
+                counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+                with self._lock:
+                    seen = self._unmatched.setdefault(source, {})
+                    for m in missing:
+                        seen[str(uniques[m])] = int(counts[m])
+        return out
+
+    def canonical(self, values, source=None):
+        """Canonical names (None where unknown)."""
+        ids = self.ids(values, source)
+        return np.where(ids >= 0, self.names.to_numpy(dtype=object)[np.maximum(ids, 0)], None)
+
+    # -----------------------
+    # ID -> row of a team table
+    # -----------------------
+    def rows(self, df, col="Teams"):
+        """
+        Row position of every team ID in `df` (first occurrence, -1 if absent).
+        Memoized per frame object, so repeated lookups against the shared
+        cached frames cost one array index.
+        """
+        key = (id(df), col)
+        with self._lock:
+            memo = self._rows_memo.get(key)
+        if memo is not None and memo[0]() is df:
+            return memo[1]
+        ids = self.ids(df[col], source=None)
+        rows = np.full(len(self), -1, dtype=np.int64)
+        ok = np.flatnonzero(ids >= 0)
+        # reversed so the first occurrence wins
+        rows[ids[ok][::-1]] = ok[::-1]
+        with self._lock:
+            self._rows_memo = {k: v for k, v in self._rows_memo.items() if v[0]() is not None}
+            self._rows_memo[key] = (weakref.ref(df), rows)
+        return rows
+
+    def row(self, df, team, col="Teams"):
+        """Row position of one team in `df`, or None."""
+        tid = self.id_of(team)
+        if tid < 0:
+            return None
+        pos = self.rows(df, col)[tid]
+        return int(pos) if pos >= 0 else None
+
+    def team_row(self, df, team, col="Teams"):
+        """The team's row of `df` as a Series (like df[df[col] == team].iloc[0]), or None."""
+        pos = self.row(df, team, col)
+        return None if pos is None else df.iloc[pos]
+
+    def mask(self, values, team, source=None):
+        """Boolean mask of `values` naming `team` under any alias."""
+        return self.ids(values, source) == self.id_of(team)
+
+    # -----------------------
+    # Report
+    # -----------------------
+    def unmatched_report(self):
+        """Every name that failed to resolve, by source, with its row count."""
+        with self._lock:
+            rows = [{"Source": src, "Name": name, "Rows": n}
+                    for src, names in self._unmatched.items() for name, n in names.items()]
+        return pd.DataFrame(rows, columns=["Source", "Name", "Rows"]).sort_values(
+            ["Source", "Rows"], ascending=[True, False]).reset_index(drop=True)
+
+
+# -----------------------
+# Process-wide registry + load-time audit
+# -----------------------
+# (table, column) pairs holding team names in the season tables
+SEASON_NAME_COLUMNS = [
+    ("schedule", "Home"), ("schedule", "Away"),
+    ("history", "Team"), ("history", "Opponent"),
+]
+
+
+def audit_team_names(registry, season, data_versions=None):
+    """Resolve every team-name column of one season's files, recording unmatched names."""
+    for table, col in SEASON_NAME_COLUMNS:
+        try:
+            frame = load_table(table, season, data_versions=data_versions)
+        except FileNotFoundError:
+            continue
+        if col in frame.columns:
+            registry.ids(frame[col], source=f"{table}.{col}")
+    try:
+        from common.clutch import load_clutch_games
+        from common.players import load_player_games
+        for source, loader in (("clutch", load_clutch_games), ("players", load_player_games)):
+            games = loader()
+            for col in ("Team", "Opponent"):
+                if col in games.columns:
+                    registry.ids(games[col], source=f"{source}.{col}")
+    except (FileNotFoundError, KeyError):
+        pass  # Databook tables are optional
+
+
+@st.cache_resource(max_entries=2)
+def _build_registry(versions):
+    names = []
+    for season, _ in versions:  # newest first
+        names.extend(load_table("all_stats", season, columns=("Teams",))["Teams"].dropna().astype(str))
+    return TeamRegistry(names)
+
+
+def get_team_registry(data_versions=None):
+    """
+    Registry over every stored season's All_stats teams (IDs stay stable while
+    the set of teams does). Built once per All_stats version set; the first
+    build audits the current season's files and logs any unmatched names.
+    """
+    versions = tuple((s, table_version("all_stats", s, data_versions)) for s in available_seasons())
+    registry = _build_registry(versions)
+    if not getattr(registry, "_audited", False):
+        registry._audited = True
+        audit_team_names(registry, versions[0][0], data_versions)
+        report = registry.unmatched_report()
+        if not report.empty:
+            log.warning("unmatched team names: %s",
+                        "; ".join(f"{r.Source}: {r.Name} ({r.Rows})" for r in report.itertuples()))
+    return registry
+
+
+if __name__ == "__main__":
+    # PYTHONPATH=APP python -m common.teams  -> unmatched-name report for the current season's files
+    reg = get_team_registry()
+    print(f"{len(reg)} teams")
+    rep = reg.unmatched_report()
+    print(rep.to_string(index=False) if not rep.empty else "all team names resolved")
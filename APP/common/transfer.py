@@ -0,0 +1,240 @@
+# common/transfer.py
+import numpy as np
+import pandas as pd
+
+from common.cache import pinned_source
+from common.databook import parse_sheet
+from common.ranks import lower_is_better, rank_column
+
+TRANSFER_TABLE_PATH = "Data/2025_March_Madness_Databook/Team Transfer-Table 1.csv"
+
+# columns of the sheet that are sample totals (the rest are already per game)
+TOTAL_COLS = ["FGM", "FGA", "FG3sM", "FG3sA", "FTM", "FTA", "OPP_FGM", "OPP_FGA", "OPP_FG3sM", "OPP_FG3sA"]
+
+# player season-line column (common/players.py) -> team profile column
+PLAYER_COLS = {
+    "FGM": "FGM", "FGA": "FGA", "3M": "FG3sM", "3A": "FG3sA", "FTM": "FTM", "FTA": "FTA",
+    "OReb": "OReb", "DReb": "DReb", "AST": "AST", "STL": "STL", "TO": "TO", "PF": "PF", "PTS": "Points",
+}
+
+
+def _ratio(a, b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b != 0, a / b, np.nan)
+
+
+def _possessions(c):
+    return c["FGA"] - c["OReb"] + c["TO"] + 0.44 * c["FTA"]
+
+
+# derived stat -> (profile columns it reads, vectorized formula over a {column: array} mapping)
+DERIVED = {
+    "FG_PERC": (("FGM", "FGA"), lambda c: _ratio(c["FGM"], c["FGA"])),
+    "FG3_PERC": (("FG3sM", "FG3sA"), lambda c: _ratio(c["FG3sM"], c["FG3sA"])),
+    "FT_PERC": (("FTM", "FTA"), lambda c: _ratio(c["FTM"], c["FTA"])),
+    "FTA/FGA": (("FTA", "FGA"), lambda c: _ratio(c["FTA"], c["FGA"])),
+    "% of shots taken from 3": (("FG3sA", "FGA"), lambda c: _ratio(c["FG3sA"], c["FGA"])),
+    "% of Points from 3": (("FG3sM", "Points"), lambda c: _ratio(3 * c["FG3sM"], c["Points"])),
+    "AST/FGM": (("AST", "FGM"), lambda c: _ratio(c["AST"], c["FGM"])),
+    "Rebounds": (("OReb", "DReb"), lambda c: c["OReb"] + c["DReb"]),
+    "OReb_rate": (("OReb", "OPP_DReb"), lambda c: _ratio(c["OReb"], c["OReb"] + c["OPP_DReb"])),
+    "DReb_rate": (("DReb", "OPP_OReb"), lambda c: _ratio(c["DReb"], c["DReb"] + c["OPP_OReb"])),
+    "STEAL_TURNOVER_RATIO": (("STL", "TO"), lambda c: _ratio(c["STL"], c["TO"])),
+    "Possessions": (("FGA", "OReb", "TO", "FTA"), _possessions),
+    "Off_eff": (("Points", "FGA", "OReb", "TO", "FTA"), lambda c: 100 * _ratio(c["Points"], _possessions(c))),
+    "Def_eff": (("Opp Points", "FGA", "OReb", "TO", "FTA"), lambda c: 100 * _ratio(c["Opp Points"], _possessions(c))),
+    "Margin": (("Points", "Opp Points"), lambda c: c["Points"] - c["Opp Points"]),
+}
+
+# All_stats column -> profile column it moves with (model features are scaled by after / before)
+ALL_STATS_COLS = {
+    **{c: c for c in ("FGM", "FGA", "FG3sM", "FG3sA", "FTM", "FTA", "OReb", "DReb", "AST", "TO", "STL", "PF",
+                      "Points", "Rebounds", "FG_PERC", "FG3_PERC", "FT_PERC", "FTA/FGA", "AST/FGM", "Off_eff",
+                      "% of Points from 3", "% of shots taken from 3", "STEAL_TURNOVER_RATIO")},
+    "FGA/G": "FGA", "FGM/G": "FGM", "FG3M/G": "FG3sM", "FTM/G": "FTM",
+}
+
+
+# -----------------------
+# Engine
+# -----------------------
+class TransferEngine:
+    """
+    Team profiles from the Team Transfer table (per game, by team ID) plus
+    every derived rate and league rank, built once. A scenario (players
+    leaving / joining teams) only touches the teams it moves players between
+    and the columns those players' lines feed: their derived rates are
+    recomputed for those rows and only those columns are re-ranked.
+    """
+
+    def __init__(self, transfer, lines, registry):
+        self.registry = registry
+        ids = registry.ids(transfer["Team"], source="team_transfer.Team")
+        keep = (ids >= 0) & ~pd.Series(ids).duplicated().to_numpy()
+        self.base_cols = [c for c in transfer.columns if c != "Team" and pd.api.types.is_numeric_dtype(transfer[c])]
+        # own copy: the totals are scaled in place below (to_numpy can return a read-only view under copy-on-write)
+        raw = transfer.loc[keep, self.base_cols].apply(pd.to_numeric, errors="coerce").to_numpy(
+            dtype=float, na_value=np.nan, copy=True)
+
+        # shooting columns are totals over the team's sample; the points identity gives its length
+        col = {c: raw[:, i] for i, c in enumerate(self.base_cols)}
+        games = _ratio(2 * col["FGM"] + col["FG3sM"] + col["FTM"], col["Points"])
+        self.games = np.where(np.isfinite(games) & (games > 0), np.round(games), 1.0)
+        for i, c in enumerate(self.base_cols):
+            if c in TOTAL_COLS:
+                raw[:, i] = raw[:, i] / self.games
+
+        n = len(registry)
+        self.present = np.zeros(n, dtype=bool)
+        self.present[ids[keep]] = True
+        self.columns = self.base_cols + [d for d, (inputs, _) in DERIVED.items() if set(inputs) <= set(self.base_cols)]
+        self.col_index = {c: i for i, c in enumerate(self.columns)}
+        self.values = np.full((n, len(self.columns)), np.nan)
+        self.values[ids[keep], :len(self.base_cols)] = raw
+        self._derive(np.flatnonzero(self.present), self.columns[len(self.base_cols):], self.values)
+        self.ranks = np.column_stack([self._rank(self.values[:, j], c) for j, c in enumerate(self.columns)])
+
+        # per-game player lines, one row per (player, team)
+        self.players = lines[["Player", "Team", "GP", "MIN/G"]].reset_index(drop=True)
+        self.players["Team ID"] = registry.ids(lines["Team"], source="players.Team")
+        self.player_cols = [PLAYER_COLS[c] for c in PLAYER_COLS if PLAYER_COLS[c] in self.col_index]
+        per_game = lines[[c for c in PLAYER_COLS if PLAYER_COLS[c] in self.col_index]].to_numpy(dtype=float)
+        self.player_lines = per_game / np.maximum(lines["GP"].to_numpy(dtype=float), 1)[:, None]
+
+    def _derive(self, rows, derived, values):
+        """Recompute `derived` columns of `values` for `rows` in place (one vectorized formula per column)."""
+        if not len(rows):
+            return
+        cols = {c: values[rows, self.col_index[c]] for c in self.base_cols}
+        for d in derived:
+            values[rows, self.col_index[d]] = DERIVED[d][1](cols)
+
+    def _rank(self, column, col):
+        return rank_column(np.where(self.present, column, np.nan), lower_is_better(col))
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+    def roster(self, team):
+        """Players on `team` with their per-game line, most minutes first."""
+        mask = (self.players["Team ID"] == self.registry.id_of(team)).to_numpy()
+        out = self.players.loc[mask, ["Player", "GP", "MIN/G"]].reset_index(drop=True)
+        out[self.player_cols] = self.player_lines[mask]
+        return out.sort_values("MIN/G", ascending=False).reset_index(drop=True)
+
+    def player_row(self, player, team):
+        """Index of (player, team) in the season lines, or None."""
+        hits = np.flatnonzero((self.players["Player"].astype(str) == str(player)).to_numpy()
+                              & (self.players["Team ID"] == self.registry.id_of(team)).to_numpy())
+        return int(hits[0]) if len(hits) else None
+
+    def profile(self, team):
+        """One team's per-game profile with league ranks."""
+        tid = self.registry.id_of(team)
+        return pd.DataFrame({"Value": self.values[tid], "Rank": self.ranks[tid]}, index=self.columns)
+
+    # -----------------------
+    # Scenarios
+    # -----------------------
+    def scenario(self, moves):
+        """
+        Apply roster moves: (player, from_team, to_team, share). The player's
+        per-game line leaves from_team and `share` of it (the part of the role
+        that carries over) joins to_team; either team may be None (a plain
+        removal / addition).
+        Returns a dict:
+          teams      team IDs whose profile changed
+          columns    profile columns that changed (stats the lines feed + rates built on them)
+          values     (teams, columns) after the moves
+          ranks      (all teams, columns) league ranks after the moves
+          summary    long frame: Team, Stat, Before, After, Change, Rank before, Rank after
+        """
+        delta = {}
+        for player, from_team, to_team, share in moves:
+            row = self.player_row(player, from_team) if from_team is not None else None
+            if row is None:
+                # an incoming player without a from_team is looked up on any roster
+                hits = np.flatnonzero((self.players["Player"].astype(str) == str(player)).to_numpy())
+                if not len(hits):
+                    raise KeyError(f"No season line for {player}.")
+                row = int(hits[0])
+            line = self.player_lines[row]
+            if from_team is not None:
+                tid = self.registry.id_of(from_team)
+                delta[tid] = delta.get(tid, 0) - line
+            if to_team is not None:
+                tid = self.registry.id_of(to_team)
+                delta[tid] = delta.get(tid, 0) + share * line
+        teams = np.array(sorted(t for t in delta if t >= 0 and self.present[t]), dtype=np.int64)
+        moved = np.array([delta[t] for t in teams]).reshape(len(teams), len(self.player_cols))
+
+        changed_base = [c for j, c in enumerate(self.player_cols) if np.any(moved[:, j] != 0)]
+        changed_derived = [d for d in self.columns[len(self.base_cols):]
+                           if set(DERIVED[d][0]) & set(changed_base)]
+        columns = changed_base + changed_derived
+        col_idx = [self.col_index[c] for c in columns]
+
+        after = self.values[teams].copy()
+        player_idx = [self.col_index[c] for c in self.player_cols]
+        after[:, player_idx] += moved
+        self._derive(np.arange(len(teams)), changed_derived, after)
+
+        ranks = np.empty((len(self.values), len(columns)))
+        for k, j in enumerate(col_idx):
+            column = self.values[:, j].copy()
+            column[teams] = after[:, j]
+            ranks[:, k] = self._rank(column, self.columns[j])
+
+        names = self.registry.names[teams]
+        summary = pd.DataFrame({
+            "Team": np.repeat(names, len(columns)),
+            "Stat": np.tile(columns, len(teams)),
+            "Before": self.values[np.ix_(teams, col_idx)].ravel(),
+            "After": after[:, col_idx].ravel(),
+            "Rank before": self.ranks[np.ix_(teams, col_idx)].ravel(),
+            "Rank after": ranks[teams].ravel(),
+        })
+        summary.insert(4, "Change", summary["After"] - summary["Before"])
+        return {"teams": teams, "columns": columns, "values": after[:, col_idx], "ranks": ranks,
+                "summary": summary}
+
+    def adjusted_team_matrix(self, team_matrix, result):
+        """
+        Copy of an ID-indexed model team matrix (common/features.py) with each
+        moved team's All_stats-derived features scaled by its profile's
+        after / before ratio. Columns the moves do not reach are unchanged.
+        """
+        out = team_matrix.copy()
+        pos = out.index.get_indexer(result["teams"])
+        for col in out.columns:
+            source = ALL_STATS_COLS.get(col)
+            if source not in result["columns"]:
+                continue
+            k = result["columns"].index(source)
+            before = self.values[result["teams"], self.col_index[source]]
+            ratio = _ratio(result["values"][:, k], before)
+            ok = (pos >= 0) & np.isfinite(ratio)
+            out.iloc[pos[ok], out.columns.get_loc(col)] *= ratio[ok]
+        return out
+
+
+def load_transfer_table(path=TRANSFER_TABLE_PATH, version=None):
+    """Team Transfer sheet as a typed frame (common/databook.py parser), read from the copy pinned to `version`."""
+    frame, _ = parse_sheet(pinned_source(path, version))
+    return frame[frame["Team"].notna()].reset_index(drop=True)
+
+
+def rescore_games(model, team_matrix, home, away):
+    """
+    P(home wins) for a batch of games given as team-ID arrays (NaN where a team
+    has no features). `model` is the fitted pipeline or its CompiledForest.
+    """
+    home_idx = team_matrix.index.get_indexer(home)
+    away_idx = team_matrix.index.get_indexer(away)
+    valid = (home_idx >= 0) & (away_idx >= 0)
+    values = team_matrix.to_numpy()
+    probs = np.full(len(home_idx), np.nan)
+    if valid.any():
+        X = values[home_idx[valid]] - values[away_idx[valid]]
+        probs[valid] = model.predict_proba(X)[:, 1]
+    return probs
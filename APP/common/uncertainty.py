@@ -0,0 +1,111 @@
+# common/uncertainty.py
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from common.features import pairwise_probabilities
+from common.predictor import PCA_COMPONENTS, make_pipeline, training_data
+
+# Bootstrap ensemble: each member refits the predictor on a resample (with
+# replacement) of the same training split and scores every (home, away) pair.
+# Intervals are percentiles across members, i.e. how much P(home wins) moves
+# when the model is fit on a different draw of the same games.
+BOOTSTRAP_MEMBERS = 25
+MEMBER_TREES = 100
+INTERVAL_LEVEL = 0.90
+
+
+# -----------------------
+# Members (process pool)
+# -----------------------
+_member_X = _member_y = _member_matrix = None
+_member_teams = 0
+
+
+def _init_members(X, y, team_matrix, n_teams):
+    global _member_X, _member_y, _member_matrix, _member_teams
+    _member_X, _member_y, _member_matrix, _member_teams = X, y, team_matrix, n_teams
+
+
+def _fit_member(seed, n_estimators, pca_components):
+    """Pairwise P(home wins) (float32) of one model fit on a bootstrap resample."""
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(_member_y), len(_member_y))
+    model = make_pipeline(_member_X.shape[1], pca_components, n_estimators, random_state=seed)
+    model.fit(_member_X[rows], _member_y[rows])
+    return pairwise_probabilities(model, _member_matrix, _member_teams).astype(np.float32)
+
+
+def bootstrap_pairwise(X, y, team_matrix, n_teams, members=BOOTSTRAP_MEMBERS, n_estimators=MEMBER_TREES,
+                       pca_components=PCA_COMPONENTS, workers=None):
+    """
+    (members, n_teams, n_teams) pairwise probabilities, one slice per bootstrap
+    member. Members are independent, so they are fit in a process pool
+    (spawned workers; in-process when one worker is enough).
+    """
+    seeds = list(range(1, members + 1))
+    workers = workers or min(members, os.cpu_count() or 1)
+    if workers <= 1:
+        _init_members(X, y, team_matrix, n_teams)
+        slices = [_fit_member(s, n_estimators, pca_components) for s in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_members, initargs=(X, y, team_matrix, n_teams)) as pool:
+            slices = list(pool.map(_fit_member, seeds, [n_estimators] * members, [pca_components] * members))
+    return np.stack(slices)
+
+
+def interval_arrays(df_all, df_hist, all_stats_version, registry, members=BOOTSTRAP_MEMBERS,
+                    n_estimators=MEMBER_TREES, level=INTERVAL_LEVEL, workers=None):
+    """
+    (arrays, meta) for cached_arrays(): the member matrices plus their low / high
+    percentiles per pair. Resamples the predictor's own training split
+    (same features, same test hold-out). arrays is empty when ML is unavailable.
+    """
+    _, team_matrix, X, y, warning = training_data(df_all, df_hist, all_stats_version, registry)
+    if X is None:
+        return {}, {"warning": warning}
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.20, random_state=42)
+    stack = bootstrap_pairwise(X_train, y_train, team_matrix, len(registry), members, n_estimators, workers=workers)
+    tail = (1 - level) / 2 * 100
+    low, high = np.percentile(stack, [tail, 100 - tail], axis=0)   # NaN pairs (no features) stay NaN
+    return ({"members": stack, "low": low.astype(np.float32), "high": high.astype(np.float32)},
+            {"members": members, "trees": n_estimators, "level": level, "n_train": len(X_train)})
+
+
+# -----------------------
+# Lookups (gathers from the cached arrays)
+# -----------------------
+def game_intervals(arrays, home, away):
+    """(low, high) P(home wins) per game from team-ID arrays; NaN where either team is unknown."""
+    known = (home >= 0) & (away >= 0)
+    h, a = np.maximum(home, 0), np.maximum(away, 0)
+    low = np.where(known, arrays["low"][h, a], np.nan)
+    high = np.where(known, arrays["high"][h, a], np.nan)
+    return low, high
+
+
+def expected_wins_intervals(members, home, away, n_teams, level=INTERVAL_LEVEL):
+    """
+    Expected wins per team ID under every member (home win prob at home,
+    1 - it on the road; games the model cannot score count 0.5, as in the
+    point predictions), summarised as (low, high) percentiles over members.
+    Teams without a game are NaN.
+    """
+    known = (home >= 0) & (away >= 0)
+    probs = np.where(known, members[:, np.maximum(home, 0), np.maximum(away, 0)], np.nan)  # (members, games)
+    probs = np.nan_to_num(probs.astype(float), nan=0.5)
+    offsets = np.arange(len(members))[:, None] * n_teams
+    size = len(members) * n_teams
+    wins = np.zeros(size)
+    for ids, credit in ((home, probs), (away, 1 - probs)):
+        ok = ids >= 0
+        wins += np.bincount((ids[ok] + offsets).ravel(), credit[:, ok].ravel(), size)
+    wins = wins.reshape(len(members), n_teams)
+    tail = (1 - level) / 2 * 100
+    low, high = np.percentile(wins, [tail, 100 - tail], axis=0)
+    played = (np.bincount(home[home >= 0], minlength=n_teams) + np.bincount(away[away >= 0], minlength=n_teams)) > 0
+    return np.where(played, low, np.nan), np.where(played, high, np.nan)
@@ -1,14 +1,18 @@
 import streamlit as st
-import pandas as pd
+
+from common.data_version import get_data_versions
+from common.seasons import load_table, season_selector
 
 # Load data
-@st.cache_data
-def load_data():
-    df = pd.read_csv("Data/All_stats.csv", encoding="latin1")
-    df.columns = df.columns.str.strip()  # clean headers
-    return df
+# only the columns the home page shows
+HOME_COLS = ["Teams", "Wins", "Losses", "STAT_STREN", "SM"]
+
+def load_data(season, data_versions):
+    return load_table("all_stats", season, columns=HOME_COLS, data_versions=data_versions)
 
-df = load_data()
+data_versions = get_data_versions()
+season = season_selector()
+df = load_data(season, data_versions)
 
 # --- HEADER WITH LOGO + TITLE ---
 col1, col2 = st.columns([3,1])
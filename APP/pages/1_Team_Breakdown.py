@@ -1,137 +1,69 @@
-import re
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
+import numpy as np
+
+from common.stat_groups import sections, offense_cols, defense_cols, extra_cols, scoring_cols
+from common.figures import (format_value, format_rank, figure_from_json, get_team_figure,
+                             prerender_in_background, prerender_team_figures)
+from common.similarity import load_or_build_index, most_similar
+from common.coach import SCORE_COL, coach_version, load_coach_scores
+from common.ranks import rank_scope_key, rank_scope_selector, resolved_ranks
+from common.data_version import get_data_versions
+from common.seasons import CURRENT_SEASON, load_table, season_selector, table_source, table_version
+from common.teams import get_team_registry
 
 # -----------------------
 # Load data
 # -----------------------
-@st.cache_data
-def load_data():
-    return pd.read_csv("Data/All_stats.csv", encoding="latin1")
-
-df = load_data()
+data_versions = get_data_versions()
+season = season_selector()
+df = load_table("all_stats", season, data_versions=data_versions)
 
 # -----------------------
 # Helpers / formatting
 # -----------------------
-def format_value(key_or_label, val):
-    """Format numeric or percent values for display."""
-    if pd.isna(val):
-        return "N/A"
-    try:
-        v = float(val)
-    except Exception:
-        return str(val)
-    # treat as percent if key or label indicates percent
-    if ("PERC" in str(key_or_label).upper()) or ("%" in str(key_or_label)):
-        return f"{v:.1%}" if v <= 1 else f"{v:.1f}%"
-    # format integers without .0 if safe
-    if float(v).is_integer():
-        return str(int(v))
-    return f"{v:.1f}"
-
-def format_rank(val):
-    """Format rank display for right column."""
-    if val is None:
-        return "No rank mapping defined"
-    if pd.isna(val) or val == "N/A":
-        return "Not enough games played for ranking"
-    try:
-        return int(float(val))
-    except Exception:
-        return val
+# format_value / format_rank and the section charts live in common/figures.py
+# (shared with the batch pre-renderer)
 
 # -----------------------
-# Explicit rank mapping (source-of-truth)
+# Ranks: All_stats' own rank columns (rank_overrides in common/stat_groups.py,
+# engine-filled where a stat has none) or recomputed league / conference ranks
 # -----------------------
-rank_overrides = {
-    # offense
-    "Points": "Points_RANK",
-    "FG_PERC": "FG_PERC_Rank",
-    "FGM/G": "FGM/G_Rank",
-    "FG3_PERC": "FG3_PERC_Rank",
-    "FG3M/G": "FG3M/G_Rank",
-    "FT_PERC": "FT_PERC_Rank",
-    "FTM/G": "FTM/G_RANK",
-
-    # defense
-    "OPP_PPG": "OPP_PPG_RANK",
-    "OPP_FG_PERC": "OPP_FG_PERC_Rank",
-    "OPP_FGM/G": "OPP_FGM/G_Rank",
-    "OPP_FG3_PERC": "OPP_FG3_PERC_Rank",
-    "OPP_FG3M/G": "OPP_FG3M/G_Rank",
-    "OPP_% of Points from 3": "OPP_% of Points from 3 rank",
-    "OPP_% of shots taken from 3": "OPP_% of shots taken from 3 Rank",
-    "OPP_OReb": "OPP_OReb_RANK",
-
-    # extra stats
-    "OReb": "OReb Rank",
-    "OReb chances": "OReb chances Rank",
-    "DReb": "DReb Rank",
-    "Rebounds": "Rebounds Rank",
-    "Rebound Rate": "Rebound Rate Rank",
-    "AST": "AST Rank",
-    "AST/FGM": "AST/FGM Rank",
-    "TO": "TO Rank",
-    "STL": "STL Rank",
-    "PF": "PF_Rank",
-    "Foul Differential": "Foul Differential Rank",
-
-    # scoring stats
-    "Extra Scoring Chances": "Extra Scoring Chances Rank",
-    "PTS_OFF_TURN": "PTS_OFF_TURN_RANK",
-    "FST_BREAK": "FST_BREAK_RANK",
-    "PTS_PAINT": "PTS_PAINT_RANK",
-    "% of Points from 3": "% of Points from 3_RANK",
-    "% of shots taken from 3": "% of shots taken from 3_RANK",
-}
-
-def get_rank_col(key: str):
-    """Return explicit mapping. If missing, return None (no fallback)."""
-    return rank_overrides.get(key)
+rank_scope, rank_min_games = rank_scope_selector(df)
 
-def robust_normalize(df_section: pd.DataFrame) -> pd.DataFrame:
-    """Normalize each column to [0,1] with robust handling."""
-    out = pd.DataFrame(index=df_section.index, columns=df_section.columns, dtype=float)
-    for c in df_section.columns:
-        col = pd.to_numeric(df_section[c], errors='coerce')
-        if col.dropna().empty:
-            out[c] = 0.5
-            continue
-        mn = col.min(skipna=True)
-        mx = col.max(skipna=True)
-        if pd.isna(mn) or pd.isna(mx) or mx == mn:
-            out[c] = 0.5
-        else:
-            out[c] = (col - mn) / (mx - mn)
-    return out
+# -----------------------
+# Pre-rendered figures (every team, per All_stats version)
+# -----------------------
+figures_version = table_version("all_stats", season, data_versions)
+prerender_in_background(df, figures_version)
+data_versions.register(
+    "figures.teams", ["all_stats"],
+    lambda v: prerender_team_figures(load_table("all_stats", CURRENT_SEASON, version=v["all_stats"]), v["all_stats"]),
+)
 
 # -----------------------
 # Default team selection
 # -----------------------
-def _norm_name(s):
-    return str(s).strip().lower() if s else ""
-
-teams_sorted = sorted(df["Teams"].dropna().unique().tolist())
+# team IDs come from the shared registry (common/teams.py); rows are looked up by ID
+registry = get_team_registry(data_versions)
+team_rows = registry.rows(df)                 # team ID -> row of df (-1 if absent)
+team_ids = np.flatnonzero(team_rows >= 0)
+teams_sorted = registry.names[team_ids].tolist()
 default_index = 0
 if "Wins" in df.columns:
     wins = pd.to_numeric(df["Wins"], errors="coerce")
     if wins.notna().any():
-        try:
-            idxmax = wins.idxmax()
-            default_team_raw = df.at[idxmax, "Teams"]
-            match_idx = next((i for i, t in enumerate(teams_sorted) if _norm_name(t) == _norm_name(default_team_raw)), None)
-            if match_idx is not None:
-                default_index = match_idx
-        except Exception:
-            default_index = 0
+        default_pos = np.flatnonzero(team_ids == registry.id_of(df.at[wins.idxmax(), "Teams"]))
+        default_index = int(default_pos[0]) if len(default_pos) else 0
 
 # -----------------------
 # TEAM DROPDOWN
 # -----------------------
 selected_team = st.selectbox("Select a Team", teams_sorted, index=default_index)
-team_data = df[df["Teams"] == selected_team].iloc[0]
+team_data = df.iloc[team_rows[registry.id_of(selected_team)]]
+# cached per (All_stats version, rank source); one row lookup per team
+ranks = resolved_ranks(df, figures_version, rank_scope, rank_min_games)
+team_ranks = ranks.iloc[team_rows[registry.id_of(selected_team)]]
 team_conf = team_data.get("Conference", None)
 
 # -----------------------
@@ -155,114 +87,26 @@ def build_section_chart(section_cols: dict, section_title: str):
         with col2:
             st.write(format_value(key, team_data.get(key, float("nan"))))
         with col3:
-            rank_col = get_rank_col(key)
-            if rank_col is None:
-                st.write("No rank mapping defined")
-            else:
-                st.write(format_rank(team_data.get(rank_col, pd.NA)))
-
-    # Normalization for charts
-    stat_keys = list(section_cols.keys())
-    section_df = df[stat_keys].apply(pd.to_numeric, errors="coerce")
-    normalized = robust_normalize(section_df)
-
-    team_norm_row = normalized.loc[df["Teams"] == selected_team]
-    team_norm = team_norm_row.iloc[0].tolist() if team_norm_row.shape[0] > 0 else [0.5] * len(stat_keys)
-
-    conf_norm = None
-    if team_conf:
-        conf_rows = normalized[df["Conference"] == team_conf]
-        if conf_rows.shape[0] > 0:
-            conf_norm = conf_rows.mean(skipna=True).tolist()
+            # None (stat not ranked) -> "No rank mapping defined"; NaN -> not enough games
+            st.write(format_rank(team_ranks.get(key)))
 
-    league_norm = normalized.mean(skipna=True).tolist()
-
-    # Hover texts
-    hover_texts = []
-    for key, label in section_cols.items():
-        val = team_data.get(key, float("nan"))
-        rank_col = get_rank_col(key)
-        rank_val = format_rank(team_data.get(rank_col, pd.NA)) if rank_col else "No rank mapping defined"
-        col_min = section_df[key].min(skipna=True)
-        col_max = section_df[key].max(skipna=True)
-        conf_avg = df[df["Conference"] == team_conf][key].mean() if team_conf else float("nan")
-        league_avg = section_df[key].mean()
-        hover_texts.append(
-            f"<b>{label}</b><br>"
-            f"{selected_team}: {format_value(key, val)} (Rank: {rank_val})<br>"
-            f"Min: {format_value(key, col_min)} — Max: {format_value(key, col_max)}<br>"
-            f"{team_conf + ' Avg' if team_conf else 'Conf Avg'}: {format_value(key, conf_avg)}<br>"
-            f"League Avg: {format_value(key, league_avg)}"
-        )
-
-    # Chart
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=list(section_cols.values()), y=team_norm, mode="lines+markers",
-                             name=selected_team, hoverinfo="text", hovertext=hover_texts))
-    if conf_norm is not None:
-        fig.add_trace(go.Scatter(x=list(section_cols.values()), y=conf_norm, mode="lines+markers",
-                                 name=f"{team_conf} Avg", line=dict(dash="dash")))
-    fig.add_trace(go.Scatter(x=list(section_cols.values()), y=league_norm, mode="lines+markers",
-                             name="League Avg", line=dict(dash="dot")))
-
-    fig.update_layout(title=f"{section_title} Comparison (Normalized)",
-                      yaxis=dict(showticklabels=False, showgrid=False, zeroline=False, range=[0, 1]),
-                      xaxis=dict(tickangle=45),
-                      plot_bgcolor="white",
-                      margin=dict(t=60, b=120))
-    st.plotly_chart(fig, use_container_width=True)
+    # Chart (pre-rendered per team; rendered and stored on a cache miss); hover ranks match the table
+    fig_json = get_team_figure(df, figures_version, team_data["Teams"], f"breakdown.{section_title}", registry,
+                               ranks=ranks, rank_key=rank_scope_key(rank_scope, rank_min_games))
+    if fig_json is not None:
+        st.plotly_chart(figure_from_json(fig_json), use_container_width=True)
 
 # -------------------------------
 # Define sections
 # -------------------------------
-offense_cols = {
-    "Points": "Points Per Game",
-    "FG_PERC": "Field Goal Percentage",
-    "FGM/G": "Field Goals Made per Game",
-    "FG3_PERC": "3 Point Field Goal Percentage",
-    "FG3M/G": "3 Point Field Goals Made per Game",
-    "FT_PERC": "Free Throw Percentage",
-    "FTM/G": "Free Throws Made per Game"
-}
-
-defense_cols = {
-    "OPP_PPG": "Opponent Points Per Game",
-    "OPP_FG_PERC": "Opponent Field Goal Percentage",
-    "OPP_FGM/G": "Opponent FGM per Game",
-    "OPP_FG3_PERC": "Opponent 3PT Percentage",
-    "OPP_FG3M/G": "Opponent 3PTM per Game",
-    "OPP_% of Points from 3": "Opponent % of Points from 3",
-    "OPP_% of shots taken from 3": "Opponent % of Shots Taken from 3",
-    "OPP_OReb": "Opponent Offensive Rebounds"
-}
-
-extra_cols = {
-    "OReb": "Offensive Rebounds",
-    "OReb chances": "Offensive Rebound Rate",
-    "DReb": "Defensive Rebounds",
-    "Rebounds": "Total Rebounds",
-    "Rebound Rate": "Rebound Rate",
-    "AST": "Assists",
-    "AST/FGM": "Assists per Field Goal Made",
-    "TO": "Turnovers",
-    "STL": "Steals",
-    "PF": "Personal Fouls",
-    "Foul Differential": "Foul Differential"
-}
-
-scoring_cols = {
-    "Extra Scoring Chances": "Extra Scoring Chances",
-    "PTS_OFF_TURN": "Points Off Turnovers",
-    "FST_BREAK": "Fast Break Points",
-    "PTS_PAINT": "Points in Paint",
-    "% of Points from 3": "Percent of Points from 3",
-    "% of shots taken from 3": "Percent of Shots Taken from 3"
-}
+# offense_cols / defense_cols / extra_cols / scoring_cols live in common/stat_groups.py
+# (shared with the similarity index)
 
 # -------------------------------
 # Top note
 # -------------------------------
-st.info("ℹ️ Note: The **right column** in each table shows the team's **ranking** for that stat compared to all other teams.")
+rank_pool = "the other teams in its conference" if rank_scope == "conference" else "all other teams"
+st.info(f"ℹ️ Note: The **right column** in each table shows the team's **ranking** for that stat compared to {rank_pool}.")
 
 # -------------------------------
 # Build charts
@@ -272,3 +116,48 @@ build_section_chart(defense_cols, "Defensive Statistics")
 build_section_chart(extra_cols, "Extra Statistical Values")
 build_section_chart(scoring_cols, "Scoring Statistics")
 
+# -------------------------------
+# Coach impact (Databook Coach table scored with its fitted coefficients)
+# -------------------------------
+coach_board = load_coach_scores(season, coach_version(season, data_versions))
+data_versions.register("coach.scores", ["coach"], lambda v: load_coach_scores(CURRENT_SEASON, v["coach"]))
+
+if coach_board is not None:
+    st.header(f"{selected_team} Coach Impact")
+    coach_pos = np.flatnonzero(registry.mask(coach_board["Team"], selected_team))
+    if len(coach_pos) == 0 or pd.isna(coach_board.at[coach_pos[0], SCORE_COL]):
+        st.info(f"No coach score for {selected_team}.")
+    else:
+        coach_row = coach_board.iloc[coach_pos[0]]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Coach", coach_row["Coach"])
+        col2.metric(SCORE_COL, f"{coach_row[SCORE_COL]:.1f}")
+        col3.metric("Rank", f"{coach_row['Rank']} of {coach_board[SCORE_COL].notna().sum()}")
+        st.caption(f"Biggest lift: {coach_row['Top factor']} · biggest drag: {coach_row['Biggest drag']}")
+    with st.expander("Coach leaderboard"):
+        st.dataframe(coach_board, use_container_width=True, hide_index=True)
+
+# -------------------------------
+# Similar teams
+# -------------------------------
+@st.cache_resource(max_entries=4)
+def get_similarity_index(season, version, _df):
+    return load_or_build_index(_df, version=version, data_path=table_source("all_stats", season))
+
+data_versions.register(
+    "team_breakdown.similarity", ["all_stats"],
+    lambda v: get_similarity_index(CURRENT_SEASON, v["all_stats"],
+                                   load_table("all_stats", CURRENT_SEASON, version=v["all_stats"])),
+)
+
+st.header(f"Teams Most Similar to {selected_team}")
+with st.expander("Section weights"):
+    weight_cols = st.columns(len(sections))
+    section_weights = {}
+    for wc, title in zip(weight_cols, sections):
+        with wc:
+            section_weights[title] = st.slider(title, 0.0, 2.0, 1.0, 0.25, key=f"sim_w_{title}")
+k_similar = st.slider("Number of similar teams", 3, 15, 5)
+
+similar_df = most_similar(get_similarity_index(season, table_version("all_stats", season, data_versions), df), team_data["Teams"], k=k_similar, weights=section_weights)
+st.dataframe(similar_df, use_container_width=True, hide_index=True)
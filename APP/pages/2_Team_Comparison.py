@@ -4,86 +4,40 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
+from common.stat_groups import stat_groups, rank_overrides
+from common.ranks import category_avg_ranks, rank_scope_selector, resolved_ranks, team_rank_matrix
+from common.data_version import get_data_versions
+from common.seasons import load_table, season_selector, table_version
+from common.teams import get_team_registry
+
 # -----------------------
 # Load Data
 # -----------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("Data/All_stats.csv", encoding="latin1")
-    # defensive cleanup of header names
-    df.columns = df.columns.str.strip()
-    return df
+def load_data(season, data_versions):
+    # header names are stripped by the loader; the frame is shared, so no edits here
+    return load_table("all_stats", season, data_versions=data_versions)
 
-df = load_data()
+data_versions = get_data_versions()
+season = season_selector()
+df = load_data(season, data_versions)
+registry = get_team_registry(data_versions)
+all_stats_version = table_version("all_stats", season, data_versions)
 
 # -----------------------
-# Rank mapping (adjustable)
+# Ranks / stat groups
 # -----------------------
-rank_overrides = {
-    # offense
-    "Points": "Points_RANK",
-    "FG_PERC": "FG_PERC_Rank",
-    "FGM/G": "FGM/G_Rank",
-    "FG3_PERC": "FG3_PERC_Rank",
-    "FG3M/G": "FG3M/G_Rank",
-    "FT_PERC": "FT_PERC_Rank",
-    "FTM/G": "FTM/G_RANK",
-
-    # defense
-    "OPP_PPG": "OPP_PPG_RANK",
-    "OPP_FG_PERC": "OPP_FG_PERC_Rank",
-    "OPP_FGM/G": "OPP_FGM/G_Rank",
-    "OPP_FG3_PERC": "OPP_FG3_PERC_Rank",
-    "OPP_FG3M/G": "OPP_FG3M/G_Rank",
-    "OPP_% of Points from 3": "OPP_% of Points from 3 rank",
-    "OPP_% of shots taken from 3": "OPP_% of shots taken from 3 Rank",
-    "OPP_OReb": "OPP_OReb_RANK",
-
-    # extra statistical values (rebounds, fouls etc.)
-    "OReb": "OReb Rank",
-    "OReb chances": "OReb chances Rank",
-    "DReb": "DReb Rank",
-    "Rebounds": "Rebounds Rank",
-    "Rebound Rate": "Rebound Rate Rank",
-    "AST": "AST Rank",
-    "AST/FGM": "AST/FGM Rank",
-    "TO": "TO Rank",
-    "STL": "STL Rank",
-    "PF": "PF_Rank",
-    "Foul Differential": "Foul Differential Rank",
-
-    # scoring statistics
-    "Extra Scoring Chances": "Extra Scoring Chances Rank",
-    "PTS_OFF_TURN": "PTS_OFF_TURN_RANK",
-    "FST_BREAK": "FST_BREAK_RANK",
-    "PTS_PAINT": "PTS_PAINT_RANK",
-    "% of Points from 3": "% of Points from 3_RANK",
-    "% of shots taken from 3": "% of shots taken from 3_RANK",
-}
-
-def get_rank_col(key: str):
-    return rank_overrides.get(key)
-
-# -----------------------
-# Stat groups (reorganized)
-# -----------------------
-stat_groups = {
-    "Offense": [
-        "Points","FG_PERC","FGM/G","FG3_PERC","FG3M/G","FT_PERC","FTM/G"
-    ],
-    "Defense": [
-        "OPP_PPG","OPP_FG_PERC","OPP_FGM/G","OPP_FG3_PERC","OPP_FG3M/G",
-        "OPP_% of Points from 3","OPP_% of shots taken from 3","OPP_OReb"
-    ],
-    "Extra Statistical Values": [
-        "OReb","OReb chances","DReb","Rebounds","Rebound Rate",
-        "AST","AST/FGM","TO","STL","PF","Foul Differential"
-    ],
-    "Scoring Statistics": [
-        "Extra Scoring Chances","PTS_OFF_TURN","FST_BREAK","PTS_PAINT",
-        "% of Points from 3","% of shots taken from 3"
-    ]
-}
+# rank_overrides and stat_groups live in common/stat_groups.py (shared with Team Breakdown).
+# Ranks come from All_stats (engine-filled where a stat has no rank column) or
+# are recomputed league / conference wide (common/ranks.py); one column per stat.
+rank_scope, rank_min_games = rank_scope_selector(df)
+ranks = resolved_ranks(df, all_stats_version, rank_scope, rank_min_games)
+rank_version = (all_stats_version, rank_scope, rank_min_games)
+# stat -> rank frame for the category averages; Overall is All_stats' STAT_STREN
+# when showing its ranks, else the mean of the recomputed ones
+rank_frame = ranks[[s for s in rank_overrides if s in ranks.columns]].assign(Teams=df["Teams"])
+rank_map = {s: s for s in rank_frame.columns if s != "Teams"}
+if rank_scope is None and "STAT_STREN" in df.columns:
+    rank_frame = rank_frame.assign(STAT_STREN=df["STAT_STREN"])
 
 # -----------------------
 # Helpers
@@ -145,18 +99,12 @@ def normalize_stat(val, stat_col):
 # -----------------------
 # Missing rank collector
 # -----------------------
-def collect_missing_ranks(team_data):
+def collect_missing_ranks(team_ranks):
     missing = []
     for group in stat_groups.values():
         for stat in group:
-            rc = get_rank_col(stat)
-            if rc:
-                if rc not in df.columns:
-                    missing.append(stat)
-                else:
-                    val = team_data.get(rc, np.nan)
-                    if pd.isna(val):
-                        missing.append(stat)
+            if pd.isna(team_ranks.get(stat, np.nan)):
+                missing.append(stat)
     return sorted(set(missing))
 
 # -----------------------
@@ -186,20 +134,103 @@ if "Conference" in df.columns and "Games (Dropping D2 matches)" in df.columns:
     except Exception:
         pass
 
+# -----------------------
+# Radar helpers (shared by both modes)
+# -----------------------
+radar_categories = ["Overall", "Offense", "Defense", "Extra Statistical Values", "Scoring Statistics"]
+
+all_rank_cols = list(rank_map)
+rank_matrix, rank_matrix_cols = team_rank_matrix(rank_frame, rank_version, registry, rank_map)
+max_rank_observed = int(np.nanmax(rank_matrix[:, [rank_matrix_cols.index(c) for c in all_rank_cols]])) if all_rank_cols else 365
+# conference ranks top out at the conference size
+max_rank = max_rank_observed if rank_scope == "conference" else max(365, max_rank_observed)
+
+def rank_radar(cat_ranks):
+    """One Scatterpolar trace per team from a category_avg_ranks() frame."""
+    fig = go.Figure()
+    for team, row in cat_ranks.iterrows():
+        fig.add_trace(go.Scatterpolar(
+            r=row[radar_categories].tolist(),
+            theta=radar_categories,
+            fill='toself',
+            name=team
+        ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[max_rank, 1],
+                tickvals=[50,100,150,200,250,300,350]
+            )
+        ),
+        showlegend=True,
+        title="Average Category Rankings (1 = Best, outer circle)"
+    )
+    return fig
+
+# -----------------------
+# Multi-team mode (2-16 teams or a whole conference)
+# -----------------------
+MAX_MULTI_TEAMS = 16
+compare_mode = st.radio("Comparison mode", ["Two teams", "Multiple teams / conference"], horizontal=True)
+
+if compare_mode == "Multiple teams / conference":
+    pick_by = st.radio("Pick", ["Teams", "Conference"], horizontal=True, key="multi_pick_by")
+    if pick_by == "Conference" and "Conference" in df.columns:
+        confs = sorted(df["Conference"].dropna().unique().tolist())
+        conf_sel = st.selectbox("Select Conference", confs,
+                                index=confs.index("SEC") if "SEC" in confs else 0)
+        multi_teams = sorted(df.loc[df["Conference"] == conf_sel, "Teams"].dropna().unique().tolist())
+    else:
+        multi_teams = st.multiselect("Select 2-16 teams", teams_sorted,
+                                     default=list(dict.fromkeys([default_a, default_b])),
+                                     max_selections=MAX_MULTI_TEAMS)
+
+    if len(multi_teams) < 2:
+        st.info("Select at least two teams to compare.")
+        st.stop()
+
+    cat_ranks = category_avg_ranks(rank_frame, multi_teams, rank_map=rank_map, registry=registry, version=rank_version)
+    cat_ranks = cat_ranks.sort_values("Overall")
+
+    st.subheader("Average Category Rankings")
+    heat = go.Figure(go.Heatmap(
+        z=cat_ranks[radar_categories].to_numpy(),
+        x=radar_categories,
+        y=cat_ranks.index.tolist(),
+        zmin=1, zmax=max_rank,
+        colorscale="RdYlGn_r",
+        text=cat_ranks[radar_categories].round(0).to_numpy(),
+        texttemplate="%{text}",
+        hovertemplate="%{y} — %{x}: %{z:.1f}<extra></extra>",
+    ))
+    heat.update_layout(height=max(300, 32 * len(cat_ranks) + 120),
+                       yaxis=dict(autorange="reversed"),
+                       title="Average Category Rank (1 = Best)")
+    st.plotly_chart(heat, use_container_width=True)
+
+    if len(cat_ranks) <= MAX_MULTI_TEAMS:
+        st.plotly_chart(rank_radar(cat_ranks), use_container_width=True)
+
+    st.dataframe(cat_ranks.round(1), use_container_width=True)
+    st.stop()
+
 col1, col2 = st.columns(2)
 with col1:
     team_a = st.selectbox("Select Left Team", teams_sorted, index=teams_sorted.index(default_a))
 with col2:
     team_b = st.selectbox("Select Right Team", teams_sorted, index=teams_sorted.index(default_b))
 
-team_a_data = df[df["Teams"] == team_a].iloc[0]
-team_b_data = df[df["Teams"] == team_b].iloc[0]
+team_a_data = registry.team_row(df, team_a)
+team_b_data = registry.team_row(df, team_b)
+team_a_ranks = ranks.iloc[registry.row(df, team_a)]
+team_b_ranks = ranks.iloc[registry.row(df, team_b)]
 
 # -----------------------
 # Missing rank warnings
 # -----------------------
-missing_ranks_a = collect_missing_ranks(team_a_data)
-missing_ranks_b = collect_missing_ranks(team_b_data)
+missing_ranks_a = collect_missing_ranks(team_a_ranks)
+missing_ranks_b = collect_missing_ranks(team_b_ranks)
 if missing_ranks_a:
     st.warning(f"⚠️ {team_a} missing rank data for: {', '.join(missing_ranks_a)}")
 if missing_ranks_b:
@@ -216,9 +247,8 @@ for group_name, stats in stat_groups.items():
             st.markdown(f"*Note: '{stat}' column missing from dataset — skipped.*")
             continue
 
-        rank_col = get_rank_col(stat)
-        rank_a = team_a_data.get(rank_col, np.nan) if rank_col else np.nan
-        rank_b = team_b_data.get(rank_col, np.nan) if rank_col else np.nan
+        rank_a = team_a_ranks.get(stat, np.nan)
+        rank_b = team_b_ranks.get(stat, np.nan)
 
         val_a = team_a_data.get(stat, np.nan)
         val_b = team_b_data.get(stat, np.nan)
@@ -250,84 +280,8 @@ for group_name, stats in stat_groups.items():
 # -----------------------
 st.subheader("Team Radar: Average Rankings")
 
-def avg_rank_for_keys(team_data, keys):
-    ranks = []
-    for k in keys:
-        rc = get_rank_col(k)
-        if rc and rc in df.columns:
-            v = team_data.get(rc, np.nan)
-            if not pd.isna(v):
-                try:
-                    ranks.append(float(v))
-                except Exception:
-                    pass
-    return float(np.mean(ranks)) if ranks else np.nan
-
-def overall_avg_rank(team_data):
-    if "STAT_STREN" in df.columns:
-        v = team_data.get("STAT_STREN", np.nan)
-        if not pd.isna(v):
-            try:
-                return float(v)
-            except Exception:
-                pass
-    all_keys = [s for group in stat_groups.values() for s in group]
-    ranks = []
-    for k in all_keys:
-        rc = get_rank_col(k)
-        if rc and rc in df.columns:
-            v = team_data.get(rc, np.nan)
-            if not pd.isna(v):
-                try:
-                    ranks.append(float(v))
-                except Exception:
-                    pass
-    return float(np.mean(ranks)) if ranks else np.nan
-
-radar_categories = ["Overall", "Offense", "Defense", "Extra Statistical Values", "Scoring Statistics"]
-
-overall_a = overall_avg_rank(team_a_data)
-overall_b = overall_avg_rank(team_b_data)
-
-off_a = avg_rank_for_keys(team_a_data, stat_groups["Offense"])
-def_a = avg_rank_for_keys(team_a_data, stat_groups["Defense"])
-extra_a = avg_rank_for_keys(team_a_data, stat_groups["Extra Statistical Values"])
-score_a = avg_rank_for_keys(team_a_data, stat_groups["Scoring Statistics"])
-
-off_b = avg_rank_for_keys(team_b_data, stat_groups["Offense"])
-def_b = avg_rank_for_keys(team_b_data, stat_groups["Defense"])
-extra_b = avg_rank_for_keys(team_b_data, stat_groups["Extra Statistical Values"])
-score_b = avg_rank_for_keys(team_b_data, stat_groups["Scoring Statistics"])
-
-fig = go.Figure()
-fig.add_trace(go.Scatterpolar(
-    r=[overall_a, off_a, def_a, extra_a, score_a],
-    theta=radar_categories,
-    fill='toself',
-    name=team_a
-))
-fig.add_trace(go.Scatterpolar(
-    r=[overall_b, off_b, def_b, extra_b, score_b],
-    theta=radar_categories,
-    fill='toself',
-    name=team_b
-))
-
-all_rank_cols = [c for c in rank_overrides.values() if c in df.columns]
-max_rank_observed = int(np.nanmax(df[all_rank_cols].apply(pd.to_numeric, errors="coerce").max(skipna=True))) if all_rank_cols else 365
-max_rank = max(365, max_rank_observed)
-
-fig.update_layout(
-    polar=dict(
-        radialaxis=dict(
-            visible=True,
-            range=[max_rank, 1],
-            tickvals=[50,100,150,200,250,300,350]
-        )
-    ),
-    showlegend=True,
-    title="Average Category Rankings (1 = Best, outer circle)"
-)
+cat_ranks = category_avg_ranks(rank_frame, [team_a, team_b], rank_map=rank_map, registry=registry, version=rank_version)
+fig = rank_radar(cat_ranks)
 
 st.plotly_chart(fig, use_container_width=True)
 
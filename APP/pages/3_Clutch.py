@@ -1,16 +1,45 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
+
+from common.clutch import load_clutch_games, build_clutch_tables, clutch_leaderboard
+from common.data_version import get_data_versions
+from common.display import display_view
+from common.figures import (CLUTCH_SHOOTING, figure_from_json, get_team_figure,
+                             prerender_in_background, prerender_team_figures)
+from common.seasons import CURRENT_SEASON, load_table, season_selector, table_version
+from common.teams import get_team_registry
 
 # -----------------------
 # Load Data
 # -----------------------
-@st.cache_data
-def load_data():
-    return pd.read_csv("Data/All_stats.csv", encoding="latin1")
+data_versions = get_data_versions()
+season = season_selector()
+df = load_table("all_stats", season, data_versions=data_versions)
+
+@st.cache_resource(max_entries=2)
+def load_clutch_tables(version=None):
+    """Game-level clutch store + league-wide splits (computed once per data version, shared read-only)."""
+    try:
+        games = load_clutch_games(version=version)
+    except (FileNotFoundError, KeyError):
+        return None, None
+    return games, build_clutch_tables(games)
+
+data_versions.register("clutch.tables", ["clutch"], lambda v: load_clutch_tables(v["clutch"]))
+# the game-level Databook table only exists for the current season
+if season == CURRENT_SEASON:
+    clutch_games, clutch_tables = load_clutch_tables(data_versions.version("clutch"))
+else:
+    clutch_games, clutch_tables = None, None
 
-df = load_data()
+# team figures are pre-rendered for every team per All_stats version (shared with Team Breakdown)
+figures_version = table_version("all_stats", season, data_versions)
+prerender_in_background(df, figures_version)
+data_versions.register(
+    "figures.teams", ["all_stats"],
+    lambda v: prerender_team_figures(load_table("all_stats", CURRENT_SEASON, version=v["all_stats"]), v["all_stats"]),
+)
 
 # -----------------------
 # Pick default team = highest CLUTCH_FGM
@@ -19,7 +48,8 @@ default_team = df.loc[df["CLUTCH_FGM"].idxmax(), "Teams"]
 teams_sorted = sorted(df["Teams"].dropna().unique().tolist())
 team_name = st.selectbox("Select Team", teams_sorted, index=teams_sorted.index(default_team), key="clutch_team")
 
-team_data = df[df["Teams"] == team_name].iloc[0]
+registry = get_team_registry(data_versions)
+team_data = registry.team_row(df, team_name)
 
 # -----------------------
 # Common name mapping
@@ -64,60 +94,90 @@ extra_stats = ["TOP25_CLUTCH", "OVERTIME_GAMES"]
 # -----------------------
 st.subheader("Clutch Performance Summary")
 
-summary_rows = []
-for stat, rank in stat_pairs:
-    summary_rows.append({
-        "Stat": stat_name_map.get(stat, stat),
-        "Value": team_data.get(stat, np.nan),
-        "Rank": team_data.get(rank, np.nan)
-    })
-
-# Add extras at the bottom
-for stat in extra_stats:
-    summary_rows.append({
-        "Stat": stat_name_map.get(stat, stat),
-        "Value": team_data.get(stat, np.nan),
-        "Rank": None
-    })
-
-summary_df = pd.DataFrame(summary_rows)
+def clutch_summary():
+    """Stat / Value / Rank rows for the selected team (extras at the bottom, unranked)."""
+    summary_rows = []
+    for stat, rank in stat_pairs:
+        summary_rows.append({
+            "Stat": stat_name_map.get(stat, stat),
+            "Value": team_data.get(stat, np.nan),
+            "Rank": team_data.get(rank, np.nan)
+        })
+
+    # Add extras at the bottom
+    for stat in extra_stats:
+        summary_rows.append({
+            "Stat": stat_name_map.get(stat, stat),
+            "Value": team_data.get(stat, np.nan),
+            "Rank": None
+        })
+    return pd.DataFrame(summary_rows)
+
+# built once per (All_stats version, team) and kept as an Arrow table (common/display.py)
+summary_df, summary_table = display_view("clutch.summary", (figures_version, team_name), clutch_summary)
 
 # If no clutch data, show warning
 if summary_df["Value"].isna().any():
     st.warning(f"{team_name} has no clutch games.")
 else:
-    st.dataframe(summary_df, use_container_width=True)
+    st.dataframe(summary_table, use_container_width=True)
 
     # -----------------------
     # Visualization: Shooting % Clutch vs Season
     # -----------------------
     st.subheader("Shooting: Clutch vs Season")
 
-    shooting_stats = ["FG%", "3PT%", "FT%"]
-    season_cols = ["FG_PERC", "FG3_PERC", "FT_PERC"]
-    clutch_cols = ["CLUTCH_FGPERC", "CLUTCH_3FGPERC", "CLUTCH_FTPERC"]
-
-    season_values = [team_data[c] * 100 for c in season_cols]  # season needs *100
-    clutch_values = [team_data[c] for c in clutch_cols]        # clutch already in percent
-
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=shooting_stats,
-        y=season_values,
-        name="Season",
-        marker_color="lightblue"
-    ))
-    fig.add_trace(go.Bar(
-        x=shooting_stats,
-        y=clutch_values,
-        name="Clutch",
-        marker_color="orange"
-    ))
-    fig.update_layout(
-        barmode="group",
-        title=f"{team_name} Shooting: Season vs Clutch",
-        yaxis=dict(title="Percentage"),
-        template="plotly_white"
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    # pre-rendered per team (common/figures.py); rendered and stored on a cache miss
+    fig_json = get_team_figure(df, figures_version, team_name, CLUTCH_SHOOTING)
+    if fig_json is not None:
+        st.plotly_chart(figure_from_json(fig_json), use_container_width=True)
+
+# -----------------------
+# Game-level clutch splits
+# -----------------------
+split_labels = {
+    "Opponent Tier": "Opponent Tier",
+    "Location": "Home / Away / Neutral",
+    "OT": "Overtime (1 = went to OT)",
+}
+split_cols = ["Games", "Wins", "Win_PERC", "FG_PERC", "FG3_PERC", "FT_PERC",
+              "Clutch_SM", "Comeback_Wins", "Blown_Leads"]
+
+if clutch_tables is not None:
+    team_games = clutch_games[registry.mask(clutch_games["Team"], team_name)]
+    st.subheader("Clutch Splits")
+    if team_games.empty:
+        st.info(f"No game-level clutch rows for {team_name}.")
+    else:
+        split_tabs = st.tabs(list(split_labels.values()))
+        for tab, split in zip(split_tabs, split_labels):
+            with tab:
+                split_df = clutch_tables[split]
+                st.dataframe(split_df.loc[registry.mask(split_df["Team"], team_name), [split] + split_cols],
+                             use_container_width=True, hide_index=True)
+        with st.expander(f"{team_name} clutch game log"):
+            st.dataframe(team_games.sort_values("Date").drop(columns=["Team"]),
+                         use_container_width=True, hide_index=True)
+
+    # -----------------------
+    # League leaderboard
+    # -----------------------
+    st.subheader("League Clutch Leaderboard")
+    leaderboard_stats = {
+        "Clutch Scoring Margin": ("Clutch_SM", False),
+        "Clutch Win Percentage": ("Win_PERC", False),
+        "Clutch Field Goal Percentage": ("FG_PERC", False),
+        "Clutch Free Throw Percentage": ("FT_PERC", False),
+        "Comeback Wins": ("Comeback_Wins", False),
+        "Blown Leads (fewest)": ("Blown_Leads", True),
+        "Clutch Value": ("Clutch_Value", False),
+    }
+    lb_col1, lb_col2 = st.columns([3, 1])
+    with lb_col1:
+        lb_label = st.selectbox("Rank teams by", list(leaderboard_stats.keys()), key="clutch_lb_stat")
+    with lb_col2:
+        lb_min_games = st.number_input("Min clutch games", min_value=1, max_value=10, value=2, key="clutch_lb_min")
+    lb_stat, lb_asc = leaderboard_stats[lb_label]
+    board = clutch_leaderboard(clutch_tables["summary"], lb_stat, n=25, min_games=lb_min_games, ascending=lb_asc)
+    st.dataframe(board[["Team", lb_stat] + [c for c in split_cols if c != lb_stat]],
+                 use_container_width=True, hide_index=True)
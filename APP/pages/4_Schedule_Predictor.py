@@ -1,14 +1,33 @@
 # 4_Schedule_Predictor.py
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 import numpy as np
-import os
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common.arrays import array_key, cached_arrays
+from common.features import pairwise_probabilities, MAX_NAN_FRAC, CORR_THRESHOLD, SELECTION_VERSION
+from common.forest import compile_forest
+from common.predictor import PCA_COMPONENTS, RF_TREES, train_model
+from common.coach import coach_version, load_coach_scores, with_coach_score
+from common.history_value import VALUE_VERSION, history_version, load_program_values, with_program_value
+from common.backtest import parse_games, run_backtest, cumulative_units
+from common.live import LiveSeason, results_log_path
+from common.players import load_player_games, season_lines
+from common.transfer import TransferEngine, load_transfer_table, rescore_games
+from common.uncertainty import (BOOTSTRAP_MEMBERS, INTERVAL_LEVEL, MEMBER_TREES, expected_wins_intervals,
+                                game_intervals, interval_arrays)
+from common.data_version import get_data_versions
+from common.display import display_view, download_csv
+from common.query import PREDICTIONS, publish_table
+from common.seasons import CURRENT_SEASON, load_table, season_selector, table_version
+from common.teams import get_team_registry
 
 st.set_page_config(layout="wide", page_title="Schedule Predictor")
+PAGE_START = time.perf_counter()
 
 
 # ---------------------------
@@ -29,174 +48,161 @@ Some details on this page might be inaccurate with the random generator being co
 # -----------------------
 # Load data helpers
 # -----------------------
-@st.cache_data
-def load_all_stats(path="Data/All_stats.csv"):
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"{path} not found.")
-    df = pd.read_csv(path, encoding="latin1")
+# tables come from the season store (common/seasons.py), keyed by data version
+data_versions = get_data_versions()
+season = season_selector()
+
+# no st.* calls in these: they also run on loader / background threads
+def load_all_stats(season, version=None):
+    df = load_table("all_stats", season, data_versions=data_versions, version=version)
+    # Note: All_stats uses "Teams" according to your data sample
+    if "Teams" not in df.columns and "Team" in df.columns:
+        df = df.rename(columns={"Team": "Teams"})
     return df
 
-@st.cache_data
-def load_history(path="Data/Daily_predictor_excel.csv"):
-    if not os.path.exists(path):
-        st.warning(f"{path} not found — historical training disabled.")
+def load_history(season, version=None):
+    try:
+        return load_table("history", season, data_versions=data_versions, version=version)
+    except FileNotFoundError:
         return None
-    df = pd.read_csv(path, encoding="latin1")
-    return df
 
-@st.cache_data
-def load_schedule(path="Data/Randomized_Schedule.csv"):
-    if not os.path.exists(path):
-        st.info(f"{path} not found — schedule will be built from All_stats (simple fallback).")
+def load_schedule(season, version=None):
+    try:
+        df = load_table("schedule", season, data_versions=data_versions, version=version)
+    except FileNotFoundError:
         return None
-    df = pd.read_csv(path, encoding="latin1")
-    return df
+    # ensure Day integer (assign -> new frame; the loaded one is shared across sessions)
+    if "Day" in df.columns:
+        return df.assign(Day=pd.to_numeric(df["Day"], errors="coerce").fillna(-1).astype(int))
+    return df.assign(Day=-1)
+
+def season_versions(*tables):
+    return tuple(table_version(t, season, data_versions) for t in tables)
+
+def model_versions(*tables):
+    """season_versions() plus the coach and Historical Value tables, whose scores are model features."""
+    return season_versions(*tables) + (coach_version(season, data_versions), history_version(season, data_versions))
+
+def feature_versions(versions):
+    """Key of the team feature matrix: All_stats plus the Databook scores (and the program-value formula)."""
+    return versions[:1] + versions[2:] + (VALUE_VERSION,)
+
+def with_model_extras(df, registry, season, coach_v, history_v):
+    """df_all plus the Databook model features: coach score and program value (joined by team ID)."""
+    df = with_coach_score(df, load_coach_scores(season, coach_v), registry)
+    return with_program_value(df, load_program_values(season, history_v), registry, season)
+
+# max_entries=2: the serving version plus the one being rebuilt
+@st.cache_resource(max_entries=2)
+def fit_predictor(versions, _df_all, _df_hist, _registry):
+    """
+    The fitted predictor for one (All_stats, history, coach, Historical Value)
+    version, held in memory: load_predictor scores its pairwise arrays from it
+    and the what-if engine compiles it, so the model is fit at most once per version.
+    Returns train_model's (model, spec, team_matrix, n_train, n_test, warning).
+    """
+    return train_model(_df_all, _df_hist, feature_versions(versions), _registry)
+
+@st.cache_resource(max_entries=2)
+def load_predictor(versions, _df_all, _df_hist, _registry):
+    """
+    P(home wins) for every (home ID, away ID) pair, memory-mapped from
+    .cache/arrays (common/arrays.py) per (All_stats, history, coach, Historical Value)
+    version and model settings. The model is trained only when those arrays are missing,
+    so a restarted server (or another worker process) serves predictions from
+    the mapped file without re-parsing features or refitting.
+    Returns (arrays, meta); arrays["pairwise"] is absent when ML is unavailable.
+    """
+    def build():
+        model, spec, team_matrix, n_train, n_test, warning = fit_predictor(versions, _df_all, _df_hist, _registry)
+        meta = {"n_train": n_train, "n_test": n_test, "warning": warning,
+                "n_features": len(spec["feature_names"]) if spec else 0}
+        if model is None:
+            return {}, meta
+        return {"pairwise": pairwise_probabilities(model, team_matrix, len(_registry))}, meta
+
+    key = array_key(*versions, _registry.version, PCA_COMPONENTS, RF_TREES, MAX_NAN_FRAC, CORR_THRESHOLD,
+                    SELECTION_VERSION, VALUE_VERSION)
+    return cached_arrays("predictor", key, build)
+
+@st.cache_resource(max_entries=2)
+def load_intervals(versions, _df_all, _df_hist, _registry):
+    """
+    Bootstrap ensemble arrays (common/uncertainty.py) for the same versions and
+    features as load_predictor: member pairwise matrices plus their low / high
+    percentiles, memory-mapped from .cache/arrays. Members are fit in a process
+    pool only when the arrays are missing. Returns (arrays, meta).
+    """
+    key = array_key(*versions, _registry.version, PCA_COMPONENTS, BOOTSTRAP_MEMBERS, MEMBER_TREES, INTERVAL_LEVEL,
+                    MAX_NAN_FRAC, CORR_THRESHOLD, SELECTION_VERSION, VALUE_VERSION)
+    return cached_arrays("intervals", key,
+                         lambda: interval_arrays(_df_all, _df_hist, feature_versions(versions), _registry))
+
+# -----------------------
+# Load inputs concurrently
+# -----------------------
+# All_stats, history, schedule and the team registry are read on a thread pool;
+# the predictor is submitted as soon as All_stats and history are in, so it
+# overlaps the schedule read. Everything below is cached, so reruns return at once.
+def timed(fn, *args):
+    started = time.perf_counter()
+    return fn(*args), time.perf_counter() - started
+
+# workers share this run's ScriptRunContext so cached calls behave as on the main thread
+run_ctx = get_script_run_ctx()
+with ThreadPoolExecutor(max_workers=5, initializer=lambda: add_script_run_ctx(threading.current_thread(), run_ctx)) as pool:
+    all_future = pool.submit(timed, load_all_stats, season)
+    hist_future = pool.submit(timed, load_history, season)
+    sched_future = pool.submit(timed, load_schedule, season)
+    # canonical team IDs: history/schedule names are resolved through the registry
+    # (aliases, 'State' vs 'St.', mojibake) instead of exact string joins
+    registry_future = pool.submit(timed, get_team_registry, data_versions)
+
+    def predictor_when_ready():
+        hist = hist_future.result()[0]
+        if hist is None:
+            return {}, None
+        registry = registry_future.result()[0]
+        df_model = with_model_extras(all_future.result()[0], registry, season,
+                                     coach_version(season, data_versions), history_version(season, data_versions))
+        return load_predictor(model_versions("all_stats", "history"), df_model, hist, registry)
+
+    predictor_future = pool.submit(timed, predictor_when_ready)
 
-# Load files
 try:
-    df_all = load_all_stats()
+    df_all, all_seconds = all_future.result()
 except FileNotFoundError as e:
     st.error(str(e))
     st.stop()
-
-df_hist = load_history()
-schedule_df = load_schedule()
-
-# Normalize column names (safer lookups)
-# Note: All_stats uses "Teams" according to your data sample
-if "Teams" not in df_all.columns and "Team" in df_all.columns:
-    df_all = df_all.rename(columns={"Team": "Teams"})
+df_hist, hist_seconds = hist_future.result()
+schedule_df, sched_seconds = sched_future.result()
+registry, registry_seconds = registry_future.result()
+(predictor, predictor_meta), predictor_seconds = predictor_future.result()
+inputs_seconds = time.perf_counter() - PAGE_START
+
+if df_hist is None:
+    st.warning(f"No game history for {season} — historical training disabled.")
+if schedule_df is None:
+    st.info(f"No schedule for {season} — schedule will be built from All_stats (simple fallback).")
 
 # history sample uses "Team" and "Opponent"
 # no rename here, we'll reference both names directly
 st.sidebar.markdown("## Data files loaded")
-st.sidebar.write({
-    "All_stats rows": len(df_all),
-    "History rows": len(df_hist) if df_hist is not None else None,
-    "Schedule rows": len(schedule_df) if schedule_df is not None else None,
-})
+load_status = st.sidebar.empty()  # filled with time-to-first-render once the table is drawn
+unmatched = registry.unmatched_report()
+if not unmatched.empty:
+    with st.sidebar.expander(f"Unmatched team names ({len(unmatched)})"):
+        st.dataframe(unmatched, use_container_width=True, hide_index=True)
 
-# -----------------------
-# Prepare training data from history
-# -----------------------
-# Helpers to detect home team and scores in history
-def detect_home_away_and_scores(hist):
-    """
-    Returns a DataFrame with columns: home_team, away_team, home_score, away_score.
-    Heuristics:
-      - If 'Road Game' column exists and is 1/0: if Road Game==1 then Team traveled -> opponent was home.
-      - Else if 'Location' contains a city like 'Lawrence, KS' with the Team's school location missing,
-        we fallback to treating Team as home unless 'Road Game' says otherwise.
-      - Expects 'Points' and 'Opp Points' columns for scores.
-    """
-    h = hist.copy()
-    # standardize name columns
-    team_col = None
-    opp_col = None
-    if "Team" in h.columns:
-        team_col = "Team"
-    elif "Teams" in h.columns:
-        team_col = "Teams"
-    if "Opponent" in h.columns:
-        opp_col = "Opponent"
-    # scores
-    score_col = None
-    opp_score_col = None
-    if "Points" in h.columns and "Opp Points" in h.columns:
-        score_col = "Points"; opp_score_col = "Opp Points"
-    elif "PTS" in h.columns and "OPP_PTS" in h.columns:
-        score_col = "PTS"; opp_score_col = "OPP_PTS"
-
-    if team_col is None or opp_col is None or score_col is None:
-        return None  # not enough info
-
-    # Road Game detection
-    road_col = None
-    for c in h.columns:
-        if c.strip().lower() in ("road game", "road", "is_road", "is_away"):
-            road_col = c
-            break
-
-    rows = []
-    for idx, r in h.iterrows():
-        team = r[team_col]
-        opp = r[opp_col]
-        team_score = pd.to_numeric(r.get(score_col, np.nan), errors="coerce")
-        opp_score = pd.to_numeric(r.get(opp_score_col, np.nan), errors="coerce")
-
-        # default: assume Team is home unless road marker says otherwise or Location suggests otherwise
-        is_team_road = False
-        if road_col is not None:
-            try:
-                val = int(pd.to_numeric(r.get(road_col, 0), errors="coerce") or 0)
-                is_team_road = (val == 1)
-            except Exception:
-                is_team_road = False
-
-        if is_team_road:
-            home = opp
-            away = team
-            home_score = opp_score
-            away_score = team_score
-        else:
-            home = team
-            away = opp
-            home_score = team_score
-            away_score = opp_score
-
-        rows.append({
-            "home_team": home,
-            "away_team": away,
-            "home_score": home_score,
-            "away_score": away_score
-        })
-    return pd.DataFrame(rows)
-
-# Build training dataframe if possible
-model = None
-feature_cols = None
+pairwise = predictor.get("pairwise")
 train_warning = None
-
-if df_hist is not None:
-    hist_parsed = detect_home_away_and_scores(df_hist)
-    if hist_parsed is None:
-        train_warning = ""
-    else:
-        # attach target
-        hist_parsed["home_win"] = (hist_parsed["home_score"] > hist_parsed["away_score"]).astype(int)
-
-        # pick numeric features from df_all to merge for home and away
-        numeric_team_cols = df_all.select_dtypes(include=[np.number]).columns.tolist()
-        # remove columns that are clearly not features (if present)
-        for junk in ("index",):
-            if junk in numeric_team_cols:
-                numeric_team_cols.remove(junk)
-        # ensure Teams index to merge
-        team_feats = df_all.set_index("Teams")[numeric_team_cols].copy()
-
-        # merge home and away features
-        merged = hist_parsed.merge(team_feats.add_prefix("home_"), left_on="home_team", right_index=True, how="left")
-        merged = merged.merge(team_feats.add_prefix("away_"), left_on="away_team", right_index=True, how="left")
-
-        # drop rows with missing features or target
-        feat_cols = [c for c in merged.columns if c.startswith("home_") or c.startswith("away_")]
-        merged = merged.dropna(subset=feat_cols + ["home_win"]).copy()
-
-        if merged.shape[0] < 40:
-            train_warning = "Not enough complete historical rows after merge to train ML (need >=40). Using baseline."
-        else:
-            # Build model pipeline
-            X = merged[feat_cols]
-            y = merged["home_win"].astype(int)
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.20, random_state=42)
-            pipeline = Pipeline([("scaler", StandardScaler()), ("rf", RandomForestClassifier(n_estimators=200, random_state=0))])
-            pipeline.fit(X_train, y_train)
-            model = pipeline
-            feature_cols = feat_cols
-            st.success(f"Trained ML model on {len(X_train)} rows (test {len(X_test)} rows).")
-
-if train_warning:
-    st.warning(train_warning)
+if predictor_meta is not None:
+    if pairwise is not None:
+        st.success(f"Trained ML model on {predictor_meta['n_train']} rows (test {predictor_meta['n_test']} rows) "
+                   f"using {predictor_meta['n_features']} home-minus-away features.")
+    train_warning = predictor_meta["warning"]
+    if train_warning:
+        st.warning(train_warning)
 
 # -----------------------
 # Load or build schedule
@@ -231,71 +237,100 @@ else:
     if "Home" not in schedule_df.columns or "Away" not in schedule_df.columns:
         st.error("Schedule file must contain 'Home' and 'Away' columns.")
         st.stop()
-    # ensure Day integer
-    if "Day" in schedule_df.columns:
-        schedule_df["Day"] = pd.to_numeric(schedule_df["Day"], errors="coerce").fillna(-1).astype(int)
-    else:
-        schedule_df["Day"] = -1
 
 # -----------------------
 # Prediction helpers
 # -----------------------
-def predict_game_prob(home, away):
-    """
-    Returns probability that home team wins (0..1) and predicted winner name.
-    Uses trained model if available; otherwise uses Average Ranking numeric baseline.
-    """
-    # If we have trained model, create feature row (home_... and away_...)
-    if model is not None and feature_cols is not None:
-        # prepare numeric team features from df_all
-        numeric_team_cols = df_all.select_dtypes(include=[np.number]).columns.tolist()
-        # Build home/away series
-        try:
-            home_series = df_all.set_index("Teams").loc[home, numeric_team_cols].add_prefix("home_")
-            away_series = df_all.set_index("Teams").loc[away, numeric_team_cols].add_prefix("away_")
-        except KeyError:
-            # missing team in All_stats -> fallback
-            return 0.5, "Unknown"
-        Xrow = pd.concat([home_series, away_series]).reindex(feature_cols).fillna(0).values.reshape(1, -1)
-        prob = float(model.predict_proba(Xrow)[0,1])
-        pred = home if prob >= 0.5 else away
-        return prob, pred
-
-    # fallback baseline: use Average Ranking (lower is better)
+def baseline_prob(df_all, home, away, registry):
+    """Average Ranking baseline (lower is better) -> probability home team wins."""
     if "Average Ranking" in df_all.columns:
         try:
-            home_rank = float(df_all.loc[df_all["Teams"] == home, "Average Ranking"].values[0])
-            away_rank = float(df_all.loc[df_all["Teams"] == away, "Average Ranking"].values[0])
+            home_rank = float(registry.team_row(df_all, home)["Average Ranking"])
+            away_rank = float(registry.team_row(df_all, away)["Average Ranking"])
             # convert rank diff to probability — smaller rank better => more win prob
             diff = (away_rank - home_rank)  # positive means home is better
-            prob = 1 / (1 + np.exp(-diff / 50.0))  # sigmoid scaling
-            pred = home if prob >= 0.5 else away
-            return float(prob), pred
+            return float(1 / (1 + np.exp(-diff / 50.0)))  # sigmoid scaling
         except Exception:
-            return 0.5, home
-    return 0.5, home
+            return 0.5
+    return 0.5
 
 # -----------------------
 # Predict schedule
 # -----------------------
-@st.cache_data
-def predict_entire_schedule(schedule_df):
-    out_rows = []
-    for _, r in schedule_df.iterrows():
-        h = r["Home"]
-        a = r["Away"]
-        prob, pred = predict_game_prob(h, a)
-        out_rows.append({
-            "Day": int(r.get("Day", -1)),
-            "Home": h,
-            "Away": a,
-            "Conference_Game": bool(r.get("Conference_Game", False)),
-            "Prob_Home_Win": prob,
-            "Pred_Winner": pred
-        })
-    return pd.DataFrame(out_rows)
-
-pred_df = predict_entire_schedule(schedule_df)
+def schedule_arrays(schedule_df, version, registry):
+    """
+    The schedule as integer arrays (Day, home/away team IDs, conference flag),
+    memory-mapped per schedule version; the fallback schedule (no version) is
+    converted in place.
+    """
+    def build():
+        n = len(schedule_df)
+        return {
+            "day": (schedule_df["Day"].to_numpy(dtype=np.int32) if "Day" in schedule_df.columns
+                    else np.full(n, -1, dtype=np.int32)),
+            "home": registry.ids(schedule_df["Home"], source="schedule.Home/Away"),
+            "away": registry.ids(schedule_df["Away"], source="schedule.Home/Away"),
+            "conference_game": (schedule_df["Conference_Game"].astype(bool).to_numpy()
+                                if "Conference_Game" in schedule_df.columns else np.zeros(n, dtype=bool)),
+        }, {}
+
+    if version is None:
+        return build()[0]
+    return cached_arrays("schedule", array_key(version, registry.version), build)[0]
+
+@st.cache_resource(max_entries=2)
+def predict_entire_schedule(versions, _schedule_df, _pairwise, _df_all, _registry):
+    """Predictions for every game; one shared read-only frame per (All_stats, history, schedule) version."""
+    sched = schedule_arrays(_schedule_df, versions[2], _registry)
+    out = pd.DataFrame({
+        "Day": sched["day"].astype(int),
+        "Home": _schedule_df["Home"].to_numpy(),
+        "Away": _schedule_df["Away"].to_numpy(),
+        "Conference_Game": sched["conference_game"].astype(bool),
+    })
+
+    if _pairwise is not None:
+        # one gather from the pairwise matrix for every game with known teams
+        home, away = sched["home"], sched["away"]
+        probs = np.where((home >= 0) & (away >= 0), _pairwise[np.maximum(home, 0), np.maximum(away, 0)], np.nan)
+        valid = ~np.isnan(probs)
+        probs[~valid] = 0.5
+        out["Prob_Home_Win"] = probs
+        out["Pred_Winner"] = np.where(valid, np.where(probs >= 0.5, out["Home"], out["Away"]), "Unknown")
+        return out
+
+    probs = [baseline_prob(_df_all, h, a, _registry) for h, a in zip(out["Home"], out["Away"])]
+    out["Prob_Home_Win"] = probs
+    out["Pred_Winner"] = np.where(np.asarray(probs) >= 0.5, out["Home"], out["Away"])
+    return out
+
+pred_versions = model_versions("all_stats", "history", "schedule")
+pred_df = predict_entire_schedule(pred_versions, schedule_df, pairwise, df_all, registry)
+# the SQL query layer (common/query.py, page 6) serves the latest predictions as a table
+try:
+    publish_table(PREDICTIONS, pred_df.assign(Season=season), (season, pred_versions), data_versions=data_versions)
+except (sqlite3.Error, OSError):
+    pass  # the query database is an optional cache; the page does not depend on it
+
+def warm_schedule_predictor(v):
+    """Background rebuild for a new data version: reload, retrain, re-predict."""
+    new_all = load_all_stats(CURRENT_SEASON, v["all_stats"])
+    new_hist = load_history(CURRENT_SEASON, v["history"])
+    new_sched = load_schedule(CURRENT_SEASON, v["schedule"])
+    new_registry = get_team_registry()
+    new_model_df = with_model_extras(new_all, new_registry, CURRENT_SEASON, v["coach"], v["historical_value"])
+    new_predictor, _ = (load_predictor((v["all_stats"], v["history"], v["coach"], v["historical_value"]),
+                                       new_model_df, new_hist, new_registry)
+                        if new_hist is not None else ({}, None))
+    if new_predictor.get("pairwise") is not None:
+        load_intervals((v["all_stats"], v["history"], v["coach"], v["historical_value"]),
+                       new_model_df, new_hist, new_registry)
+    if new_sched is not None and {"Home", "Away"} <= set(new_sched.columns):
+        predict_entire_schedule((v["all_stats"], v["history"], v["schedule"], v["coach"], v["historical_value"]),
+                                new_sched, new_predictor.get("pairwise"), new_all, new_registry)
+
+data_versions.register("schedule_predictor", ["all_stats", "history", "schedule", "coach", "historical_value"],
+                       warm_schedule_predictor)
 
 # -----------------------
 # UI: selectors
@@ -309,20 +344,83 @@ view_by = st.sidebar.selectbox("View by", ["Day", "Team", "Conference"], index=0
 if view_by == "Day":
     min_day = int(pred_df["Day"].min())
     max_day = int(pred_df["Day"].max())
-    day_sel = st.sidebar.slider("Select Day", min_value=min_day, max_value=max_day, value=min_day)
-    view_df = pred_df[pred_df["Day"] == day_sel].copy()
+    view_sel = st.sidebar.slider("Select Day", min_value=min_day, max_value=max_day, value=min_day)
 elif view_by == "Team":
     teams = sorted(pd.unique(np.concatenate([pred_df["Home"].unique(), pred_df["Away"].unique()])))
-    team_sel = st.sidebar.selectbox("Select Team", teams)
-    view_df = pred_df[(pred_df["Home"] == team_sel) | (pred_df["Away"] == team_sel)].copy()
+    view_sel = st.sidebar.selectbox("Select Team", teams)
 else:  # Conference
     if "Conference" in df_all.columns:
         confs = sorted(df_all["Conference"].dropna().unique().tolist())
     else:
         confs = ["Unknown"]
-    conf_sel = st.sidebar.selectbox("Select Conference", confs)
-    teams_in_conf = df_all[df_all["Conference"] == conf_sel]["Teams"].unique().tolist()
-    view_df = pred_df[(pred_df["Home"].isin(teams_in_conf)) | (pred_df["Away"].isin(teams_in_conf))].copy()
+    view_sel = st.sidebar.selectbox("Select Conference", confs)
+
+# -----------------------
+# Confidence intervals (bootstrap ensemble, built once per model version)
+# -----------------------
+ci_label = f"{INTERVAL_LEVEL:.0%} CI"
+show_intervals = pairwise is not None and st.sidebar.checkbox(
+    f"Show {ci_label} (bootstrap of {BOOTSTRAP_MEMBERS} models)", key="show_intervals",
+    help="Each interval spans the middle of the predictions from models refit on resampled training games. "
+         "Built once per data version; afterwards it is a lookup.")
+intervals = None
+if show_intervals:
+    with st.spinner(f"Fitting {BOOTSTRAP_MEMBERS} bootstrap models (once per data version)..."):
+        df_model = with_model_extras(df_all, registry, season, coach_version(season, data_versions),
+                                     history_version(season, data_versions))
+        intervals, _ = load_intervals(model_versions("all_stats", "history"), df_model, df_hist, registry)
+    intervals = intervals or None
+
+@st.cache_resource(max_entries=2)
+def with_game_intervals(versions, _pred_df, _schedule_df, _intervals, _registry):
+    """The predictions plus per-game Prob_Low / Prob_High; one shared read-only frame per version."""
+    sched = schedule_arrays(_schedule_df, versions[2], _registry)
+    low, high = game_intervals(_intervals, sched["home"], sched["away"])
+    return _pred_df.assign(Prob_Low=low, Prob_High=high)
+
+shown_df = with_game_intervals(pred_versions, pred_df, schedule_df, intervals, registry) if intervals else pred_df
+
+def schedule_view(view_by, view_sel):
+    """Filtered, sorted predictions plus the display-only 'Prob_Home_Win_%' (and interval) columns."""
+    if view_by == "Day":
+        rows = shown_df[shown_df["Day"] == view_sel]
+    elif view_by == "Team":
+        rows = shown_df[(shown_df["Home"] == view_sel) | (shown_df["Away"] == view_sel)]
+    else:
+        teams_in_conf = (df_all[df_all["Conference"] == view_sel]["Teams"].unique().tolist()
+                         if "Conference" in df_all.columns else [])
+        rows = shown_df[(shown_df["Home"].isin(teams_in_conf)) | (shown_df["Away"].isin(teams_in_conf))]
+    rows = rows.sort_values(["Day", "Prob_Home_Win"], ascending=[True, False]).reset_index(drop=True)
+    rows = rows.assign(**{"Prob_Home_Win_%": (rows["Prob_Home_Win"] * 100).round(1).astype(str) + "%"})
+    if "Prob_Low" in rows.columns:
+        rows[ci_label] = np.where(rows["Prob_Low"].notna(),
+                                  (rows["Prob_Low"] * 100).round(1).astype(str) + "–"
+                                  + (rows["Prob_High"] * 100).round(1).astype(str) + "%", "")
+    return rows
+
+def expected_wins(view_df):
+    """Expected wins per team in a view: home win probability at home, 1 - it on the road."""
+    expected_home_wins = view_df.groupby("Home", observed=True)["Prob_Home_Win"].sum().rename("Expected_Home_Wins")
+    expected_away_wins = (1 - view_df["Prob_Home_Win"]).groupby(view_df["Away"], observed=True).sum().rename("Expected_Away_Wins")
+    expected = pd.concat([expected_home_wins, expected_away_wins], axis=1).fillna(0)
+    expected["Expected_Total_Wins"] = expected["Expected_Home_Wins"] + expected["Expected_Away_Wins"]
+    expected = expected.rename_axis("Team").sort_values("Expected_Total_Wins", ascending=False).reset_index()
+    if intervals is not None:
+        # the same sums under every bootstrap member, one gather from the cached member matrices
+        low, high = expected_wins_intervals(intervals["members"], registry.ids(view_df["Home"]),
+                                            registry.ids(view_df["Away"]), len(registry))
+        team_ids = registry.ids(expected["Team"])
+        known = team_ids >= 0
+        expected["Expected_Wins_Low"] = np.where(known, low[np.maximum(team_ids, 0)], np.nan)
+        expected["Expected_Wins_High"] = np.where(known, high[np.maximum(team_ids, 0)], np.nan)
+    return expected.head(30)
+
+# sorted / formatted views are cached per (prediction version, filter) as Arrow
+# tables (common/display.py), so reruns hand Streamlit the same table again
+view_key = (pred_versions, view_by, view_sel, show_intervals)
+view_columns = ("Day", "Home", "Away", "Prob_Home_Win_%") + ((ci_label,) if intervals else ()) + ("Pred_Winner", "Conference_Game")
+view_df, view_table = display_view("schedule.view", view_key, lambda: schedule_view(view_by, view_sel),
+                                   columns=view_columns)
 
 st.header("Predicted Games")
 st.write(f"Showing {len(view_df)} games for filter: {view_by}")
@@ -330,12 +428,20 @@ st.write(f"Showing {len(view_df)} games for filter: {view_by}")
 if view_df.empty:
     st.info("No games for this filter.")
 else:
-    # sort
-    view_df = view_df.sort_values(["Day", "Prob_Home_Win"], ascending=[True, False]).reset_index(drop=True)
-    view_df["Prob_Home_Win_%"] = (view_df["Prob_Home_Win"] * 100).round(1).astype(str) + "%"
-    display_cols = ["Day", "Home", "Away", "Prob_Home_Win_%", "Pred_Winner", "Conference_Game"]
-    st.dataframe(view_df[display_cols], use_container_width=True)
+    st.dataframe(view_table, use_container_width=True)
 
+# time to first render: page start -> predicted-games table drawn
+def ms(seconds):
+    return f"{seconds * 1000:.0f} ms"
+
+load_status.markdown(
+    f"**First render in {ms(time.perf_counter() - PAGE_START)}**  \n"
+    f"Inputs ready in {ms(inputs_seconds)} (loaded concurrently):  \n"
+    f"All_stats {ms(all_seconds)} · history {ms(hist_seconds)} · schedule {ms(sched_seconds)}  \n"
+    f"team registry {ms(registry_seconds)} · predictor {ms(predictor_seconds)}"
+)
+
+if not view_df.empty:
     # histogram
     st.subheader("Probability distribution (home win)")
     import plotly.express as px
@@ -344,29 +450,182 @@ else:
 
     # aggregated summary (predicted wins by team)
     st.subheader("Predicted wins (home-favored probabilities summed)")
-    agg = view_df.copy()
-    agg["Home_Prob_HomeWin"] = agg["Prob_Home_Win"]
-    # each match gives fractional credit to predicted winner; show expected wins per team (home-side expected)
-    expected_home_wins = agg.groupby("Home")["Home_Prob_HomeWin"].sum().rename("Expected_Home_Wins")
-    expected_away_wins = agg.assign(Away_Prob=lambda d: 1 - d["Prob_Home_Win"]).groupby("Away")["Away_Prob"].sum().rename("Expected_Away_Wins")
-    expected = pd.concat([expected_home_wins, expected_away_wins], axis=1).fillna(0)
-    expected["Expected_Total_Wins"] = expected["Expected_Home_Wins"] + expected["Expected_Away_Wins"]
-    expected = expected.sort_values("Expected_Total_Wins", ascending=False).reset_index().rename(columns={"index":"Team"})
-    st.dataframe(expected.head(30), use_container_width=True)
+    # each match gives fractional credit to both sides; show expected wins per team
+    _, expected_table = display_view("schedule.expected", view_key, lambda: expected_wins(view_df))
+    st.dataframe(expected_table, use_container_width=True)
 
     # download filtered view
-    csv_bytes = view_df.to_csv(index=False).encode("utf-8")
+    csv_bytes = download_csv("schedule.view", view_key, view_df)
     st.download_button("📥 Download this view as CSV", data=csv_bytes, file_name="predicted_games_view.csv", mime="text/csv")
 
 # full schedule download
 st.markdown("---")
-full_csv = pred_df.to_csv(index=False).encode("utf-8")
+full_csv = download_csv("schedule.full", pred_versions, pred_df)
 st.download_button("📥 Download full predicted schedule (CSV)", data=full_csv, file_name="predicted_full_schedule.csv", mime="text/csv")
 
 # show training note
 if train_warning:
     st.info("Note: ML predictor was not used: " + train_warning + " Baseline ranking used instead.")
 
+# -----------------------
+# Live season: completed results applied incrementally on top of the predictions
+# -----------------------
+@st.cache_resource(max_entries=2)
+def get_live_season(versions, _pred_df, _df_all, _registry):
+    """
+    Season state for one (prediction, team registry) version; later results are
+    folded in by refresh(). Team names in the schedule and the results log are
+    resolved through the registry.
+    """
+    conferences = dict(zip(_df_all["Teams"].astype(str), _df_all["Conference"].astype(str)))
+    live = LiveSeason(_pred_df, conferences, season=CURRENT_SEASON, registry=_registry)
+    live.refresh(background=False)
+    return live
+
+if season == CURRENT_SEASON:
+    live = get_live_season((pred_versions, registry.version), pred_df, df_all, registry)
+    # the poller notices appended results and applies just those rows off the UI thread
+    data_versions.register("live.results", ["results"], lambda v: live.refresh())
+
+    st.markdown("---")
+    st.header("Live season")
+    snap = live.snapshot()
+    if not snap["unmatched"].empty:
+        with st.expander(f"{len(snap['unmatched'])} logged results skipped (team not in the schedule)"):
+            st.dataframe(snap["unmatched"], use_container_width=True, hide_index=True)
+    if snap["applied"] == 0:
+        st.info(f"No completed games logged yet. Append results with "
+                f"`PYTHONPATH=APP python -m common.live results.csv` (written to {results_log_path(CURRENT_SEASON)}).")
+    else:
+        if st.button("Check for new results", key="live_refresh"):
+            live.refresh()
+            snap = live.snapshot()
+        st.caption(f"{snap['applied']} results applied · {snap['rescored']} remaining games re-scored in the last update · "
+                   f"updated {pd.Timestamp(snap['updated'], unit='s'):%Y-%m-%d %H:%M:%S} UTC")
+        live_tabs = st.tabs(["Projections", "Standings", "Upcoming (live odds)"])
+        with live_tabs[0]:
+            if snap["projections"] is None:
+                st.info("Season simulation is running — projections will appear on the next refresh.")
+            else:
+                st.dataframe(snap["projections"].style.format({"Proj_W": "{:.1f}", "Proj_L": "{:.1f}",
+                                                               "Conf_Title_PERC": "{:.1%}"}),
+                             use_container_width=True, hide_index=True)
+        with live_tabs[1]:
+            st.dataframe(snap["standings"], use_container_width=True, hide_index=True)
+        with live_tabs[2]:
+            st.dataframe(snap["upcoming"].head(200), use_container_width=True, hide_index=True)
+
+# -----------------------
+# Backtest against the lines (walk-forward over the game log)
+# -----------------------
+@st.cache_resource(max_entries=2)
+def run_history_backtest(season, version, _df_hist):
+    """Graded bets + summary for one history version; each date is scored by models fit on earlier dates."""
+    games, X = parse_games(_df_hist, season)
+    graded, summary = run_backtest(games, X)
+    return graded, summary, cumulative_units(graded)
+
+st.markdown("---")
+st.header("Backtest: spreads and totals")
+if df_hist is None or "Line" not in df_hist.columns:
+    st.info("No game log with betting lines for this season.")
+elif st.checkbox("Run walk-forward backtest (refits the models once per game date)", key="run_backtest"):
+    with st.spinner("Replaying the season date by date..."):
+        bt_graded, bt_summary, bt_units = run_history_backtest(season, table_version("history", season, data_versions), df_hist)
+    st.caption("Each date's games are predicted only from games on earlier dates and the teams' pre-game stats. "
+               "Bets at -110; ATS hit rate = cover rate, Totals hit rate = over/under accuracy.")
+    st.dataframe(bt_summary.style.format({"Hit_PERC": "{:.1%}", "ROI": "{:+.1%}", "Units": "{:+.2f}"}),
+                 use_container_width=True, hide_index=True)
+    st.line_chart(bt_units)
+    with st.expander("Graded games"):
+        st.dataframe(bt_graded, use_container_width=True, hide_index=True)
 
+# -----------------------
+# Transfer-portal what-if (roster moves -> team profile, ranks and schedule odds)
+# -----------------------
+@st.cache_resource(max_entries=2)
+def get_transfer_engine(versions, _registry):
+    """Team Transfer profiles + player lines for one (Team Transfer, Player Value) version, shared read-only."""
+    transfer_version, players_version = versions
+    return TransferEngine(load_transfer_table(version=transfer_version),
+                          season_lines(load_player_games(version=players_version)), _registry)
+
+@st.cache_resource(max_entries=2)
+def load_whatif_model(versions, _df_model, _df_hist, _registry):
+    """
+    load_predictor's fitted model (fit_predictor: the same fit, so unmoved games
+    match; fit here only when the pairwise arrays came from disk), compiled to
+    node arrays (common/forest.py): a scenario re-scores tens to hundreds of
+    games, where the array traversal is several times faster than the
+    pipeline's predict_proba and gives identical probabilities.
+    """
+    model, _, team_matrix, _, _, _ = fit_predictor(versions, _df_model, _df_hist, _registry)
+    return compile_forest(model), team_matrix
 
+st.markdown("---")
+st.header("Transfer-portal what-if")
+if season != CURRENT_SEASON or pairwise is None:
+    st.info("The what-if engine needs the current season's Databook tables and the ML predictor.")
+elif st.checkbox("Open the what-if engine (fits the predictor in memory once)", key="run_whatif"):
+    try:
+        engine = get_transfer_engine(data_versions.version("team_transfer", "players"), registry)
+    except (FileNotFoundError, KeyError) as e:
+        st.warning(f"Team Transfer / Player Value tables unavailable: {e}")
+        st.stop()
+    with st.spinner("Fitting the predictor..."):
+        df_model = with_model_extras(df_all, registry, season, coach_version(season, data_versions),
+                                     history_version(season, data_versions))
+        whatif_model, whatif_matrix = load_whatif_model(model_versions("all_stats", "history"), df_model, df_hist, registry)
+
+    roster_teams = registry.names[np.flatnonzero(engine.present)].tolist()
+    wi_team = st.selectbox("Team", roster_teams, key="whatif_team")
+    roster = engine.roster(wi_team)
+    leaving = st.multiselect("Players leaving", roster["Player"].astype(str).tolist(), key="whatif_out")
+    others = engine.players[engine.players["Team ID"] != registry.id_of(wi_team)]
+    incoming_labels = (others["Player"].astype(str) + " (" + others["Team"].astype(str) + ")").tolist()
+    joining = st.multiselect("Players joining (from their current team)", incoming_labels, key="whatif_in")
+    share = st.slider("Share of an incoming player's production that carries over", 0.0, 1.0, 1.0, 0.05,
+                      key="whatif_share")
+
+    moves = [(p, wi_team, None, 1.0) for p in leaving]
+    by_label = dict(zip(incoming_labels, zip(others["Player"].astype(str), others["Team"].astype(str))))
+    moves += [(by_label[label][0], by_label[label][1], wi_team, share) for label in joining]
+    if not moves:
+        st.caption("Pick players leaving or joining to see how the profile, ranks and schedule odds move.")
+    else:
+        whatif_start = time.perf_counter()
+        scenario = engine.scenario(moves)
+        moved_matrix = engine.adjusted_team_matrix(whatif_matrix, scenario)
+        sched = schedule_arrays(schedule_df, table_version("schedule", season, data_versions), registry)
+        affected = np.isin(sched["home"], scenario["teams"]) | np.isin(sched["away"], scenario["teams"])
+        after = rescore_games(whatif_model, moved_matrix, sched["home"][affected], sched["away"][affected])
+        st.caption(f"Scenario applied and {int(affected.sum())} games re-scored in "
+                   f"{ms(time.perf_counter() - whatif_start)} · {len(scenario['columns'])} stats re-ranked")
+
+        games = pred_df.loc[affected, ["Day", "Home", "Away"]].assign(
+            Before=pred_df.loc[affected, "Prob_Home_Win"].to_numpy(), After=after)
+        games["Change"] = games["After"] - games["Before"]
+        # expected wins per moved team: home win prob at home, 1 - prob on the road
+        swing = []
+        for tid, name in zip(scenario["teams"], registry.names[scenario["teams"]]):
+            home = sched["home"][affected] == tid
+            away = sched["away"][affected] == tid
+            swing.append({"Team": name, "Games": int((home | away).sum()),
+                          "Expected wins before": float(games["Before"][home].sum() + (1 - games["Before"][away]).sum()),
+                          "Expected wins after": float(np.nansum(games["After"][home]) + np.nansum(1 - games["After"][away]))})
+        swing = pd.DataFrame(swing)
+        swing["Change"] = swing["Expected wins after"] - swing["Expected wins before"]
+
+        wi_tabs = st.tabs(["Schedule impact", "Profile & ranks", "Games re-scored"])
+        with wi_tabs[0]:
+            st.dataframe(swing.style.format({"Expected wins before": "{:.2f}", "Expected wins after": "{:.2f}",
+                                             "Change": "{:+.2f}"}), use_container_width=True, hide_index=True)
+        with wi_tabs[1]:
+            st.dataframe(scenario["summary"].style.format({"Before": "{:.3f}", "After": "{:.3f}", "Change": "{:+.3f}",
+                                                           "Rank before": "{:.0f}", "Rank after": "{:.0f}"}),
+                         use_container_width=True, hide_index=True)
+        with wi_tabs[2]:
+            st.dataframe(games.sort_values("Change", key=np.abs, ascending=False)
+                         .style.format({"Before": "{:.1%}", "After": "{:.1%}", "Change": "{:+.1%}"}),
+                         use_container_width=True, hide_index=True)
 
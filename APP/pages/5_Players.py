@@ -4,14 +4,35 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from common.data_version import get_data_versions
+from common.display import display_view
+from common.history_value import VALUE_COL, history_version, load_program_values, program_value_by_id
+from common.seasons import CURRENT_SEASON, load_table, season_selector, table_version
+from common.teams import get_team_registry
+from common.players import load_player_games, build_player_tables, player_leaderboard
+
 # --------------------
 # Load Data
 # --------------------
-@st.cache_data
-def load_data():
-    return pd.read_csv("Data/All_stats.csv", encoding="latin1")
+data_versions = get_data_versions()
+season = season_selector()
+df = load_table("all_stats", season, data_versions=data_versions)
+
+@st.cache_resource(max_entries=2)
+def load_player_tables(version=None):
+    """Player-game store + season lines / rotations (computed once per data version, shared read-only)."""
+    try:
+        games = load_player_games(version=version)
+    except (FileNotFoundError, KeyError):
+        return None, None
+    return games, build_player_tables(games)
 
-df = load_data()
+data_versions.register("players.tables", ["players"], lambda v: load_player_tables(v["players"]))
+# the player-game Databook table only exists for the current season
+if season == CURRENT_SEASON:
+    player_games, player_tables = load_player_tables(data_versions.version("players"))
+else:
+    player_games, player_tables = None, None
 
 # --------------------
 # Default team = max "Championship Criteria"
@@ -32,24 +53,36 @@ team_choice = st.selectbox(
     index=max(0, teams_sorted.index(default_team)) if default_team in teams_sorted else 0
 )
 
-conf = df.loc[df["Teams"] == team_choice, "Conference"].values[0] if "Conference" in df.columns else "Conference"
-
-team_df = df[df["Teams"] == team_choice].copy()
-conf_df = df[df["Conference"] == conf].copy() if "Conference" in df.columns else df.copy()
+registry = get_team_registry(data_versions)
+team_row = registry.row(df, team_choice)
+conf = df["Conference"].iat[team_row] if "Conference" in df.columns else "Conference"
 
 # --------------------
-# Drop unnecessary columns
+# Championship Criteria next to the program's historical value (Databook Historical Value table)
 # --------------------
-drop_cols = [
-    "FGM_TOP7", "FGA-Top7", "FG3sM-Top7", "FG3sA-Top7", "FTM-Top7", "FTA-Top7",
-    "FGA-Top7-Perc", "FG3sA-Top7-Perc", "FTA-Top7-Perc"
-]
-team_df.drop(columns=[c for c in drop_cols if c in team_df.columns], inplace=True, errors="ignore")
-conf_df.drop(columns=[c for c in drop_cols if c in conf_df.columns], inplace=True, errors="ignore")
+program_table = load_program_values(season, history_version(season, data_versions))
+data_versions.register("history_value.table", ["historical_value"],
+                       lambda v: load_program_values(CURRENT_SEASON, v["historical_value"]))
+if program_table is not None:
+    program_values = program_value_by_id(program_table, registry, season)
+    team_id = registry.id_of(team_choice)
+    team_value = program_values[team_id] if team_id >= 0 else np.nan
+    col1, col2, col3 = st.columns(3)
+    if "Championship Criteria" in df.columns:
+        col1.metric("Championship Criteria", format(pd.to_numeric(df["Championship Criteria"].iat[team_row],
+                                                                   errors="coerce"), ".2f"))
+    if np.isnan(team_value):
+        col2.metric(VALUE_COL, "—")
+    else:
+        col2.metric(VALUE_COL, f"{team_value:.1f}")
+        col3.metric("Program rank", f"{int((program_values > team_value).sum()) + 1} of "
+                                    f"{int(np.isfinite(program_values).sum())}")
 
 # --------------------
-# Convert fractions -> percentages
+# Core 7 columns (fractions -> percentages)
 # --------------------
+# the Top-7 count columns (FGM_TOP7, FGA-Top7, ...) are not shown; only the
+# columns below are pulled out of the shared frame, so nothing is copied or edited in place
 percent_cols = [
     "FG_PERC-Top7", "FG3_PERC-Top7", "FT_PERC-Top7",
     "FG_PERC_Top7_per", "FG3_PERC_Top7_per", "FT_PERC_Top7_per",
@@ -58,21 +91,19 @@ percent_cols = [
     "Start Percentage top 7",
     "FGM-Top7-Perc", "FG3sM-Top7-Perc", "FTM-Top7-Perc",
 ]
-for col in percent_cols:
-    if col in team_df.columns:
-        team_df[col] = pd.to_numeric(team_df[col], errors="coerce") * 100
-    if col in conf_df.columns:
-        conf_df[col] = pd.to_numeric(conf_df[col], errors="coerce") * 100
 
 numeric_cols_extra = [
     "OReb-Top7", "DReb-Top7", "Rebounds-Top7", "AST-Top7",
     "TO-Top7", "STL-Top7", "Points per Game-Top7"
 ]
-for col in numeric_cols_extra:
-    if col in team_df.columns:
-        team_df[col] = pd.to_numeric(team_df[col], errors="coerce")
-    if col in conf_df.columns:
-        conf_df[col] = pd.to_numeric(conf_df[col], errors="coerce")
+
+def core7_values(rows):
+    """Numeric Core 7 columns for the given rows; returns a new (small) frame."""
+    cols = [c for c in percent_cols + numeric_cols_extra if c in rows.columns]
+    vals = rows[cols].apply(pd.to_numeric, errors="coerce").astype(float)
+    pct = [c for c in percent_cols if c in vals.columns]
+    vals[pct] = vals[pct] * 100
+    return vals
 
 # --------------------
 # Rename columns
@@ -107,12 +138,6 @@ rename_pct_of_team = {
     "FTM-Top7-Perc": "Core 7 Percentage of Team Free Throws Made",
 }
 
-team_df_core = team_df.rename(columns=rename_core)
-conf_df_core = conf_df.rename(columns=rename_core)
-
-team_df_pct = team_df.rename(columns=rename_pct_of_team)
-conf_df_pct = conf_df.rename(columns=rename_pct_of_team)
-
 # --------------------
 # Build Summary Tables
 # --------------------
@@ -122,11 +147,6 @@ core_cols_labels = [
     "Assists Per Game", "Turnover Per Game", "Steals Per Game", "Points Per Game",
     "Starting Percentage",
 ]
-summary_core = pd.DataFrame({
-    "Stat": core_cols_labels,
-    "Team Value": [team_df_core.iloc[0].get(c, np.nan) for c in core_cols_labels],
-    "Conference Average": [conf_df_core[c].mean() if c in conf_df_core.columns else np.nan for c in core_cols_labels],
-})
 
 pct_team_cols_labels = [
     "Core 7 Percentage of Team Field Goal Percentage",
@@ -143,24 +163,33 @@ pct_team_cols_labels = [
     "Core 7 Percentage of Team 3 Field Goals Made",
     "Core 7 Percentage of Team Free Throws Made",
 ]
-summary_stats = pd.DataFrame({
-    "Stat": pct_team_cols_labels,
-    "Team Value": [team_df_pct.iloc[0].get(c, np.nan) for c in pct_team_cols_labels],
-    "Conference Average": [conf_df_pct[c].mean() if c in conf_df_pct.columns else np.nan for c in pct_team_cols_labels],
-})
 
-for df_ in (summary_core, summary_stats):
-    df_["Team Value"] = pd.to_numeric(df_["Team Value"], errors="coerce")
-    df_["Conference Average"] = pd.to_numeric(df_["Conference Average"], errors="coerce")
+def core7_summary(labels, rename):
+    """Stat / Team Value / Conference Average rows for the selected team's Core 7 columns."""
+    team_df = core7_values(df.iloc[[team_row]]).rename(columns=rename)
+    conf_df = core7_values(df[df["Conference"] == conf] if "Conference" in df.columns else df).rename(columns=rename)
+    return pd.DataFrame({
+        "Stat": labels,
+        "Team Value": pd.to_numeric(pd.Series([team_df.iloc[0].get(c, np.nan) for c in labels]), errors="coerce"),
+        "Conference Average": pd.to_numeric(pd.Series([conf_df[c].mean() if c in conf_df.columns else np.nan
+                                                       for c in labels]), errors="coerce"),
+    })
+
+# built once per (All_stats version, team) and kept as Arrow tables (common/display.py)
+summary_key = (table_version("all_stats", season, data_versions), team_choice)
+summary_core, summary_core_table = display_view("players.core7", summary_key,
+                                                lambda: core7_summary(core_cols_labels, rename_core))
+summary_stats, summary_stats_table = display_view("players.core7_pct", summary_key,
+                                                  lambda: core7_summary(pct_team_cols_labels, rename_pct_of_team))
 
 # --------------------
 # Show Summary Tables
 # --------------------
 st.subheader(f"{team_choice} Core 7 Players Statistics")
-st.dataframe(summary_core, use_container_width=True)
+st.dataframe(summary_core_table, use_container_width=True)
 
 st.subheader(f"{team_choice} Percent of Team Stats for Core 7 Players")
-st.dataframe(summary_stats, use_container_width=True)
+st.dataframe(summary_stats_table, use_container_width=True)
 
 # --------------------
 # Visual 1a: Percentages Chart
@@ -220,3 +249,57 @@ fig2.update_layout(
     yaxis=dict(title="Percent / Value")
 )
 st.plotly_chart(fig2, use_container_width=True)
+
+# --------------------
+# Player-level data (Player Value table)
+# --------------------
+if player_tables is not None:
+    lines = player_tables["lines"]
+    rotation = player_tables["rotation"]
+
+    # --------------------
+    # Rotation breakdown
+    # --------------------
+    st.subheader(f"{team_choice} Rotation Breakdown")
+    team_rotation = rotation[registry.mask(rotation["Team"], team_choice)]
+    if team_rotation.empty:
+        st.info(f"No player-game rows for {team_choice}.")
+    else:
+        st.dataframe(team_rotation.drop(columns=["Team"]), use_container_width=True, hide_index=True)
+        fig3 = px.bar(team_rotation, x="Player", y="Minutes Share",
+                      title=f"{team_choice} Share of Team Minutes")
+        fig3.update_layout(yaxis=dict(tickformat=".0%"))
+        st.plotly_chart(fig3, use_container_width=True)
+
+        # --------------------
+        # Player season line
+        # --------------------
+        player_choice = st.selectbox("Select Player", team_rotation["Player"].tolist(), key="player_line")
+        player_line = lines[registry.mask(lines["Team"], team_choice) & (lines["Player"] == player_choice)]
+        st.dataframe(player_line.drop(columns=["Team"]), use_container_width=True, hide_index=True)
+
+    # --------------------
+    # League leaders
+    # --------------------
+    st.subheader("League Player Leaders")
+    leader_stats = {
+        "Points Per Game": "PTS/G",
+        "Minutes Per Game": "MIN/G",
+        "Assists Per Game": "AST/G",
+        "Defensive Rebounds Per Game": "DReb/G",
+        "Offensive Rebounds Per Game": "OReb/G",
+        "Steals Per Game": "STL/G",
+        "Field Goal Percentage": "FG_PERC",
+        "3 Point Field Goal Percentage": "FG3_PERC",
+        "Double Doubles": "Double Doubles",
+        "20+ Point Games": "20+ PT Games",
+    }
+    lead_col1, lead_col2 = st.columns([3, 1])
+    with lead_col1:
+        leader_label = st.selectbox("Rank players by", list(leader_stats.keys()), key="player_lb_stat")
+    with lead_col2:
+        leader_min_games = st.number_input("Min games", min_value=1, max_value=40, value=3, key="player_lb_min")
+    leader_stat = leader_stats[leader_label]
+    leaders = player_leaderboard(lines, leader_stat, n=25, min_games=leader_min_games)
+    leader_cols = list(dict.fromkeys(["Player", "Team", "GP", leader_stat, "PTS/G", "MIN/G"]))
+    st.dataframe(leaders[leader_cols], use_container_width=True, hide_index=True)
@@ -0,0 +1,53 @@
+import sqlite3
+import time
+
+import pandas as pd
+import streamlit as st
+
+from common.data_version import get_data_versions
+from common.display import download_csv
+from common.query import EXAMPLES, PREDICTIONS, cached_query, db_version, describe, sync_query_db
+from common.seasons import SEASON_TABLES
+
+st.set_page_config(layout="wide", page_title="Query")
+
+# -----------------------
+# Database (a table is rewritten only when its source version changes, so
+# a run with nothing new costs one version check per table)
+# -----------------------
+data_versions = get_data_versions()
+data_versions.register("query.db", list(SEASON_TABLES), lambda v: sync_query_db())
+status = sync_query_db(data_versions=data_versions)
+version = db_version()
+
+# -----------------------
+# UI
+# -----------------------
+st.title("Query the Data")
+st.markdown(
+    "Ask ad-hoc questions in SQL (SQLite dialect) over All_stats (`all_stats`), the game log (`games`), "
+    f"the schedule, the schedule predictions (`{PREDICTIONS}`, once the Schedule Predictor has run) and every "
+    "Databook table (`databook_*`). Every table has a `Season` column; team columns have a matching "
+    "`<column> ID` for joins across tables. Quote names with spaces: `\"Road Game\"`."
+)
+
+with st.expander("Tables and columns"):
+    st.dataframe(describe(), use_container_width=True, hide_index=True)
+    missing = [name for name, s in status.items() if s == "missing"]
+    if missing:
+        st.caption("Not available: " + ", ".join(missing))
+
+example = st.selectbox("Start from an example", ["(none)"] + list(EXAMPLES), key="query_example")
+sql = st.text_area("SQL", value=EXAMPLES.get(example, ""), height=160, key=f"query_sql_{example}")
+
+if sql.strip():
+    started = time.perf_counter()
+    try:
+        result = cached_query(sql.strip(), version=version)
+    except (sqlite3.Error, pd.errors.DatabaseError) as e:
+        st.error(f"Query failed: {e}")
+        st.stop()
+    st.caption(f"{len(result):,} rows in {(time.perf_counter() - started) * 1000:.0f} ms (read-only; results cached per data version)")
+    st.dataframe(result, use_container_width=True, hide_index=True)
+    st.download_button("📥 Download result as CSV", data=download_csv("query", (sql.strip(), version), result),
+                       file_name="query_result.csv", mime="text/csv")
@@ -0,0 +1,210 @@
+# bench/load_test.py
+# Concurrent-session load test against a real Streamlit server.
+#   python bench/load_test.py [--sessions 20] [--rounds 3] [--pages all]
+#   python bench/load_test.py --url http://host:8501 --pid <server pid>
+# Without --url a local server is started on a free port from the repo root and
+# stopped afterwards. Each simulated session opens the app's websocket, loads the
+# home page, then clicks through every page `--rounds` times; a run is timed from
+# the rerun request to the server's script_finished message. Reports throughput,
+# latency percentiles (overall and per page) and server RSS per session.
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join("APP", "main.py")
+RUN_TIMEOUT = 120  # seconds a single page run may take before the session gives up
+
+
+# -----------------------
+# Server
+# -----------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_healthy(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"server at {url} did not become healthy in {timeout}s")
+
+
+def start_server(port, log):
+    """Server output goes to a file: an unread pipe fills up under load and blocks the server."""
+    cmd = [sys.executable, "-m", "streamlit", "run", MAIN_SCRIPT,
+           "--server.headless", "true", "--server.port", str(port),
+           "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"]
+    return subprocess.Popen(cmd, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT)
+
+
+def rss_mb(pid):
+    """Resident set size of a process in MB (Linux /proc), or None."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+# -----------------------
+# Simulated session
+# -----------------------
+def rerun_msg(page_hash=""):
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    msg.rerun_script.page_script_hash = page_hash
+    return msg.SerializeToString()
+
+
+async def run_page(ws, page_hash, pages):
+    """Request one script run and wait for it to finish. Returns (seconds, had_exception)."""
+    started = time.perf_counter()
+    await ws.send(rerun_msg(page_hash))
+    had_exception = False
+    while True:
+        msg = ForwardMsg()
+        msg.ParseFromString(await asyncio.wait_for(ws.recv(), RUN_TIMEOUT))
+        kind = msg.WhichOneof("type")
+        if kind == "navigation":
+            for p in msg.navigation.app_pages:
+                pages.setdefault(p.page_script_hash, p.page_name)
+        elif kind == "delta" and msg.delta.new_element.WhichOneof("type") == "exception":
+            had_exception = True
+        elif kind == "script_finished":
+            return time.perf_counter() - started, had_exception
+
+
+async def session(ws_url, rounds, page_filter, results, pages, ready):
+    async with websockets.connect(ws_url, subprotocols=["streamlit"], max_size=None) as ws:
+        elapsed, err = await run_page(ws, "", pages)
+        results.append({"page": "main", "seconds": elapsed, "exception": err})
+        ready.append(True)
+        for _ in range(rounds):
+            for page_hash, name in list(pages.items()):
+                if page_filter and name not in page_filter:
+                    continue
+                elapsed, err = await run_page(ws, page_hash, pages)
+                results.append({"page": name, "seconds": elapsed, "exception": err})
+
+
+async def run_load(url, n_sessions, rounds, page_filter, pid):
+    ws_url = url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+    results, pages, ready = [], {}, []
+
+    # one warm-up session so first-run cache misses are reported separately
+    warm = []
+    await session(ws_url, 1, page_filter, warm, pages, [])
+    base_rss = rss_mb(pid)
+
+    peak = [base_rss]
+
+    async def sample_rss():
+        while True:
+            peak[0] = max(peak[0] or 0, rss_mb(pid) or 0) or None
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.create_task(sample_rss())
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(session(ws_url, rounds, page_filter, results, pages, ready) for _ in range(n_sessions)),
+        return_exceptions=True)
+    wall = time.perf_counter() - started
+    sampler.cancel()
+    failed = [o for o in outcomes if isinstance(o, Exception)]
+    return pd.DataFrame(warm), pd.DataFrame(results), wall, base_rss, peak[0], failed
+
+
+# -----------------------
+# Report
+# -----------------------
+def latency_table(df):
+    def pct(q):
+        return lambda s: np.percentile(s, q) * 1000
+    g = df.groupby("page")["seconds"]
+    out = pd.DataFrame({
+        "runs": g.size(),
+        "p50_ms": g.agg(pct(50)),
+        "p90_ms": g.agg(pct(90)),
+        "p99_ms": g.agg(pct(99)),
+        "max_ms": g.max() * 1000,
+        "exceptions": df.groupby("page")["exception"].sum(),
+    })
+    s = df["seconds"]
+    out.loc["ALL"] = [len(s), np.percentile(s, 50) * 1000, np.percentile(s, 90) * 1000,
+                      np.percentile(s, 99) * 1000, s.max() * 1000, df["exception"].sum()]
+    return out.round(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Streamlit app.")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent simulated sessions")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over every page per session")
+    parser.add_argument("--pages", nargs="*", default=None, help="page names to click (default: all)")
+    parser.add_argument("--url", default=None, help="existing server, e.g. http://localhost:8501")
+    parser.add_argument("--pid", type=int, default=None, help="server pid for RSS with --url")
+    args = parser.parse_args()
+
+    proc = None
+    url, pid = args.url, args.pid
+    log = tempfile.NamedTemporaryFile(prefix="march_metrics_server_", suffix=".log", delete=False)
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        proc = start_server(port, log)
+        pid = proc.pid
+    try:
+        wait_healthy(url)
+        warm, df, wall, base_rss, peak_rss, failed = asyncio.run(
+            run_load(url, args.sessions, args.rounds, set(args.pages or ()), pid))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+        log.close()
+    if proc is not None:
+        print(f"server log: {log.name}")
+
+    print(f"{args.sessions} sessions x {args.rounds} rounds against {url}")
+    if failed:
+        print(f"{len(failed)} session(s) failed: {failed[0]!r}")
+    if df.empty:
+        print("no runs completed")
+        return
+    print("\nwarm-up (first run, cold caches):")
+    print((warm.set_index("page")["seconds"] * 1000).round(1).rename("ms").to_string())
+    print("\nlatency under load:")
+    print(latency_table(df).to_string())
+    print(f"\nthroughput: {len(df) / wall:.1f} page runs/s over {wall:.1f}s")
+    if base_rss is not None and peak_rss is not None:
+        print(f"server RSS: {base_rss:.0f} MB after warm-up, {peak_rss:.0f} MB peak "
+              f"-> {(peak_rss - base_rss) / args.sessions:.2f} MB per session")
+
+
+if __name__ == "__main__":
+    main()
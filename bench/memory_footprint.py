@@ -0,0 +1,64 @@
+# bench/memory_footprint.py
+# Per-session memory of the All_stats frame, raw CSV dtypes vs compact dtypes.
+#   python bench/memory_footprint.py [--sessions 20]
+# st.cache_data hands every caller an unpickled copy of the cached frame, so the
+# per-session cost of a page is roughly the size of that copy plus any frames the
+# page copies itself (the old Players page copied the team + conference rows).
+# The loaders now share one frame via st.cache_resource; this measures what a
+# cache_data-style copy per session would cost. See bench/load_test.py for the
+# end-to-end server numbers.
+import argparse
+import os
+import pickle
+import sys
+import tracemalloc
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "APP"))
+
+from common.frames import compact_team_frame, frame_bytes  # noqa: E402
+
+ALL_STATS = os.path.join(ROOT, "Data", "All_stats.csv")
+
+
+def session_peak(blob, n_sessions):
+    """Traced bytes held after n sessions each receive their own unpickled copy."""
+    tracemalloc.start()
+    held = [pickle.loads(blob) for _ in range(n_sessions)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = pd.read_csv(ALL_STATS, encoding="latin1")
+    compact = compact_team_frame(raw)
+
+    rows = []
+    for label, frame in (("raw", raw), ("compact", compact)):
+        blob = pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+        total = session_peak(blob, args.sessions)
+        rows.append({
+            "frame": label,
+            "frame_KB": frame_bytes(frame) / 1024,
+            "pickled_KB": len(blob) / 1024,
+            f"{args.sessions}_sessions_KB": total / 1024,
+            "per_session_KB": total / 1024 / args.sessions,
+        })
+
+    out = pd.DataFrame(rows).set_index("frame").round(1)
+    print(out.to_string())
+    ratio = out.loc["raw", "per_session_KB"] / out.loc["compact", "per_session_KB"]
+    print(f"\nper-session footprint: {ratio:.1f}x smaller with compact dtypes")
+    print("dtype mix (compact):", compact.dtypes.astype(str).value_counts().to_dict())
+
+
+if __name__ == "__main__":
+    main()
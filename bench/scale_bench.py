@@ -0,0 +1,214 @@
+# bench/scale_bench.py
+# How load, train, predict and render times grow with league size.
+#   python bench/scale_bench.py [--scales 1 10 100 1000] [--budget 300] [--out .cache/bench]
+# For each scale a synthetic data root is generated (bench/synthetic.py) and
+# every stage of the Schedule Predictor runs against it, in order:
+#   load              read All_stats / history / schedule (no Streamlit cache)
+#   registry          canonical team IDs + resolving every history / schedule name
+#   features          feature selection + team matrix + history matchup rows
+#   train             common.predictor.train_model (features again + RF fit)
+#   predict_schedule  predict_proba for every scheduled game
+#   predict_pairwise  P(home wins) for every team pair, as the page caches it (O(teams²))
+#   render_cold       page 4 under AppTest in a fresh process, empty .cache
+#   render_warm       same, with the memory-mapped arrays from the cold run on disk
+# A stage is skipped (and reported as such) when its time extrapolated from
+# the smaller scales exceeds --budget seconds, or when its teams × teams
+# matrix would not fit in a quarter of RAM. Results go to <out>/scale_bench.csv
+# and a log-log chart <out>/scale_bench.html.
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "APP"))
+# the synthetic root is the working directory: keep the store and cache relative to it
+for var in ("MARCH_METRICS_STORE", "MARCH_METRICS_CACHE"):
+    os.environ.pop(var, None)
+
+from synthetic import DEFAULT_OUT, synthesize  # noqa: E402
+from common.features import build_matchup_features, build_team_matrix, make_feature_spec, pairwise_probabilities  # noqa: E402
+from common.predictor import detect_home_away_and_scores, train_model  # noqa: E402
+from common.seasons import SEASON_TABLES, read_source  # noqa: E402
+from common.teams import TeamRegistry  # noqa: E402
+
+PAGE = os.path.join(ROOT, "APP", "pages", "4_Schedule_Predictor.py")
+# growth assumed for a stage until two scales have been measured (then the fitted
+# log-log slope is used, never below this floor)
+STAGE_EXPONENT = {
+    "load": 1, "registry": 1, "features": 1, "train": 1,
+    "predict_schedule": 1, "predict_pairwise": 2, "render_cold": 2, "render_warm": 1,
+}
+PAIRWISE_STAGES = ("predict_pairwise", "render_cold", "render_warm")  # hold a teams × teams float matrix
+RENDER_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {app!r})
+from streamlit.testing.v1 import AppTest
+started = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout={timeout}).run()
+print(json.dumps({{"seconds": time.perf_counter() - started, "exceptions": [str(e.value) for e in at.exception]}}))
+"""
+
+
+def ram_bytes():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return 4 << 30
+
+
+def estimate(history, stage, scale):
+    """Seconds expected for `stage` at `scale` from the scales already measured (None if none)."""
+    points = [(s, t) for s, t in history.get(stage, []) if t > 0]
+    if not points:
+        return None
+    floor = STAGE_EXPONENT[stage]
+    slope = floor
+    if len(points) >= 2:
+        (s0, t0), (s1, t1) = points[-2], points[-1]
+        slope = max(floor, np.log(t1 / t0) / np.log(s1 / s0))
+    s1, t1 = points[-1]
+    return t1 * (scale / s1) ** slope
+
+
+def render(root, timeout):
+    """Run page 4 once in a fresh interpreter with `root` as the working directory."""
+    script = RENDER_SCRIPT.format(app=os.path.join(ROOT, "APP"), page=PAGE, timeout=timeout)
+    done = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True,
+                          timeout=timeout + 60)
+    lines = [line for line in done.stdout.splitlines() if line.startswith("{")]
+    if done.returncode != 0 or not lines:
+        raise RuntimeError(done.stderr.strip().splitlines()[-1] if done.stderr.strip() else "render failed")
+    result = json.loads(lines[-1])
+    if result["exceptions"]:
+        raise RuntimeError(result["exceptions"][0])
+    return result["seconds"]
+
+
+def run_scale(scale, root, budget, history):
+    """Time every stage at one scale. Returns result rows."""
+    rows = []
+    state = {}
+    size = {"teams": None, "games": None}
+
+    def stage(name, fn):
+        est = estimate(history, name, scale)
+        status, seconds = "ok", np.nan
+        n_teams = size["teams"]
+        if name in PAIRWISE_STAGES and n_teams is not None and n_teams ** 2 * 8 > ram_bytes() / 4:
+            status = f"skipped: {n_teams}² matrix = {n_teams ** 2 * 8 / 1e9:.1f} GB"
+        elif est is not None and est > budget:
+            status = f"skipped: est. {est:.0f}s > budget"
+        else:
+            try:
+                started = time.perf_counter()
+                fn()
+                seconds = time.perf_counter() - started
+                history.setdefault(name, []).append((scale, seconds))
+            except Exception as e:  # noqa: BLE001 - a failed stage is a result, not a crash
+                status = f"error: {type(e).__name__}: {e}"[:200]
+        rows.append({"scale": scale, **size, "stage": name,
+                     "seconds": seconds, "estimate": est, "status": status})
+        print(f"  {name:<17} {seconds:9.2f}s  {status}" if status == "ok" else f"  {name:<17} {'':>10}  {status}")
+        return status == "ok"
+
+    def load():
+        state["all"] = read_source("all_stats", SEASON_TABLES["all_stats"])
+        state["hist"] = read_source("history", SEASON_TABLES["history"])
+        state["sched"] = read_source("schedule", SEASON_TABLES["schedule"])
+
+    def registry():
+        reg = TeamRegistry(state["all"]["Teams"].dropna().astype(str))
+        for frame, cols in ((state["hist"], ("Team", "Opponent")), (state["sched"], ("Home", "Away"))):
+            for col in cols:
+                reg.ids(frame[col], source=col)
+        state["registry"] = reg
+
+    def features():
+        spec = make_feature_spec(state["all"])
+        matrix = build_team_matrix(state["all"], spec["team_cols"], state["registry"])
+        parsed = detect_home_away_and_scores(state["hist"])
+        build_matchup_features(matrix, parsed["home_team"], parsed["away_team"], state["registry"])
+
+    def train():
+        # a fresh version key so the team matrix is rebuilt, as on a new data file
+        model, _, matrix, _, _, warning = train_model(state["all"], state["hist"], f"bench-{time.time_ns()}",
+                                                      state["registry"])
+        if model is None:
+            raise RuntimeError(warning or "no model")
+        state["model"], state["matrix"] = model, matrix
+
+    def predict_schedule():
+        X, valid = build_matchup_features(state["matrix"], state["sched"]["Home"], state["sched"]["Away"],
+                                          state["registry"])
+        state["model"].predict_proba(X[valid])
+
+    def predict_pairwise():
+        pairwise_probabilities(state["model"], state["matrix"], len(state["registry"]))
+
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        shutil.rmtree(".cache", ignore_errors=True)
+        if stage("load", load):
+            size.update(teams=state["all"]["Teams"].nunique(), games=len(state["sched"]))
+            rows[-1].update(size)
+            stage("registry", registry)
+            stage("features", features)
+            if stage("train", train):
+                stage("predict_schedule", predict_schedule)
+                stage("predict_pairwise", predict_pairwise)
+        state.clear()  # free this scale's frames before the page runs
+        shutil.rmtree(".cache", ignore_errors=True)
+        if stage("render_cold", lambda: render(root, budget)):
+            stage("render_warm", lambda: render(root, budget))
+    finally:
+        os.chdir(cwd)
+    return rows
+
+
+def chart(results, path):
+    """Log-log seconds vs scale per stage (plotly HTML)."""
+    import plotly.express as px
+    ok = results[results["status"] == "ok"]
+    fig = px.line(ok, x="scale", y="seconds", color="stage", markers=True, log_x=True, log_y=True,
+                  hover_data=["teams", "games"], title="Schedule Predictor stage time vs data scale")
+    fig.write_html(path, include_plotlyjs="cdn")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage timings of the Schedule Predictor vs synthetic data scale.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--budget", type=float, default=300.0, help="skip stages estimated above this many seconds")
+    parser.add_argument("--out", default=os.path.join(ROOT, ".cache", "bench"))
+    parser.add_argument("--data", default=DEFAULT_OUT, help="where the synthetic data roots are written")
+    args = parser.parse_args()
+
+    history = {}
+    rows = []
+    for scale in sorted(args.scales):
+        started = time.perf_counter()
+        root = synthesize(scale, args.data)
+        print(f"{scale}× ({root}, generated in {time.perf_counter() - started:.1f}s)")
+        rows.extend(run_scale(scale, root, args.budget, history))
+
+    results = pd.DataFrame(rows)
+    os.makedirs(args.out, exist_ok=True)
+    csv_path = os.path.join(args.out, "scale_bench.csv")
+    html_path = os.path.join(args.out, "scale_bench.html")
+    results.to_csv(csv_path, index=False)
+    chart(results, html_path)
+    table = results.pivot_table(index="stage", columns="scale", values="seconds", sort=False)
+    print("\nseconds by stage and scale (blank = skipped / failed)")
+    print(table.round(2).to_string())
+    print(f"\n{csv_path}\n{html_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# bench/synthetic.py
+# Synthetic All_stats / game-history / schedule files at N× the real league.
+#   python bench/synthetic.py --scale 10 [--scale 100 ...] [--out .cache/bench/synthetic]
+# Each scale gets its own data root (<out>/scale-<n>/Data/...) holding files
+# with the real names, column schemas and dtypes, so the app and the benchmark
+# run against it unchanged (cwd = that root). The real league is replicated
+# into `scale` copies:
+#   - copy k > 0 renames every team and conference with a ' <k+1>' suffix, so
+#     conference sizes and the conference / non-conference mix stay realistic
+#   - numeric stats get N(0, 0.1·std) jitter (ints stay ints, non-negative
+#     stats stay non-negative); rank columns are re-spread over the larger league
+#   - game logs and schedule games are copied per copy; half of the
+#     non-conference games move the opponent into the next copy, so the copies
+#     form one connected league instead of `scale` disjoint ones
+# Copy 0 is the real data unchanged (scale 1 == the real files). Copies are
+# written one at a time, so memory stays at one league's worth even at 1000×.
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "APP"))
+
+from common.features import is_rank_col  # noqa: E402
+from common.seasons import SEASON_TABLES  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, "Data")
+DATABOOK_DIR = os.path.join(DATA_DIR, "2025_March_Madness_Databook")
+DEFAULT_OUT = os.path.join(ROOT, ".cache", "bench", "synthetic")
+JITTER = 0.1              # noise std as a fraction of each stat's std
+NON_CONF_MOVE = 0.5       # share of non-conference games re-pointed at the next copy
+
+# team-name and conference columns of each table
+NAME_COLS = {
+    "all_stats": ("Teams",),
+    "history": ("Team", "Opponent"),
+    "schedule": ("Home", "Away"),
+}
+CONF_COLS = {
+    "all_stats": ("Conference",),
+    "history": ("Conference", "Opponent Conference"),
+    "schedule": (),
+}
+
+
+def suffixed(values, k):
+    """Names of copy k (copy 0 keeps the real names); missing values stay missing."""
+    if k == 0:
+        return values
+    s = pd.Series(values, dtype=object)
+    return s.where(s.isna(), s.astype(str) + f" {k + 1}").to_numpy()
+
+
+def read_real(table):
+    df = pd.read_csv(os.path.join(ROOT, SEASON_TABLES[table]), encoding="latin1")
+    return df.rename(columns=lambda c: c.strip() if isinstance(c, str) else c)
+
+
+# -----------------------
+# One copy of each table
+# -----------------------
+def team_copy(df, k, scale, rng):
+    """All_stats rows for copy k: renamed, jittered, ranks spread over the scaled league."""
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if col in NAME_COLS["all_stats"] or col in CONF_COLS["all_stats"]:
+            out[col] = suffixed(values.to_numpy(), k)
+        elif not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            out[col] = values.to_numpy()
+        elif is_rank_col(col):
+            # rank r of the real league -> one of the `scale` slots tied at r
+            out[col] = ((values - 1) * scale + k + 1).to_numpy()
+        elif k == 0:
+            out[col] = values.to_numpy()
+        else:
+            std = float(values.std()) if values.notna().sum() > 1 else 0.0
+            noisy = values.to_numpy(dtype=float) + rng.normal(0.0, JITTER * std, len(values))
+            if values.min() >= 0:
+                noisy = np.maximum(noisy, 0.0)
+            if pd.api.types.is_integer_dtype(values):
+                noisy = np.round(noisy).astype(values.dtype)
+            out[col] = noisy
+    return pd.DataFrame(out, columns=df.columns)
+
+
+def games_copy(df, table, k, scale, rng, conference_game):
+    """History / schedule rows for copy k; some non-conference opponents move to copy k+1."""
+    second = NAME_COLS[table][1]
+    out = df.copy()
+    for col in NAME_COLS[table] + CONF_COLS[table]:
+        if col in out.columns:
+            out[col] = suffixed(df[col].to_numpy(), k)
+    if scale > 1:
+        move = ~conference_game & (rng.random(len(df)) < NON_CONF_MOVE)
+        nxt = (k + 1) % scale
+        out.loc[move, second] = suffixed(df.loc[move, second].to_numpy(), nxt)
+        if table == "history" and "Opponent Conference" in out.columns:
+            out.loc[move, "Opponent Conference"] = suffixed(df.loc[move, "Opponent Conference"].to_numpy(), nxt)
+    return out
+
+
+def conference_flags(df, table, conferences):
+    """True where a game is between two teams of the same conference."""
+    if table == "schedule" and "Conference_Game" in df.columns:
+        return pd.to_numeric(df["Conference_Game"], errors="coerce").fillna(0).astype(bool).to_numpy()
+    if "Non Conference Game" in df.columns:
+        return ~pd.to_numeric(df["Non Conference Game"], errors="coerce").fillna(0).astype(bool).to_numpy()
+    first, second = NAME_COLS[table]
+    return (df[first].map(conferences) == df[second].map(conferences)).to_numpy()
+
+
+# -----------------------
+# Write one scale
+# -----------------------
+def synthesize(scale, out_dir=DEFAULT_OUT, seed=0, force=False):
+    """
+    Write the `scale`× data root and return its path. An existing root is
+    reused unless `force` (the files are deterministic for a given seed).
+    """
+    root = os.path.join(out_dir, f"scale-{scale}")
+    data_dir = os.path.join(root, "Data")
+    paths = {table: os.path.join(root, path) for table, path in SEASON_TABLES.items()}
+    if not force and all(os.path.exists(p) for p in paths.values()):
+        return root
+    os.makedirs(data_dir, exist_ok=True)
+    # the Databook sheets are per-player / per-game extras; share the real ones
+    databook_link = os.path.join(data_dir, os.path.basename(DATABOOK_DIR))
+    if os.path.isdir(DATABOOK_DIR) and not os.path.lexists(databook_link):
+        os.symlink(DATABOOK_DIR, databook_link)
+
+    teams = read_real("all_stats")
+    conferences = dict(zip(teams["Teams"], teams["Conference"]))
+    for table, path in paths.items():
+        real = teams if table == "all_stats" else read_real(table)
+        flags = None if table == "all_stats" else conference_flags(real, table, conferences)
+        rng = np.random.default_rng([seed, scale, list(SEASON_TABLES).index(table)])
+        tmp = f"{path}.tmp"
+        for k in range(scale):
+            if table == "all_stats":
+                chunk = team_copy(real, k, scale, rng)
+            else:
+                chunk = games_copy(real, table, k, scale, rng, flags)
+            chunk.to_csv(tmp, mode="w" if k == 0 else "a", header=(k == 0), index=False, encoding="latin1")
+        os.replace(tmp, path)
+    return root
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic data roots at N× the real league.")
+    parser.add_argument("--scale", type=int, action="append", help="repeatable; default 10")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="rewrite roots that already exist")
+    args = parser.parse_args()
+    for n in args.scale or [10]:
+        root = synthesize(n, args.out, seed=args.seed, force=args.force)
+        sizes = {t: os.path.getsize(os.path.join(root, p)) for t, p in SEASON_TABLES.items()}
+        print(f"{n}×: {root}  " + "  ".join(f"{t} {b / 1e6:.1f} MB" for t, b in sizes.items()))
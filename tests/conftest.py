@@ -0,0 +1,11 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+# the app imports its shared modules as `common.*` (run from the repo root with APP on the path)
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "APP")
+sys.path.insert(0, APP_DIR)
+
+# derived artifacts (parquet stores, arrays) go to a throwaway directory, not the repo's .cache
+os.environ.setdefault("MARCH_METRICS_CACHE", tempfile.mkdtemp(prefix="march-metrics-tests-"))
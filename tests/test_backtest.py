@@ -0,0 +1,65 @@
+# tests/test_backtest.py
+import numpy as np
+import pandas as pd
+
+from common.backtest import MIN_TRAIN_GAMES, grade, run_backtest
+
+PRED_COLS = ["baseline_margin", "baseline_total", "model_margin", "model_total", "train_games"]
+
+
+def game_log(days=4, per_day=MIN_TRAIN_GAMES, seed=0):
+    rng = np.random.default_rng(seed)
+    n = days * per_day
+    home_rank, away_rank = rng.uniform(1, 300, n), rng.uniform(1, 300, n)
+    margin = (away_rank - home_rank) / 20 + rng.normal(scale=8, size=n)
+    total = 140 + rng.normal(scale=10, size=n)
+    games = pd.DataFrame({
+        "Date": pd.Timestamp("2024-11-04") + pd.to_timedelta(np.repeat(np.arange(days), per_day), unit="D"),
+        "Home": [f"Home {i}" for i in range(n)],
+        "Away": [f"Away {i}" for i in range(n)],
+        "Line": -(away_rank - home_rank) / 20,
+        "OU_Line": 140.0,
+        "Margin": margin,
+        "Total": total,
+        "Home_Rank": home_rank, "Away_Rank": away_rank,
+        "Home_PPG": 72.0, "Away_PPG": 70.0, "Home_OPP_PPG": 68.0, "Away_OPP_PPG": 69.0,
+    })
+    X = pd.DataFrame({"diff_rank": home_rank - away_rank, "sum_rank": home_rank + away_rank,
+                      "noise": rng.normal(size=n)})
+    return games, X
+
+
+def predictions(games, X):
+    graded, _ = run_backtest(games, X, workers=1, n_estimators=10)
+    return graded[PRED_COLS]
+
+
+def test_folds_only_train_on_earlier_dates():
+    games, X = game_log()
+    before = predictions(games, X)
+
+    # rewrite every result (and feature) of the last date: no earlier date may move
+    last = (games["Date"] == games["Date"].max()).to_numpy()
+    leaked = games.copy()
+    leaked.loc[last, ["Margin", "Total"]] = 1000.0
+    X_leaked = X.copy()
+    X_leaked.loc[last] = -X_leaked.loc[last]
+    after = predictions(leaked, X_leaked)
+
+    pd.testing.assert_frame_equal(before[~last], after[~last])
+    # each date's models see exactly the games of earlier dates
+    assert (before["train_games"] == games["Date"].rank(method="min") - 1).all()
+
+
+def test_same_day_results_do_not_feed_their_own_fold():
+    games, X = game_log()
+    day = (games["Date"] == games["Date"].unique()[2]).to_numpy()
+    flipped = games.copy()
+    flipped.loc[day, ["Margin", "Total"]] = -flipped.loc[day, ["Margin", "Total"]]
+    pd.testing.assert_frame_equal(predictions(games, X)[day], predictions(flipped, X)[day])
+
+
+def test_grade_spread_and_totals():
+    # home -5.5 wins by 7 -> home covers; total 150 on 145.5 -> over wins; a 0 edge places no bet
+    np.testing.assert_array_equal(grade([8.0, 3.0, 5.5], [-5.5, -5.5, -5.5], [7.0, 7.0, 7.0]), [1.0, -1.0, np.nan])
+    np.testing.assert_array_equal(grade([150.0, 140.0], [145.5, 145.5], [150.0, 150.0], spread=False), [1.0, -1.0])
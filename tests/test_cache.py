@@ -0,0 +1,22 @@
+# tests/test_cache.py
+from common.cache import file_version, pinned_source
+
+
+def test_pinned_source_keeps_the_issued_version(tmp_path):
+    path = tmp_path / "All_stats.csv"
+    path.write_text("Teams,Wins\nFlorida,30\n")
+    version = file_version(str(path))
+    pinned = pinned_source(str(path), version)
+
+    # the live file moves on; a re-read under the old token still sees the old rows
+    path.write_text("Teams,Wins\nFlorida,31\n")
+    assert pinned_source(str(path), version) == pinned
+    assert open(pinned).read() == "Teams,Wins\nFlorida,30\n"
+
+
+def test_pinned_source_falls_back_to_the_file(tmp_path):
+    path = tmp_path / "Clutch.csv"
+    path.write_text("a\n1\n")
+    assert pinned_source(str(path), None) == str(path)
+    # a token the file never had (it changed before the first read): no copy, read the file itself
+    assert pinned_source(str(path), "0" * 16) == str(path)
@@ -0,0 +1,60 @@
+# tests/test_clutch.py
+import numpy as np
+import pandas as pd
+
+from common.clutch import TIER_ORDER, opponent_tier, parse_clutch_table
+
+HEADER = ("Unnamed,Team,,Top25,Home,OT,Opponent,Date,,FGM,FGA,,3M,3A,,FTM,FTA,,SM,Clutch SM,REB,OPPReb,"
+          "Off REB,Opp Off Reb,Turn,OppTurn,steal,Win,ComeFromBehindWins,BlownLeadClutchLoss,Top 25,"
+          "Opp Historical Value,% of points in clutch,Clutch Value")
+
+
+def game_row(team, top25, opponent, opp_top25, value, win=1):
+    return (f",{team},,{top25},HOME,0,{opponent},11/4/2024,,3,5,,1,2,,2,2,,8,1,4,3,1,1,1,2,1,{win},0,0,"
+            f"{opp_top25},{value},0.2,1.5")
+
+
+def write_sheet(path, rows):
+    summary = "Florida," + ",".join(["0"] * (HEADER.count(",")))
+    team_header = "Team:," + ",".join(["Sum:"] * (HEADER.count(",")))
+    path.write_text("\n".join([HEADER, team_header, summary] + rows) + "\n", encoding="latin1")
+    return path
+
+
+def test_parse_keeps_only_game_rows(tmp_path):
+    path = write_sheet(tmp_path / "clutch.csv", [
+        game_row("Florida", 1, "South Carolina", 0, 40),
+        game_row("Florida", 1, "Kentucky", 1, 90),
+        game_row("Akron", 0, "Florida", 1, 95, win=0),
+    ])
+    games = parse_clutch_table(str(path))
+    assert len(games) == 3                                   # 'Team:' header and summary rows dropped
+    assert games["Team"].tolist() == ["Florida", "Florida", "Akron"]
+    assert games["Location"].tolist() == ["HOME"] * 3
+    assert games["Opp Top25"].dtype == np.int8 and games["Top25"].dtype == np.int8
+    assert games["Date"].notna().all()
+
+
+def test_tier_uses_opponent_flag_not_team_flag(tmp_path):
+    path = write_sheet(tmp_path / "clutch.csv", [
+        game_row("Florida", 1, "South Carolina", 0, 40),     # ranked team, unranked opponent
+        game_row("Florida", 1, "Kentucky", 1, 90),
+        game_row("Akron", 0, "Florida", 1, 95, win=0),       # unranked team, ranked opponent
+        game_row("Akron", 0, "Ohio", 0, 10),
+    ])
+    games = parse_clutch_table(str(path)).set_index("Opponent")
+    assert games.loc["South Carolina", "Opponent Tier"] != "Top 25"
+    assert games.loc["Kentucky", "Opponent Tier"] == "Top 25"
+    assert games.loc["Florida", "Opponent Tier"] == "Top 25"
+    assert games.loc["Ohio", "Opponent Tier"] != "Top 25"
+
+
+def test_opponent_tier_reads_text_flags_and_value_tertiles():
+    games = pd.DataFrame({
+        "Top25": [1, 1, 0, 0, 0, 0],
+        "Top 25 Opponent": ["0", "1", "0", "0", "0", "0"],
+        "Opp Historical Value": [10, 50, 20, 30, 60, 70],
+    })
+    tier = opponent_tier(games)
+    assert list(tier.categories) == TIER_ORDER
+    assert tier.tolist() == ["Low", "Top 25", "Low", "Mid", "High", "High"]
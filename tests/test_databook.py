@@ -0,0 +1,38 @@
+# tests/test_databook.py
+from common.databook import parse_sheet
+
+SHEET = "\n".join([
+    ",,0.25,1.5,",                              # coefficient row above the header
+    ",,,,",
+    ",Team,Wins,Win %,Coach",
+    "Team:,Sum:,Sum:,Average:,",                 # summary marker row
+    ",Florida,30,0.85,Todd Golden",
+    ",Auburn,28,0.80,Bruce Pearl",
+    "SEC,,58,,",                                 # group subtotal after a marker
+    ",Team,Wins,Win %,Coach",                    # repeated header
+    ",Akron,\"1,024\",-,Joe Jones",
+    ",,,,",
+])
+
+
+def test_header_and_summary_rows(tmp_path):
+    path = tmp_path / "Coach-Table 1.csv"
+    path.write_text(SHEET + "\n", encoding="utf-8")
+    frame, info = parse_sheet(str(path))
+
+    assert info["header_row"] == 2
+    assert info["coefficients"] == [{"Wins": 0.25, "Win %": 1.5}]
+    assert info["dropped_rows"] == {"blank": 1, "summary": 1, "group": 1, "repeated_header": 1}
+    assert frame["Team"].tolist() == ["Florida", "Auburn", "Akron"]
+    assert frame["Wins"].tolist() == [30, 28, 1024]
+    assert frame["Win %"].isna().tolist() == [False, False, True]
+    assert info["kinds"]["Wins"] == "int" and info["kinds"]["Win %"] == "float"
+
+
+def test_latin1_export_is_read_in_one_restart(tmp_path):
+    # the non-UTF-8 byte sits past the header rows, so the UTF-8 pass fails mid-stream
+    path = tmp_path / "Player Value-Table 1.csv"
+    path.write_bytes((SHEET.replace("Joe Jones", "José Jones") + "\n").encode("latin1"))
+    frame, _ = parse_sheet(str(path))
+    assert frame["Coach"].tolist()[-1] == "José Jones"
+    assert len(frame) == 3
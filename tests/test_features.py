@@ -0,0 +1,35 @@
+# tests/test_features.py
+import numpy as np
+import pandas as pd
+
+from common.features import select_team_features
+
+
+def test_correlation_pruning_compares_with_kept_columns_only():
+    # A~B and B~C are above the threshold, A~C is not: B goes, C stays
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=400)
+    c = rng.normal(size=400)
+    b = (a + c) / np.sqrt(2)
+    df = pd.DataFrame({"A": a, "B": b, "C": c})
+    corr = df.corr().abs()
+    threshold = 0.6
+    assert corr.loc["A", "B"] > threshold and corr.loc["B", "C"] > threshold and corr.loc["A", "C"] < threshold
+    assert select_team_features(df, corr_threshold=threshold) == ["A", "C"]
+
+
+def test_drops_rank_junk_sparse_and_constant_columns():
+    rng = np.random.default_rng(1)
+    n = 50
+    df = pd.DataFrame({
+        "Teams": [f"T{i}" for i in range(n)],
+        "Points": rng.normal(size=n),
+        "Points_RANK": np.arange(n),
+        "OReb Rank": np.arange(n),
+        "Unnamed: 7": rng.normal(size=n),
+        "index": np.arange(n),
+        "Sparse": np.where(np.arange(n) < 10, np.nan, rng.normal(size=n)),
+        "Constant": np.ones(n),
+        "Rebounds": rng.normal(size=n),
+    })
+    assert select_team_features(df) == ["Points", "Rebounds"]
@@ -0,0 +1,38 @@
+# tests/test_figures.py
+import json
+
+import pandas as pd
+
+from common import figures
+from common.figures import breakdown_section_figure, get_team_figure
+
+TEAMS = pd.DataFrame({
+    "Teams": ["Florida", "Auburn", "Akron"],
+    "Conference": ["SEC", "SEC", "MAC"],
+    "Points": [85.0, 80.0, 70.0],
+    "TO": [10.0, 12.0, 9.0],
+})
+
+
+def test_hover_uses_the_ranks_passed_in():
+    ranks = pd.DataFrame({"Points": [1.0, 2.0, 3.0], "TO": [7.0, 8.0, float("nan")]}, index=TEAMS.index)
+    fig = breakdown_section_figure(TEAMS, "Florida", {"Points": "PPG", "TO": "Turnovers"}, "Test", ranks=ranks)
+    hover = fig.data[0].hovertext
+    assert "(Rank: 1)" in hover[0]
+    assert "(Rank: 7)" in hover[1]
+
+
+def test_missing_figure_is_answered_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(figures, "CACHE_DIR", str(tmp_path))
+    calls = []
+
+    def render(df, team, contexts=None, registry=None, ranks=None):
+        calls.append(team)
+        return {"breakdown.Offense": json.dumps({"data": []})}
+
+    monkeypatch.setattr(figures, "team_figures", render)
+    assert get_team_figure(TEAMS, "v1", "Florida", "clutch.shooting") is None
+    # the stored file has no clutch chart: later misses read it instead of re-rendering
+    assert get_team_figure(TEAMS, "v1", "Florida", "clutch.shooting") is None
+    assert get_team_figure(TEAMS, "v1", "Florida", "breakdown.Offense") is not None
+    assert calls == ["Florida"]
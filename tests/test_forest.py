@@ -0,0 +1,40 @@
+# tests/test_forest.py
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from common.forest import CompiledForest, compile_forest
+from common.predictor import make_pipeline
+
+
+def games(n=400, k=8, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, k))
+    y = (X[:, 0] - 0.5 * X[:, 1] + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize("pca_components", [0, 4])
+def test_compiled_pipeline_is_bit_for_bit(pca_components):
+    X, y = games()
+    model = make_pipeline(X.shape[1], pca_components, n_estimators=30).fit(X, y)
+    compiled = compile_forest(model)
+    X_new, _ = games(n=1500, seed=1)   # more rows than one ROW_BLOCK
+    np.testing.assert_array_equal(compiled.predict_proba(X_new), model.predict_proba(X_new))
+    np.testing.assert_array_equal(compiled.predict_proba(X_new[:1]), model.predict_proba(X_new[:1]))
+
+
+def test_missing_values_follow_the_learned_side():
+    X, y = games()
+    X[np.random.default_rng(2).random(X.shape) < 0.1] = np.nan   # trees learn where NaN goes
+    forest = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    X_new, _ = games(n=300, seed=3)
+    X_new[np.random.default_rng(4).random(X_new.shape) < 0.1] = np.nan
+    np.testing.assert_array_equal(CompiledForest.from_pipeline(forest).predict_proba(X_new),
+                                  forest.predict_proba(X_new))
+
+
+def test_non_forest_is_rejected():
+    with pytest.raises(TypeError):
+        CompiledForest.from_pipeline(make_pipeline(4, 0).steps[0][1])
+    assert compile_forest(None) is None
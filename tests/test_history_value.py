@@ -0,0 +1,42 @@
+# tests/test_history_value.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.history_value import (HISTORY_TABLE_PATH, SHEET_UNWEIGHTED, SHEET_VALUE_COL, parse_history_table,
+                                  program_values)
+
+pytestmark = pytest.mark.skipif(not os.path.exists(HISTORY_TABLE_PATH), reason="Databook export not in the tree")
+
+MARCH_LOCATION = "March Location (seeding, NIT, CIT, CBI, Missed)"
+
+
+@pytest.fixture(scope="module")
+def sheet():
+    return parse_history_table()
+
+
+def test_weight_row_parsing(sheet):
+    frame, weights = sheet
+    assert len(weights) == 40   # 44 numeric cells in the row, 4 of them year labels
+    assert weights["Last year win %"] == 9.1 and weights["Power Misses"] == -7.4
+    assert weights["30 Win Season Past 5 Seasons"] == 3.11106
+    # the year labels over the text March Location columns are not weights ...
+    assert not any(c.startswith(MARCH_LOCATION) for c in weights.index)
+    # ... the numeric seed scores next to them (unnamed in the header) are
+    np.testing.assert_array_equal(weights[[f"Unnamed: {i}" for i in range(34, 39)]], [1.5, 1.25, 1.0, 0.75, 0.5])
+    assert pd.api.types.is_numeric_dtype(frame["Unnamed: 34"])
+    # columns without a weight in the row stay out
+    assert "5 Year average" not in weights.index and "Win%" not in weights.index
+    assert set(SHEET_UNWEIGHTED) <= set(weights.index)
+
+
+def test_program_value_reproduces_the_sheet_value(sheet):
+    frame, weights = sheet
+    value, contributions = program_values(frame, weights)
+    sheet_value = pd.to_numeric(frame[SHEET_VALUE_COL], errors="coerce")
+    # the sheet rounds Value to 3 decimals
+    assert (value - sheet_value).abs().max() <= 0.0005 + 1e-9
+    assert not set(SHEET_UNWEIGHTED) & set(contributions.columns)
@@ -0,0 +1,109 @@
+# tests/test_live.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.live import RESULTS_COLUMNS, LiveSeason
+from common.teams import TeamRegistry
+
+SCHEDULE = pd.DataFrame({
+    "Day": [1, 1, 2, 3, 4, 5],
+    "Home": ["Connecticut", "Duke", "Kansas", "Connecticut", "Duke", "Kansas"],
+    "Away": ["Kansas", "Gonzaga", "Duke", "Gonzaga", "Connecticut", "Gonzaga"],
+    "Conference_Game": [False, False, False, False, False, False],
+    "Prob_Home_Win": [0.6, 0.55, 0.5, 0.7, 0.45, 0.65],
+})
+CONFERENCES = {"Connecticut": "Big East", "Duke": "ACC", "Kansas": "Big 12", "Gonzaga": "WCC"}
+
+
+def make_live(tmp_path, registry=None):
+    live = LiveSeason(SCHEDULE, CONFERENCES, season=2025, registry=registry)
+    live.path = str(tmp_path / "log.csv")
+    return live
+
+
+def log_results(live, rows):
+    frame = pd.DataFrame(rows, columns=RESULTS_COLUMNS)
+    header = not pd.io.common.file_exists(live.path)
+    frame.to_csv(live.path, mode="a", header=header, index=False, lineterminator="\n")
+
+
+@pytest.fixture
+def registry():
+    return TeamRegistry(["Connecticut", "Duke", "Kansas", "Gonzaga"])
+
+
+def test_aliased_results_are_applied_through_the_registry(tmp_path, registry):
+    live = make_live(tmp_path, registry)
+    log_results(live, [(1, "UConn", "Kansas", 80, 70)])
+    assert live.refresh(simulate=False) == 1
+    standings = live.snapshot()["standings"].set_index("Team")
+    assert standings.loc["Connecticut", "W"] == 1 and standings.loc["Kansas", "L"] == 1
+    assert live.snapshot()["unmatched"].empty
+
+
+def test_unmatched_results_are_reported_not_counted(tmp_path, registry):
+    live = make_live(tmp_path, registry)
+    log_results(live, [(1, "Duke", "Gonzaga", 75, 60), (1, "Nowhere A&M", "Kansas", 60, 90)])
+    assert live.refresh(simulate=False) == 1
+    snap = live.snapshot()
+    assert snap["applied"] == 1
+    assert snap["unmatched"]["Home"].tolist() == ["Nowhere A&M"]
+    assert snap["standings"].set_index("Team").loc["Kansas", ["W", "L"]].tolist() == [0, 0]
+
+
+RESULTS = [(1, "Connecticut", "Kansas", 80, 70), (1, "Duke", "Gonzaga", 66, 71),
+           (2, "Kansas", "Duke", 90, 88), (3, "Connecticut", "Gonzaga", 60, 75)]
+
+
+def state(live):
+    # live probabilities of played games are stale by design; only remaining games are compared
+    snap = live.snapshot()
+    return snap["standings"], snap["upcoming"], live.rating.copy(), live.live_prob[~live.played]
+
+
+def assert_same_state(a, b):
+    pd.testing.assert_frame_equal(a[0], b[0])
+    pd.testing.assert_frame_equal(a[1], b[1])
+    np.testing.assert_allclose(a[2], b[2], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(a[3], b[3], rtol=0, atol=1e-12)
+
+
+def test_incremental_refreshes_match_a_full_recompute(tmp_path):
+    # one result per refresh, re-scoring only the affected teams' games ...
+    live = make_live(tmp_path / "incremental")
+    (tmp_path / "incremental").mkdir()
+    for row in RESULTS:
+        log_results(live, [row])
+        assert live.refresh(simulate=False) == 1
+
+    # ... ends where one pass over the whole log does
+    full = make_live(tmp_path / "full")
+    (tmp_path / "full").mkdir()
+    log_results(full, RESULTS)
+    assert full.refresh(simulate=False) == len(RESULTS)
+    assert_same_state(state(live), state(full))
+
+    # and every remaining game's live probability equals a fresh rescore of all of them
+    rest = np.flatnonzero(~live.played)
+    expected = 1 / (1 + np.exp(-(live.base_logit[rest] + live.rating[live.home[rest]] - live.rating[live.away[rest]])))
+    np.testing.assert_allclose(live.live_prob[rest], expected, rtol=0, atol=1e-12)
+
+
+def test_rewritten_log_is_replayed_from_scratch(tmp_path):
+    live = make_live(tmp_path)
+    log_results(live, RESULTS)
+    live.refresh(simulate=False)
+    # the log is rewritten with fewer (corrected) rows: state is rebuilt, not stacked on top
+    os.remove(live.path)
+    log_results(live, RESULTS[:2])
+    assert live.refresh(simulate=False) == 2
+
+    fresh = make_live(tmp_path / "fresh")
+    (tmp_path / "fresh").mkdir()
+    log_results(fresh, RESULTS[:2])
+    fresh.refresh(simulate=False)
+    assert_same_state(state(live), state(fresh))
+    assert live.snapshot()["applied"] == 2
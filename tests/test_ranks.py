@@ -0,0 +1,78 @@
+# tests/test_ranks.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.ranks import TIE_METHODS, compute_ranks, game_log_stats, last_n_ranks, rank_column, rank_matrix
+
+# ties inside and across groups, NaNs, and one column where lower is better
+X = np.array([
+    [10.0, 3.0],
+    [12.0, 3.0],
+    [10.0, np.nan],
+    [8.0, 1.0],
+    [np.nan, 3.0],
+    [12.0, 2.0],
+    [10.0, 2.0],
+])
+LOWER = [False, True]
+GROUPS = np.array([0, 0, 1, 1, 0, 1, 0])
+
+
+def pandas_ranks(frame, method, lower):
+    # DataFrame.rank calls ordinal 'first'
+    return frame.rank(method="first" if method == "ordinal" else method, ascending=lower, na_option="keep")
+
+
+@pytest.mark.parametrize("method", TIE_METHODS)
+def test_rank_matrix_matches_dataframe_rank(method):
+    got = rank_matrix(X, LOWER, method=method)
+    for j, lower in enumerate(LOWER):
+        want = pandas_ranks(pd.Series(X[:, j]), method, lower).to_numpy()
+        np.testing.assert_array_equal(got[:, j], want)
+
+
+@pytest.mark.parametrize("method", TIE_METHODS)
+def test_grouped_ranks_match_groupby_rank(method):
+    got = rank_matrix(X, LOWER, GROUPS, method=method)
+    for j, lower in enumerate(LOWER):
+        series = pd.Series(X[:, j])
+        want = series.groupby(GROUPS).rank(method="first" if method == "ordinal" else method,
+                                           ascending=lower, na_option="keep").to_numpy()
+        np.testing.assert_array_equal(got[:, j], want)
+
+
+def test_rank_column_is_the_min_method():
+    for j, lower in enumerate(LOWER):
+        np.testing.assert_array_equal(rank_column(X[:, j], lower), rank_matrix(X[:, [j]], [lower])[:, 0])
+
+
+def test_min_games_leaves_teams_out_of_the_pool():
+    df = pd.DataFrame({"Points": [80.0, 90.0, 70.0], "Games (Dropping D2 matches)": [30, 2, 30]})
+    ranks = compute_ranks(df, ["Points"], min_games=10)
+    assert ranks["Points"].tolist()[0] == 1 and np.isnan(ranks["Points"].tolist()[1])
+
+
+# a game log in the daily export's layout: per-game columns, then the pre-game season-to-date block from 'Wins' on
+GAME_LOG = pd.DataFrame({
+    "Team": ["Duke", "Duke", "Duke", "Kansas", "Kansas", "Kansas"],
+    "Date": ["6-Nov-24", "4-Nov-24", "8-Nov-24", "4-Nov-24", "6-Nov-24", "8-Nov-24"],
+    "Non Conference Game": [1, 1, 0, 1, 0, 0],
+    "Points": [70, 200, 60, 60, 90, 80],
+    "Opp Points": [60, 50, 70, 80, 60, 65],
+    "Line": [-8.5, -20.5, -3.5, 2.5, -6.5, -4.5],
+    "Wins": [1, 0, 2, 0, 0, 1],
+    "Points.1": [100.0, 0.0, 85.0, 0.0, 60.0, 75.0],
+})
+
+
+def test_game_log_stats_are_the_box_score_columns():
+    assert game_log_stats(GAME_LOG) == ["Points", "Opp Points"]
+
+
+def test_last_n_ranks_use_each_teams_latest_games():
+    ranks = last_n_ranks(GAME_LOG, 2)
+    # by date, not row order: Duke's last two (Nov 6, 8) are 65 scored / 65 allowed, Kansas' 85 / 62.5
+    assert ranks.columns.tolist() == ["Points", "Opp Points"]
+    assert ranks.loc["Kansas"].tolist() == [1.0, 1.0]
+    assert ranks.loc["Duke"].tolist() == [2.0, 2.0]
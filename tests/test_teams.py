@@ -0,0 +1,40 @@
+# tests/test_teams.py
+import numpy as np
+
+from common.teams import TeamRegistry, name_key
+
+NAMES = ["Connecticut", "N.C. State", "Saint Mary's", "Michigan St.", "Duke"]
+
+
+def test_ids_are_sorted_canonical_names():
+    registry = TeamRegistry(NAMES)
+    assert list(registry.names) == sorted(NAMES)
+    assert registry.id_of("Duke") == registry.names.get_loc("Duke")
+
+
+def test_aliases_and_spelling_variants_resolve_to_one_id():
+    registry = TeamRegistry(NAMES)
+    uconn = registry.id_of("Connecticut")
+    assert registry.id_of("UConn") == uconn
+    assert registry.id_of("NC State") == registry.id_of("North Carolina St.") == registry.id_of("N.C. State")
+    assert registry.id_of("Michigan State") == registry.id_of("michigan st") == registry.id_of("Michigan St.")
+    # curly apostrophe, and the same name read as latin1 mojibake
+    assert registry.id_of("Saint Mary’s") == registry.id_of("Saint Mary's")
+    assert registry.id_of("Saint Mary’s".encode("utf-8").decode("latin1")) == registry.id_of("Saint Mary's")
+    assert name_key("St. Mary's") != name_key("Saint Mary's")   # only the alias table joins these
+    assert registry.id_of("St. Mary's") == registry.id_of("Saint Mary's")
+
+
+def test_aliases_to_teams_outside_the_registry_are_ignored():
+    registry = TeamRegistry(["Duke"])
+    assert registry.id_of("UConn") == -1
+
+
+def test_vectorized_ids_record_unmatched_names_per_source():
+    registry = TeamRegistry(NAMES)
+    ids = registry.ids(["UConn", "Duke", "Nowhere A&M", None, "Nowhere A&M"], source="test.Team")
+    assert ids.tolist() == [registry.id_of("Connecticut"), registry.id_of("Duke"), -1, -1, -1]
+    assert ids.dtype == np.int32
+    report = registry.unmatched_report()
+    assert report.set_index("Name").loc["Nowhere A&M", "Rows"] == 2
+    assert registry.canonical(["UConn", "Nowhere A&M"]).tolist() == ["Connecticut", None]
@@ -0,0 +1,97 @@
+# tests/test_transfer.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from common.teams import TeamRegistry
+from common.transfer import TOTAL_COLS, TransferEngine
+
+TEAMS = ["Alabama", "Auburn", "Duke", "Gonzaga", "Houston"]
+GAMES = np.array([30, 32, 35, 31, 34])   # sample length per team; shooting columns are totals over it
+SHOOTING = ["FGM", "FGA", "FG3sM", "FG3sA", "FTM", "FTA"]
+PER_GAME = ["OReb", "DReb", "AST", "STL", "TO", "PF", "Opp Points", "OPP_OReb", "OPP_DReb"]
+# player line column -> profile column
+LINE_COLS = {"FGM": "FGM", "FGA": "FGA", "3M": "FG3sM", "3A": "FG3sA", "FTM": "FTM", "FTA": "FTA",
+             "OReb": "OReb", "DReb": "DReb", "AST": "AST", "STL": "STL", "TO": "TO", "PF": "PF"}
+
+
+def team_profiles(seed=0):
+    """Per-game profiles; Points follows the points identity, as in the sheet."""
+    rng = np.random.default_rng(seed)
+    pg = pd.DataFrame({
+        "FGM": rng.uniform(24, 30, 5), "FG3sM": rng.uniform(6, 11, 5), "FTM": rng.uniform(11, 17, 5),
+        "OReb": rng.uniform(8, 13, 5), "DReb": rng.uniform(22, 28, 5), "AST": rng.uniform(12, 18, 5),
+        "STL": rng.uniform(5, 9, 5), "TO": rng.uniform(9, 14, 5), "PF": rng.uniform(15, 20, 5),
+        "Opp Points": rng.uniform(62, 75, 5), "OPP_OReb": rng.uniform(8, 12, 5), "OPP_DReb": rng.uniform(21, 27, 5),
+    })
+    pg["FGA"] = pg["FGM"] / rng.uniform(0.42, 0.5, 5)
+    pg["FG3sA"] = pg["FG3sM"] / rng.uniform(0.31, 0.39, 5)
+    pg["FTA"] = pg["FTM"] / rng.uniform(0.68, 0.78, 5)
+    return pg
+
+
+def transfer_sheet(pg):
+    sheet = pg.copy()
+    sheet["Points"] = 2 * pg["FGM"] + pg["FG3sM"] + pg["FTM"]
+    sheet[TOTAL_COLS[:6]] = pg[SHOOTING].to_numpy() * GAMES[:, None]
+    return sheet[SHOOTING + ["Points"] + PER_GAME].assign(Team=TEAMS)[["Team"] + SHOOTING + ["Points"] + PER_GAME]
+
+
+def player_lines():
+    rng = np.random.default_rng(1)
+    lines = pd.DataFrame({
+        "Player": ["Mark Sears", "Grant Nelson", "Johni Broome", "Cooper Flagg", "Graham Ike"],
+        "Team": ["Alabama", "Alabama", "Auburn", "Duke", "Gonzaga"],
+        "GP": [30, 28, 31, 33, 29],
+        "MIN/G": [33.0, 24.0, 30.0, 31.0, 26.0],
+    })
+    per_game = pd.DataFrame({"FGM": rng.uniform(3, 7, 5), "3M": rng.uniform(0.5, 2.5, 5), "FTM": rng.uniform(2, 5, 5),
+                             "OReb": rng.uniform(0.5, 3, 5), "DReb": rng.uniform(2, 7, 5), "AST": rng.uniform(1, 5, 5),
+                             "STL": rng.uniform(0.5, 1.5, 5), "TO": rng.uniform(1, 3, 5), "PF": rng.uniform(1.5, 3, 5)})
+    per_game["FGA"] = per_game["FGM"] * 2.2
+    per_game["3A"] = per_game["3M"] * 2.8
+    per_game["FTA"] = per_game["FTM"] * 1.3
+    per_game["PTS"] = 2 * per_game["FGM"] + per_game["3M"] + per_game["FTM"]
+    # season totals, as common/players.season_lines returns them
+    return lines.join(per_game.mul(lines["GP"], axis=0))
+
+
+@pytest.fixture
+def engine():
+    return TransferEngine(transfer_sheet(team_profiles()), player_lines(), TeamRegistry(TEAMS))
+
+
+def rebuilt(moves):
+    """A fresh engine over the sheet with the moves applied to the teams' per-game profiles."""
+    pg, lines = team_profiles(), player_lines()
+    per_game = lines[list(LINE_COLS)].div(lines["GP"], axis=0).rename(columns=LINE_COLS)
+    for player, from_team, to_team, share in moves:
+        line = per_game[lines["Player"] == player].iloc[0]
+        pg.loc[TEAMS.index(from_team), line.index] -= line
+        pg.loc[TEAMS.index(to_team), line.index] += share * line
+    return TransferEngine(transfer_sheet(pg), lines, TeamRegistry(TEAMS))
+
+
+def test_two_team_move_matches_a_full_rebuild(engine):
+    moves = [("Mark Sears", "Alabama", "Duke", 1.0), ("Cooper Flagg", "Duke", "Alabama", 0.8)]
+    result = engine.scenario(moves)
+    fresh = rebuilt(moves)
+
+    teams = result["teams"]
+    assert sorted(engine.registry.names[teams]) == ["Alabama", "Duke"]
+    col_idx = [fresh.col_index[c] for c in result["columns"]]
+    np.testing.assert_allclose(result["values"], fresh.values[np.ix_(teams, col_idx)], rtol=1e-12)
+    np.testing.assert_array_equal(result["ranks"], fresh.ranks[:, col_idx])
+
+    # every column the scenario leaves out is one a full rebuild does not move either
+    untouched = [j for c, j in fresh.col_index.items() if c not in result["columns"]]
+    np.testing.assert_allclose(fresh.values[np.ix_(teams, untouched)], engine.values[np.ix_(teams, untouched)],
+                               rtol=1e-12)
+    np.testing.assert_array_equal(fresh.ranks[:, untouched], engine.ranks[:, untouched])
+
+
+def test_moving_a_player_back_to_his_team_changes_nothing(engine):
+    result = engine.scenario([("Johni Broome", "Auburn", "Auburn", 1.0)])
+    assert result["columns"] == []
+    assert result["values"].size == 0 and result["ranks"].size == 0
+    assert result["summary"].empty